@@ -0,0 +1,30 @@
+"""add content-addressed attachment blobs
+
+Revision ID: 0003_attachment_blobs
+Revises: 0002_audit_indexing
+Create Date: 2026-10-19 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_attachment_blobs"
+down_revision = "0002_audit_indexing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attachment_blobs",
+        sa.Column("sha256", sa.String(length=64), primary_key=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(length=255), nullable=False),
+        sa.Column("uploaded_by_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("attachment_blobs")
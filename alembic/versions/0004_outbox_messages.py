@@ -0,0 +1,38 @@
+"""add transactional outbox
+
+Revision ID: 0004_outbox_messages
+Revises: 0003_attachment_blobs
+Create Date: 2026-10-19 00:10:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_outbox_messages"
+down_revision = "0003_attachment_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.String(length=100), nullable=False),
+        sa.Column("aggregate_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("dispatched_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(length=1000), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_outbox_messages_aggregate_id", "outbox_messages", ["aggregate_id"])
+    op.create_index("ix_outbox_messages_pending", "outbox_messages", ["dispatched_at", "available_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_messages_pending", table_name="outbox_messages")
+    op.drop_index("ix_outbox_messages_aggregate_id", table_name="outbox_messages")
+    op.drop_table("outbox_messages")
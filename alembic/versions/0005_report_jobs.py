@@ -0,0 +1,44 @@
+"""add accreditation report jobs
+
+Revision ID: 0005_report_jobs
+Revises: 0004_outbox_messages
+Create Date: 2026-10-19 00:20:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_report_jobs"
+down_revision = "0004_outbox_messages"
+branch_labels = None
+depends_on = None
+
+report_status = sa.Enum("PENDING", "RUNNING", "DONE", "FAILED", name="reportstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("format", sa.String(length=10), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("watermark", sa.String(length=100), nullable=False),
+        sa.Column("status", report_status, nullable=False),
+        sa.Column("requested_by_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("row_count", sa.Integer(), nullable=True),
+        sa.Column("artifact_path", sa.String(length=500), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.String(length=1000), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_report_jobs_cache_key_status", "report_jobs", ["cache_key", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_jobs_cache_key_status", table_name="report_jobs")
+    op.drop_table("report_jobs")
+    report_status.drop(op.get_bind(), checkfirst=True)
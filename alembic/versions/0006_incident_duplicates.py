@@ -0,0 +1,31 @@
+"""flag suspected duplicate incidents
+
+Revision ID: 0006_incident_duplicates
+Revises: 0005_report_jobs
+Create Date: 2026-10-19 00:30:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_incident_duplicates"
+down_revision = "0005_report_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("incidents", sa.Column("suspected_duplicate_of", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_incidents_suspected_duplicate_of", "incidents", "incidents", ["suspected_duplicate_of"], ["id"]
+    )
+    op.create_index("ix_incidents_suspected_duplicate_of", "incidents", ["suspected_duplicate_of"])
+    # The duplicate index catches up on changed rows by updated_at.
+    op.create_index("ix_incidents_updated_at", "incidents", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_incidents_updated_at", table_name="incidents")
+    op.drop_index("ix_incidents_suspected_duplicate_of", table_name="incidents")
+    op.drop_constraint("fk_incidents_suspected_duplicate_of", "incidents", type_="foreignkey")
+    op.drop_column("incidents", "suspected_duplicate_of")
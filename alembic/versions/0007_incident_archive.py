@@ -0,0 +1,70 @@
+"""add incident and audit log archive tables
+
+Revision ID: 0007_incident_archive
+Revises: 0006_incident_duplicates
+Create Date: 2026-10-19 00:40:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_incident_archive"
+down_revision = "0006_incident_duplicates"
+branch_labels = None
+depends_on = None
+
+# The enum types already exist from 0001_init.
+incident_status = sa.Enum("DRAFT", "SUBMITTED", "PJ_REVIEWED", "MUTU_REVIEWED", "CLOSED", name="incidentstatus", create_type=False)
+incident_category = sa.Enum("KTD", "KTC", "KNC", "KPCS", "Sentinel", name="incidentcategory", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "incidents_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("reporter_id", sa.Integer(), nullable=False),
+        sa.Column("patient_identifier", sa.String(length=255), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=True),
+        sa.Column("department_id", sa.Integer(), nullable=True),
+        sa.Column("free_text_description", sa.Text(), nullable=False),
+        sa.Column("harm_indicator", sa.String(length=255), nullable=True),
+        sa.Column("attachments", sa.JSON(), nullable=True),
+        sa.Column("status", incident_status, nullable=False),
+        sa.Column("predicted_category", incident_category, nullable=True),
+        sa.Column("predicted_confidence", sa.Float(), nullable=True),
+        sa.Column("model_version", sa.String(length=255), nullable=True),
+        sa.Column("pj_decision", incident_category, nullable=True),
+        sa.Column("pj_notes", sa.Text(), nullable=True),
+        sa.Column("mutu_decision", incident_category, nullable=True),
+        sa.Column("mutu_notes", sa.Text(), nullable=True),
+        sa.Column("final_category", incident_category, nullable=True),
+        sa.Column("suspected_duplicate_of", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_incidents_archive_occurred_at", "incidents_archive", ["occurred_at"])
+    op.create_table(
+        "audit_logs_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("incident_id", sa.Integer(), nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=False),
+        sa.Column("from_status", incident_status, nullable=True),
+        sa.Column("to_status", incident_status, nullable=True),
+        sa.Column("payload_diff", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_audit_logs_archive_incident_id", "audit_logs_archive", ["incident_id"])
+    # Retention scans closed and draft incidents by last update.
+    op.create_index("ix_incidents_status_updated", "incidents", ["status", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_incidents_status_updated", table_name="incidents")
+    op.drop_index("ix_audit_logs_archive_incident_id", table_name="audit_logs_archive")
+    op.drop_table("audit_logs_archive")
+    op.drop_index("ix_incidents_archive_occurred_at", table_name="incidents_archive")
+    op.drop_table("incidents_archive")
@@ -0,0 +1,93 @@
+"""encrypt patient identifiers and add a blind index
+
+Revision ID: 0008_patient_blind_index
+Revises: 0007_incident_archive
+Create Date: 2026-10-19 00:50:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.app.security.patient_ids import blind_index, decrypt, encrypt
+
+revision = "0008_patient_blind_index"
+down_revision = "0007_incident_archive"
+branch_labels = None
+depends_on = None
+
+TABLES = ("incidents", "incidents_archive")
+INDEXES = {
+    "incidents": "ix_incidents_patient_blind_index_occurred_at",
+    "incidents_archive": "ix_incidents_archive_patient_blind_index_occurred_at",
+}
+BATCH_SIZE = 1000
+CIPHERTEXT_PATTERN = "v1:%"
+
+
+def _rewrite(table_name: str, encrypting: bool) -> None:
+    """Encrypt (or decrypt) identifiers in id-ordered batches, so memory stays flat on any table size.
+
+    Rows are picked by whether the identifier is already ciphertext, which
+    makes an interrupted run safe to repeat. Blank identifiers become NULL.
+    """
+    bind = op.get_bind()
+    table = sa.table(
+        table_name, sa.column("id", sa.Integer), sa.column("patient_identifier", sa.String), sa.column("patient_blind_index", sa.String)
+    )
+    encrypted = table.c.patient_identifier.like(CIPHERTEXT_PATTERN)
+    pending = sa.not_(encrypted) if encrypting else encrypted
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values(patient_identifier=sa.bindparam("identifier"), patient_blind_index=sa.bindparam("blind"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.patient_identifier)
+            .where(table.c.id > last_id, table.c.patient_identifier.is_not(None), pending)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        if encrypting:
+            values = [
+                {
+                    "row_id": row.id,
+                    "identifier": encrypt(row.patient_identifier) if row.patient_identifier.strip() else None,
+                    "blind": blind_index(row.patient_identifier),
+                }
+                for row in rows
+            ]
+        else:
+            values = [{"row_id": row.id, "identifier": decrypt(row.patient_identifier), "blind": None} for row in rows]
+        bind.execute(update, values)
+        last_id = rows[-1].id
+
+
+def _columns(table_name: str) -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table_name)}
+
+
+def _indexes(table_name: str) -> set[str]:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    # MySQL commits each DDL statement, so a failed run leaves part of this applied; skip what exists.
+    for table_name in TABLES:
+        if "patient_blind_index" not in _columns(table_name):
+            op.add_column(table_name, sa.Column("patient_blind_index", sa.String(length=32), nullable=True))
+        _rewrite(table_name, encrypting=True)
+        if INDEXES[table_name] not in _indexes(table_name):
+            op.create_index(INDEXES[table_name], table_name, ["patient_blind_index", "occurred_at"])
+
+
+def downgrade() -> None:
+    for table_name in TABLES:
+        if INDEXES[table_name] in _indexes(table_name):
+            op.drop_index(INDEXES[table_name], table_name=table_name)
+        if "patient_blind_index" in _columns(table_name):
+            _rewrite(table_name, encrypting=False)
+            op.drop_column(table_name, "patient_blind_index")
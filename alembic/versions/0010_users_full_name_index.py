@@ -0,0 +1,22 @@
+"""index users.full_name for the user directory
+
+Revision ID: 0010_users_full_name_index
+Revises: 0009_idempotency_keys
+Create Date: 2026-10-19 01:10:00
+"""
+
+from alembic import op
+
+revision = "0010_users_full_name_index"
+down_revision = "0009_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the q prefix search and the (full_name, id) keyset order of GET /v1/admin/users.
+    op.create_index("ix_users_full_name", "users", ["full_name"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_full_name", table_name="users")
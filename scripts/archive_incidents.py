@@ -0,0 +1,60 @@
+"""Archive old closed incidents, purge abandoned drafts and expired idempotency keys.
+
+Usage:
+    python scripts/archive_incidents.py --dry-run
+    python scripts/archive_incidents.py --closed-after-days 730 --drafts-after-days 90 --pause 0.2
+
+Closed incidents whose last update is older than ``--closed-after-days`` move,
+with their audit logs, to ``incidents_archive`` / ``audit_logs_archive``.
+Drafts untouched for ``--drafts-after-days`` are deleted. Work is done in
+batches of ``--batch-size`` rows, one short transaction each, so the job can
+run next to live traffic (from cron, for example). ``--pause`` sleeps between
+batches to further limit load on a busy primary. Idempotency keys past their
+TTL are deleted as well.
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from src.app.config import get_settings
+from src.app.db import engine
+from src.app.services.archival import archive_closed, purge_drafts
+from src.app.services.idempotency import purge_expired
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--closed-after-days", type=int, default=settings.archive_closed_after_days)
+    parser.add_argument("--drafts-after-days", type=int, default=settings.archive_drafts_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--skip-drafts", action="store_true", help="Only archive closed incidents")
+    parser.add_argument("--dry-run", action="store_true", help="Count what would be moved without changing anything")
+    args = parser.parse_args()
+
+    def session_factory() -> Session:
+        return Session(engine)
+
+    started = time.perf_counter()
+    archived = archive_closed(
+        session_factory, timedelta(days=args.closed_after_days), args.batch_size, args.pause, dry_run=args.dry_run
+    )
+    verb = "would archive" if args.dry_run else "archived"
+    print(f"{verb} {archived.archived} closed incidents ({archived.audit_logs} audit logs) in {archived.batches} batches")
+    if not args.skip_drafts:
+        purged = purge_drafts(
+            session_factory, timedelta(days=args.drafts_after_days), args.batch_size, args.pause, dry_run=args.dry_run
+        )
+        verb = "would purge" if args.dry_run else "purged"
+        print(f"{verb} {purged.purged_drafts} abandoned drafts in {purged.batches} batches")
+    if not args.dry_run:
+        print(f"purged {purge_expired(session_factory, args.batch_size)} expired idempotency keys")
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Re-classify historical incidents with the current model.
+
+Usage:
+    python scripts/backfill_predictions.py --workers 4 --chunk-size 2000
+
+Incidents are streamed in id order, scored in batches across a process pool
+and written back with bulk UPDATEs. Progress is checkpointed after every
+committed chunk, so an interrupted run resumes where it stopped; a
+checkpoint written for a different model version is ignored.
+
+If the model artifact is missing or cannot be loaded the run stops, rather
+than writing fallback-rule scores as if the model had produced them. Pass
+``--allow-fallback`` to score with the fallback rules on purpose.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from src.app.db import engine
+from src.app.models.department import Department  # noqa: F401 - register mappers
+from src.app.models.incident import Incident
+from src.app.models.location import Location  # noqa: F401
+from src.app.models.user import User  # noqa: F401
+from src.app.services.ml import IncidentClassifier
+
+_worker_classifier: IncidentClassifier | None = None
+
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+
+def load_classifier(model_path: str | None, allow_fallback: bool) -> IncidentClassifier:
+    classifier = IncidentClassifier(model_path)
+    if classifier.model is None and not allow_fallback:
+        raise ModelUnavailable(
+            f"model {classifier.model_path} is missing or failed to load; pass --allow-fallback to score with the fallback rules"
+        )
+    return classifier
+
+
+def _init_worker(model_path: str | None, allow_fallback: bool) -> None:
+    global _worker_classifier
+    # Checked again per worker: the artifact may change after the parent loaded it.
+    _worker_classifier = load_classifier(model_path, allow_fallback)
+
+
+def _score(batch: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    predictions = _worker_classifier.predict_batch([text for _, text in batch])
+    return [
+        {
+            "id": incident_id,
+            "predicted_category": prediction["category"],
+            "predicted_confidence": prediction["confidence"],
+            "model_version": prediction["model_version"],
+        }
+        for (incident_id, _), prediction in zip(batch, predictions)
+    ]
+
+
+def load_checkpoint(path: Path, model_version: str) -> Dict[str, Any]:
+    if path.exists():
+        checkpoint = json.loads(path.read_text())
+        if checkpoint.get("model_version") == model_version:
+            return checkpoint
+        print(f"checkpoint {path} is for model {checkpoint.get('model_version')}; starting over")
+    return {"model_version": model_version, "last_id": 0, "processed": 0}
+
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    staging = path.with_name(path.name + ".tmp")
+    staging.write_text(json.dumps(checkpoint))
+    os.replace(staging, path)
+
+
+def fetch_chunk(session: Session, after_id: int, chunk_size: int, model_version: str, only_stale: bool) -> List[Tuple[int, str]]:
+    statement = (
+        select(Incident.id, Incident.free_text_description)
+        .where(Incident.id > after_id)
+        .order_by(Incident.id)
+        .limit(chunk_size)
+    )
+    if only_stale:
+        statement = statement.where(or_(Incident.model_version.is_(None), Incident.model_version != model_version))
+    return [(row[0], row[1]) for row in session.exec(statement).all()]
+
+
+def run(
+    model_path: str | None,
+    workers: int,
+    chunk_size: int,
+    batch_size: int,
+    checkpoint_path: Path,
+    only_stale: bool,
+    restart: bool,
+    allow_fallback: bool = False,
+) -> None:
+    model_version = load_classifier(model_path, allow_fallback).model_version
+    if restart and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint = load_checkpoint(checkpoint_path, model_version)
+    print(f"backfilling with model {model_version} from id > {checkpoint['last_id']}")
+
+    started = time.perf_counter()
+    session_rows = 0
+    with Session(engine) as session, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(model_path, allow_fallback)
+    ) as pool:
+        # One chunk of look-ahead: the pool scores chunk N+1 while chunk N is written.
+        pending: Tuple[int, List[Future]] | None = None
+        after_id = checkpoint["last_id"]
+        while True:
+            chunk = fetch_chunk(session, after_id, chunk_size, model_version, only_stale)
+            submitted = None
+            if chunk:
+                after_id = chunk[-1][0]
+                batches = [chunk[i : i + batch_size] for i in range(0, len(chunk), batch_size)]
+                submitted = (after_id, [pool.submit(_score, batch) for batch in batches])
+            if pending is not None:
+                last_id, futures = pending
+                rows = [row for future in futures for row in future.result()]
+                session.execute(update(Incident), rows)
+                session.commit()
+                checkpoint["last_id"] = last_id
+                checkpoint["processed"] += len(rows)
+                save_checkpoint(checkpoint_path, checkpoint)
+                session_rows += len(rows)
+                elapsed = time.perf_counter() - started
+                print(f"id <= {last_id}: {checkpoint['processed']} rows total, {session_rows / elapsed:,.0f} rows/s")
+            pending = submitted
+            if pending is None:
+                break
+
+    elapsed = time.perf_counter() - started
+    rate = session_rows / elapsed if elapsed else 0.0
+    print(f"done: {session_rows} rows in {elapsed:.1f}s ({rate:,.0f} rows/s); checkpoint at id {checkpoint['last_id']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", help="Artifact to score with (defaults to MODEL_PATH)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched and committed per round trip")
+    parser.add_argument("--batch-size", type=int, default=250, help="Rows per inference task")
+    parser.add_argument("--checkpoint", type=Path, default=Path(".backfill_checkpoint.json"))
+    parser.add_argument("--only-stale", action="store_true", help="Skip rows already scored by this model version")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--allow-fallback", action="store_true", help="Score with the fallback rules if the model cannot be loaded")
+    args = parser.parse_args()
+    try:
+        run(
+            args.model_path,
+            args.workers,
+            args.chunk_size,
+            args.batch_size,
+            args.checkpoint,
+            args.only_stale,
+            args.restart,
+            args.allow_fallback,
+        )
+    except ModelUnavailable as exc:
+        raise SystemExit(f"error: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark the compiled keyword rules against the original substring heuristic.
+
+Usage:
+    python scripts/benchmark_rules.py --documents 200000 --extra-rules 0 100 1000 5000
+
+A reproducible synthetic corpus is scored with the legacy ``in`` chain, then
+with the compiled engine padded with N filler rules, to show that engine cost
+stays flat as the rules table grows while the naive per-rule scan does not.
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import Callable, List
+
+from src.app.models.incident import IncidentCategory
+from src.app.services.classifier.rules import DEFAULT_RULES_TABLE, RulesEngine
+
+FRAGMENTS = [
+    "pasien", "perawat", "ruang", "mawar", "melati", "kamar mandi", "tempat tidur", "infus", "obat",
+    "jatuh", "terjatuh", "hampir", "luka", "memar", "dosis", "salah", "label", "darah", "media", "medis",
+    "remedi", "monitor", "lantai", "licin", "berpotensi", "meninggal", "operasi", "shift", "malam", "pagi",
+]
+
+
+def legacy_heuristic(text: str) -> IncidentCategory:
+    lower = text.lower()
+    if "jatuh" in lower or "fall" in lower:
+        return IncidentCategory.KTD
+    if "med" in lower or "obat" in lower:
+        return IncidentCategory.KNC
+    return IncidentCategory.KTC
+
+
+def naive_rule_scan(table: dict) -> Callable[[str], int]:
+    phrases = [phrase for entry in table["rules"] for phrase in entry["phrases"]]
+
+    def scan(text: str) -> int:
+        lower = text.lower()
+        return sum(1 for phrase in phrases if phrase in lower)
+
+    return scan
+
+
+def build_corpus(documents: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(8, 40))) for _ in range(documents)]
+
+
+def padded_table(extra_rules: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    filler = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))) for _ in range(extra_rules)]
+    table = {"default": DEFAULT_RULES_TABLE["default"], "rules": list(DEFAULT_RULES_TABLE["rules"])}
+    if filler:
+        table["rules"].append({"category": "KPCS", "weight": 0.1, "phrases": filler})
+    return table
+
+
+def timed(label: str, func: Callable[[], object], documents: int) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<48} {elapsed:8.3f}s {documents / elapsed:12,.0f} docs/s")
+    return elapsed
+
+
+def run(documents: int, extra_rules: List[int], seed: int) -> None:
+    corpus = build_corpus(documents, seed)
+    print(f"{documents:,} synthetic documents, seed {seed}")
+    timed("legacy substring heuristic", lambda: [legacy_heuristic(text) for text in corpus], documents)
+    for extra in extra_rules:
+        table = padded_table(extra, seed)
+        started = time.perf_counter()
+        engine = RulesEngine.from_table(table)
+        compile_ms = (time.perf_counter() - started) * 1000
+        total = len(engine.rules)
+        timed(f"compiled engine, {total} rules (+{compile_ms:.0f}ms compile)", lambda: engine.score_batch(corpus), documents)
+        scan = naive_rule_scan(table)
+        timed(f"naive per-rule scan, {total} rules", lambda: [scan(text) for text in corpus], documents)
+
+    engine = RulesEngine.from_table(DEFAULT_RULES_TABLE)
+    agree = sum(legacy_heuristic(text) == engine.score(text)["category"] for text in corpus)
+    print(f"agreement with legacy heuristic: {agree / documents:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--extra-rules", type=int, nargs="*", default=[0, 100, 1000, 5000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.documents, args.extra_rules, args.seed)
+
+
+if __name__ == "__main__":
+    main()
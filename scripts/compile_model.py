@@ -0,0 +1,65 @@
+"""Compile a scikit-learn incident classifier into a NumPy-only artifact.
+
+Usage:
+    python scripts/compile_model.py --model models/incident_classifier.pkl \
+        --out models/incident_classifier --corpus corpus.txt
+
+The compiled directory can be used directly as ``MODEL_PATH``. Export is
+refused unless the compiled scorer reproduces the pipeline's labels and
+probabilities on the verification corpus.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+
+from src.app.services.classifier.compiled import compile_pipeline, export_compiled, verify_compiled
+
+DEFAULT_CORPUS = [
+    "Pasien jatuh dari tempat tidur saat malam hari",
+    "Kesalahan pemberian obat, dosis tertukar dengan pasien lain",
+    "Hampir terjadi salah transfusi darah, terdeteksi sebelum diberikan",
+    "Infus macet dan area penusukan bengkak",
+    "Pasien meninggal tidak terduga setelah tindakan operasi",
+    "Alat monitor tidak berfungsi saat visite",
+]
+
+
+def load_corpus(path: str | None) -> list[str]:
+    if path is None:
+        return DEFAULT_CORPUS
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line.strip()]
+
+
+def run(model_path: str, out_dir: str, corpus_path: str | None, version: str | None, atol: float) -> int:
+    pipeline = joblib.load(model_path)
+    scorer = compile_pipeline(pipeline, model_version=version)
+    report = verify_compiled(pipeline, scorer, load_corpus(corpus_path), atol=atol)
+    print(
+        f"verified {report['documents']} documents: labels_match={report['labels_match']} "
+        f"max_abs_proba_diff={report['max_abs_proba_diff']:.3e}"
+    )
+    if not report["ok"]:
+        print("compiled scorer does not match the source pipeline; nothing exported", file=sys.stderr)
+        return 1
+    target = export_compiled(scorer, out_dir)
+    print(f"exported {scorer.meta['model_version']} ({scorer.coef.shape[0]} features) to {target}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/incident_classifier.pkl")
+    parser.add_argument("--out", default="models/incident_classifier")
+    parser.add_argument("--corpus", help="Text file with one verification document per line")
+    parser.add_argument("--version", help="Model version to record (defaults to the pipeline's `version`)")
+    parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args()
+    sys.exit(run(args.model, args.out, args.corpus, args.version, args.atol))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Deliver outbox messages (incident transitions) to a downstream sink.
+
+Usage:
+    PYTHONPATH=. python scripts/dispatch_outbox.py                       # OUTBOX_* settings
+    PYTHONPATH=. python scripts/dispatch_outbox.py --sink webhook --url https://mutu.example/hooks/incidents
+    PYTHONPATH=. python scripts/dispatch_outbox.py --sink file --path exports/outbox.jsonl --once
+    PYTHONPATH=. python scripts/dispatch_outbox.py --status                # backlog only
+    PYTHONPATH=. python scripts/dispatch_outbox.py --requeue-dead          # retry dead letters
+
+Runs separately from the API. Each round claims up to --batch-size due
+messages, sends them as one batch and marks them dispatched; failures back off
+exponentially. --metrics-port serves delivery lag and backlog gauges in
+Prometheus format. Several dispatchers may run against MySQL at once.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import update
+from sqlmodel import Session
+
+from src.app.config import get_settings
+from src.app.db import engine
+from src.app.models.outbox import OutboxMessage
+from src.app.observability.logs import configure_logging, shutdown_logging
+from src.app.observability.metrics import REGISTRY
+from src.app.services.outbox import Dispatcher, FileSink, WebhookSink
+
+
+def build_sink(name: str, url: str | None, path: str):
+    if name == "webhook":
+        if not url:
+            raise SystemExit("--url (or OUTBOX_WEBHOOK_URL) is required for the webhook sink")
+        return WebhookSink(url)
+    return FileSink(path)
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="outbox-metrics", daemon=True).start()
+    return server
+
+
+def requeue_dead(max_attempts: int) -> int:
+    with Session(engine) as session:
+        result = session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.dispatched_at.is_(None), OutboxMessage.attempts >= max_attempts)
+            .values(attempts=0)
+        )
+        session.commit()
+    return result.rowcount
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sink", choices=["webhook", "file"], default=settings.outbox_sink)
+    parser.add_argument("--url", default=settings.outbox_webhook_url, help="Webhook endpoint")
+    parser.add_argument("--path", default=settings.outbox_file_path, help="JSON lines file for the file sink")
+    parser.add_argument("--batch-size", type=int, default=settings.outbox_batch_size)
+    parser.add_argument("--max-attempts", type=int, default=settings.outbox_max_attempts)
+    parser.add_argument("--interval", type=float, default=settings.outbox_poll_seconds, help="Seconds between idle polls")
+    parser.add_argument("--once", action="store_true", help="Drain what is due and exit")
+    parser.add_argument("--status", action="store_true", help="Print the backlog and exit")
+    parser.add_argument("--requeue-dead", action="store_true", help="Reset attempts on dead messages and exit")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    listener = configure_logging(settings.log_level, settings.log_format, settings.log_debug_sample_rate)
+    try:
+        if args.requeue_dead:
+            print(f"requeued {requeue_dead(args.max_attempts)} dead messages")
+            return
+        sink = build_sink(args.sink, args.url, args.path)
+        dispatcher = Dispatcher(
+            lambda: Session(engine), sink, batch_size=args.batch_size, max_attempts=args.max_attempts
+        )
+        if args.status:
+            print(dispatcher.backlog())
+            return
+        if args.once:
+            result = dispatcher.drain()
+            print(f"delivered {result.delivered}, failed {result.failed}; backlog {dispatcher.backlog()}")
+            return
+
+        if args.metrics_port:
+            serve_metrics(args.metrics_port)
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        logging.getLogger(__name__).info("Dispatching outbox to %s sink", sink.name)
+        dispatcher.run_forever(args.interval, stop)
+        sink.close()
+    finally:
+        shutdown_logging(listener)
+
+
+if __name__ == "__main__":
+    main()
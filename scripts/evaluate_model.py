@@ -0,0 +1,150 @@
+"""Evaluate classifier artifacts against reviewed (closed) incidents.
+
+Usage:
+    python scripts/evaluate_model.py                       # stored predictions + MODEL_PATH
+    python scripts/evaluate_model.py --model-b models/candidate --json report.json
+
+The human label is ``final_category`` (falling back to ``mutu_decision`` and
+then ``pj_decision``). Stored ``predicted_category``/``predicted_confidence``
+are scored as-is; each artifact re-scores the same texts, so the columns are
+directly comparable. Latency is measured on single-text ``predict`` calls
+without the prediction cache.
+"""
+
+import argparse
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlmodel import Session, select
+
+from src.app.db import engine
+from src.app.models.department import Department  # noqa: F401 - register mappers
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.models.location import Location  # noqa: F401
+from src.app.models.user import User  # noqa: F401
+from src.app.services.classifier.evaluation import LABELS, ClassificationReport, measure_batch_throughput, measure_latency
+from src.app.services.ml import IncidentClassifier
+
+
+def _value(category: Any) -> str | None:
+    return getattr(category, "value", category)
+
+
+def stream_reviewed(session: Session, chunk_size: int, limit: int | None) -> Iterator[List[Tuple[str, str, str | None, float | None]]]:
+    """Yield chunks of (text, label, stored prediction, stored confidence) in id order."""
+    after_id = 0
+    emitted = 0
+    while limit is None or emitted < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - emitted)
+        rows = session.exec(
+            select(
+                Incident.id,
+                Incident.free_text_description,
+                Incident.final_category,
+                Incident.mutu_decision,
+                Incident.pj_decision,
+                Incident.predicted_category,
+                Incident.predicted_confidence,
+            )
+            .where(Incident.status == IncidentStatus.CLOSED, Incident.id > after_id)
+            .order_by(Incident.id)
+            .limit(size)
+        ).all()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        chunk = []
+        for _, text, final, mutu, pj, predicted, confidence in rows:
+            label = _value(final or mutu or pj)
+            if label is not None:
+                chunk.append((text, label, _value(predicted), confidence))
+        emitted += len(rows)
+        yield chunk
+
+
+def run(model_paths: List[str | None], chunk_size: int, limit: int | None, latency_samples: int, batch_size: int) -> Dict[str, Any]:
+    classifiers = [IncidentClassifier(path) for path in model_paths]
+    stored = ClassificationReport()
+    reports = [ClassificationReport() for _ in classifiers]
+    samples: List[str] = []
+
+    with Session(engine) as session:
+        for chunk in stream_reviewed(session, chunk_size, limit):
+            texts = [text for text, *_ in chunk]
+            for _, label, predicted, confidence in chunk:
+                stored.add(label, predicted, confidence)
+            for classifier, report in zip(classifiers, reports):
+                for (_, label, *_), prediction in zip(chunk, classifier.predict_batch(texts)):
+                    report.add(label, prediction["category"].value, prediction["confidence"])
+            samples.extend(texts[: max(0, latency_samples - len(samples))])
+
+    results: Dict[str, Any] = {"stored": stored.summary()}
+    for path, classifier, report in zip(model_paths, classifiers, reports):
+        summary = report.summary()
+        summary["model_version"] = classifier.model_version
+        summary["latency"] = measure_latency(classifier.predict, samples)
+        summary["latency"]["batch_throughput_per_s"] = measure_batch_throughput(classifier.predict_batch, samples, batch_size)
+        results[str(path or classifier.model_path)] = summary
+    return results
+
+
+def _fmt(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def print_side_by_side(results: Dict[str, Any]) -> None:
+    columns = list(results)
+    rows: List[Tuple[str, List[Any]]] = [
+        ("model_version", [results[c].get("model_version", "(stored)") for c in columns]),
+        ("rows", [results[c]["total"] for c in columns]),
+        ("accuracy", [results[c]["accuracy"] for c in columns]),
+        ("macro_f1", [results[c]["macro_f1"] for c in columns]),
+        ("ece", [results[c]["calibration"]["ece"] for c in columns]),
+        ("brier", [results[c]["calibration"]["brier"] for c in columns]),
+    ]
+    for label in LABELS:
+        rows.append((f"{label} precision", [results[c]["per_category"][label]["precision"] for c in columns]))
+        rows.append((f"{label} recall", [results[c]["per_category"][label]["recall"] for c in columns]))
+    for key in ("throughput_per_s", "batch_throughput_per_s", "p50_ms", "p99_ms"):
+        rows.append((key, [results[c].get("latency", {}).get(key) for c in columns]))
+
+    width = max(len(name) for name, _ in rows) + 2
+    col_width = max(14, *(len(c) + 2 for c in columns), *(len(_fmt(v)) + 2 for _, values in rows for v in values))
+    print("".ljust(width) + "".join(c.rjust(col_width) for c in columns))
+    for name, values in rows:
+        print(name.ljust(width) + "".join(_fmt(v).rjust(col_width) for v in values))
+
+    for column in columns:
+        print(f"\nconfusion matrix ({column}); rows = human label, columns = prediction")
+        confusion = results[column]["confusion"]
+        predicted_labels = LABELS + sorted({p for row in confusion.values() for p in row} - set(LABELS))
+        print("".ljust(10) + "".join(p.rjust(10) for p in predicted_labels))
+        for actual in LABELS:
+            print(actual.ljust(10) + "".join(str(confusion[actual].get(p, 0)).rjust(10) for p in predicted_labels))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-a", help="First artifact (defaults to MODEL_PATH)")
+    parser.add_argument("--model-b", help="Second artifact to compare side by side")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--limit", type=int, help="Stop after this many closed incidents")
+    parser.add_argument("--latency-samples", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    model_paths = [args.model_a] + ([args.model_b] if args.model_b else [])
+    results = run(model_paths, args.chunk_size, args.limit, args.latency_samples, args.batch_size)
+    print_side_by_side(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Flag likely duplicate reports among existing incidents.
+
+Usage:
+    python scripts/flag_duplicates.py --dry-run
+    python scripts/flag_duplicates.py --reset --window-hours 12 --threshold 0.6
+
+Submitted incidents are read in id order (submission order, roughly),
+``--chunk-size`` rows at a time, and matched with the same MinHash/LSH index
+that ``submit_incident`` uses: each report is compared with the reports
+before it, and a match sets its ``suspected_duplicate_of``. Each chunk's flags
+are written and committed before the next chunk is read, and entries that
+occurred more than ``--lookback-days`` before the newest report seen are
+evicted, which keeps memory flat on any table size. Without ``--reset``, rows
+that are already flagged keep their flag.
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from src.app.config import get_settings
+from src.app.db import engine
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.services.incidents.duplicates import INDEXED_COLUMNS, DuplicateIndex
+
+
+def run(window_hours: float, threshold: float, lookback_days: int, chunk_size: int, reset: bool, dry_run: bool) -> None:
+    index = DuplicateIndex(window_hours, threshold, lookback_days)
+    started = time.perf_counter()
+    scanned = flagged = 0
+    newest = None
+    last_id = 0
+    with Session(engine) as session:
+        if reset and not dry_run:
+            session.execute(update(Incident).values(suspected_duplicate_of=None))
+            session.commit()
+        # Keyset chunks, so each chunk's flags can be committed without ending a streamed result.
+        while True:
+            rows = session.exec(
+                select(*INDEXED_COLUMNS, Incident.suspected_duplicate_of)
+                .where(Incident.status != IncidentStatus.DRAFT, Incident.id > last_id)
+                .order_by(Incident.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            flags: List[Dict[str, int]] = []
+            for row in rows:
+                index.add(row)
+                match = index.find(row)
+                if match is not None and (reset or row.suspected_duplicate_of is None):
+                    flags.append({"id": row.id, "suspected_duplicate_of": match.incident_id})
+                newest = row.occurred_at if newest is None else max(newest, row.occurred_at)
+            if flags and not dry_run:
+                session.execute(update(Incident), flags)
+                session.commit()
+            scanned += len(rows)
+            flagged += len(flags)
+            last_id = rows[-1].id
+            index.evict(newest)
+            print(f"scanned {scanned} incidents, {flagged} duplicates, {len(index)} indexed")
+
+    elapsed = time.perf_counter() - started
+    verb = "would flag" if dry_run else "flagged"
+    print(f"done: scanned {scanned} incidents in {elapsed:.1f}s; {verb} {flagged} as duplicates")
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window-hours", type=float, default=settings.duplicate_window_hours)
+    parser.add_argument("--threshold", type=float, default=settings.duplicate_threshold, help="Minimum estimated similarity")
+    parser.add_argument("--lookback-days", type=int, default=7, help="How far back a report may have occurred and still match")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per chunk; each chunk is its own transaction")
+    parser.add_argument("--reset", action="store_true", help="Clear existing flags first")
+    parser.add_argument("--dry-run", action="store_true", help="Report counts without writing")
+    args = parser.parse_args()
+    run(args.window_hours, args.threshold, args.lookback_days, args.chunk_size, args.reset, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Drive a realistic incident workflow against a running instance and compare to a baseline.
+
+Usage:
+    # once per database: roles + load-test accounts (uses DATABASE_URL, like seed.py)
+    PYTHONPATH=. python scripts/loadtest.py --seed-only --create-schema
+
+    # run for 60s and compare with the committed SQLite baseline
+    PYTHONPATH=. python scripts/loadtest.py --base-url http://127.0.0.1:8000 --duration 60 \\
+        --baseline scripts/baselines/loadtest-sqlite.json
+
+    # refresh the baseline after an intentional change
+    PYTHONPATH=. python scripts/loadtest.py --duration 60 --save-baseline scripts/baselines/loadtest-sqlite.json
+
+Reporters log in, create a draft, submit it and page through their list; PJ
+and Mutu reviewers poll their queues and move incidents through review and
+closing. Reviewers racing for the same incident get 409s, which are counted as
+conflicts rather than errors. Latency is measured per endpoint template.
+Compare only runs taken on the same hardware, database and mix, each against a
+freshly seeded database: list latency grows with the number of incidents.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+LOADTEST_PASSWORD = "LoadTest123!"
+DESCRIPTIONS = [
+    "Pasien jatuh dari tempat tidur saat perawat mengganti infus di ruang mawar",
+    "Hampir terjadi salah pemberian obat karena label dosis tertukar",
+    "Pasien mengalami memar setelah terpeleset di kamar mandi yang licin",
+    "Nyaris salah identifikasi pasien sebelum pengambilan sampel darah",
+    "Alat monitor berbunyi terlambat sehingga berpotensi cedera pada pasien",
+    "Keluarga pasien melaporkan obat diberikan terlambat dua jam",
+]
+CATEGORIES = ["KTD", "KTC", "KNC", "KPCS"]
+
+
+def account_email(role: str, index: int) -> str:
+    return f"loadtest-{role}-{index}@example.com"
+
+
+def seed_accounts(reporters: int, pj: int, mutu: int, create_schema: bool) -> None:
+    """Create roles and load-test users directly in DATABASE_URL; existing accounts are kept."""
+    from sqlmodel import Session, select
+
+    from src.app.db import engine, init_db
+    from src.app.models.department import Department  # noqa: F401 - register mappers
+    from src.app.models.incident import Incident  # noqa: F401
+    from src.app.models.location import Location  # noqa: F401
+    from src.app.models.role import Role
+    from src.app.models.user import User
+    from src.app.security.passwords import hash_password
+
+    from scripts.seed import DEFAULT_ROLES
+
+    if create_schema:
+        init_db()
+    # One hash for every account: hashing is deliberately slow.
+    hashed = hash_password(LOADTEST_PASSWORD)
+    with Session(engine) as session:
+        roles = {role.name: role for role in session.exec(select(Role)).all()}
+        for name, description in DEFAULT_ROLES.items():
+            if name not in roles:
+                roles[name] = Role(name=name, description=description)
+                session.add(roles[name])
+        existing = set(session.exec(select(User.email).where(User.email.like("loadtest-%"))).all())
+        created = 0
+        for role, count in (("perawat", reporters), ("pj", pj), ("mutu", mutu)):
+            for index in range(count):
+                email = account_email(role, index)
+                if email in existing:
+                    continue
+                user = User(email=email, full_name=f"Load Test {role} {index}", hashed_password=hashed, is_active=True)
+                user.roles.append(roles[role])
+                session.add(user)
+                created += 1
+        session.commit()
+    print(f"seeded {created} load-test accounts")
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, seconds: float, status: int | str) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+
+
+async def call(client: httpx.AsyncClient, stats: Stats, name: str, method: str, url: str, **kwargs: Any) -> httpx.Response | None:
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record(name, time.perf_counter() - started, "transport_error")
+        return None
+    stats.record(name, time.perf_counter() - started, response.status_code)
+    return response
+
+
+async def login(client: httpx.AsyncClient, stats: Stats, email: str) -> Dict[str, str] | None:
+    response = await call(client, stats, "POST /v1/auth/login", "POST", "/v1/auth/login", json={"email": email, "password": LOADTEST_PASSWORD})
+    if response is None or response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+async def reporter(client: httpx.AsyncClient, stats: Stats, email: str, deadline: float, rng: random.Random, relogin_every: int, list_pages: int) -> None:
+    headers = None
+    iteration = 0
+    while time.monotonic() < deadline:
+        if headers is None or iteration % relogin_every == 0:
+            headers = await login(client, stats, email)
+            if headers is None:
+                await asyncio.sleep(0.5)
+                continue
+        iteration += 1
+        payload = {"free_text_description": rng.choice(DESCRIPTIONS), "harm_indicator": rng.choice([None, "ringan", "sedang"])}
+        response = await call(client, stats, "POST /v1/incidents", "POST", "/v1/incidents", json=payload, headers=headers)
+        if response is None or response.status_code != 201:
+            continue
+        incident_id = response.json()["data"]["id"]
+        await call(
+            client, stats, "POST /v1/incidents/{id}/submit", "POST", f"/v1/incidents/{incident_id}/submit",
+            json={"confirm_submit": True}, headers=headers,
+        )
+        for page in range(1, list_pages + 1):
+            await call(client, stats, "GET /v1/incidents", "GET", "/v1/incidents", params={"page": page, "per_page": 20}, headers=headers)
+        await call(client, stats, "GET /v1/incidents/{id}", "GET", f"/v1/incidents/{incident_id}", headers=headers)
+
+
+async def reviewer(client: httpx.AsyncClient, stats: Stats, email: str, stage: str, deadline: float, rng: random.Random) -> None:
+    queue_status = "SUBMITTED" if stage == "pj" else "PJ_REVIEWED"
+    headers = await login(client, stats, email)
+    if headers is None:
+        return
+    while time.monotonic() < deadline:
+        response = await call(
+            client, stats, f"GET /v1/incidents?status={queue_status}", "GET", "/v1/incidents",
+            params={"status": queue_status, "per_page": 20}, headers=headers,
+        )
+        items = response.json()["data"]["items"] if response is not None and response.status_code == 200 else []
+        if not items:
+            await asyncio.sleep(0.05)
+            continue
+        # Start at a random point so reviewers do not all fight over the head of the queue.
+        rng.shuffle(items)
+        for item in items[:5]:
+            review = {"category": rng.choice(CATEGORIES), "notes": "load test"}
+            response = await call(
+                client, stats, f"POST /v1/approvals/{{id}}/{stage}", "POST", f"/v1/approvals/{item['id']}/{stage}",
+                json=review, headers=headers,
+            )
+            if stage == "mutu" and response is not None and response.status_code == 200:
+                await call(client, stats, "POST /v1/approvals/{id}/close", "POST", f"/v1/approvals/{item['id']}/close", headers=headers)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(stats: Stats, elapsed: float) -> Dict[str, Dict[str, Any]]:
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for name in sorted(stats.latencies):
+        latencies = sorted(stats.latencies[name])
+        statuses = stats.statuses[name]
+        errors = sum(n for status, n in statuses.items() if status == "transport_error" or status >= 500)
+        conflicts = statuses.get(409, 0)
+        endpoints[name] = {
+            "count": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2),
+            "errors": errors,
+            "conflicts": conflicts,
+            "other_4xx": sum(n for s, n in statuses.items() if isinstance(s, int) and 400 <= s < 500 and s != 409),
+        }
+    return endpoints
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.reporters + args.pj + args.mutu)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        health = await client.get("/health")
+        health.raise_for_status()
+        started = time.monotonic()
+        deadline = started + args.duration
+        tasks = [
+            reporter(client, stats, account_email("perawat", i), deadline, random.Random(args.seed + i), args.relogin_every, args.list_pages)
+            for i in range(args.reporters)
+        ]
+        tasks += [reviewer(client, stats, account_email("pj", i), "pj", deadline, random.Random(args.seed + 1000 + i)) for i in range(args.pj)]
+        tasks += [reviewer(client, stats, account_email("mutu", i), "mutu", deadline, random.Random(args.seed + 2000 + i)) for i in range(args.mutu)]
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+    endpoints = summarize(stats, elapsed)
+    total = sum(e["count"] for e in endpoints.values())
+    return {
+        "config": {
+            "reporters": args.reporters,
+            "pj": args.pj,
+            "mutu": args.mutu,
+            "duration_s": args.duration,
+            "relogin_every": args.relogin_every,
+            "list_pages": args.list_pages,
+            "seed": args.seed,
+        },
+        "environment": {
+            "label": args.label,
+            "model_version": health.json().get("model_version"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total": {
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "errors": sum(e["errors"] for e in endpoints.values()),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    endpoints = results["endpoints"]
+    width = max(len(name) for name in endpoints) + 2 if endpoints else 10
+    header = ["count", "rps", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms", "errors", "conflicts", "other_4xx"]
+    print("endpoint".ljust(width) + "".join(h.rjust(10) for h in header))
+    for name, row in endpoints.items():
+        print(name.ljust(width) + "".join(str(row[h]).rjust(10) for h in header))
+    total = results["total"]
+    print(f"\n{total['requests']} requests in {results['elapsed_s']}s: {total['rps']} req/s, {total['errors']} errors")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_samples: int) -> List[str]:
+    """Return one line per regression: p95 or throughput worse than ``tolerance``, or new errors.
+
+    Latency and throughput are only judged on endpoints with ``min_samples`` calls in
+    both runs; below that a single slow request decides the p95.
+    """
+    regressions: List[str] = []
+    if baseline.get("config") != results["config"]:
+        print("warning: baseline was recorded with a different mix; comparison is indicative only")
+    print(f"\ncompared with baseline ({baseline.get('environment', {}).get('label')}), tolerance {tolerance:.0%}")
+    print("endpoint".ljust(44) + "p95 base".rjust(10) + "p95 now".rjust(10) + "rps base".rjust(10) + "rps now".rjust(10))
+    for name, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(name)
+        if current is None:
+            regressions.append(f"{name}: not exercised in this run")
+            continue
+        print(name.ljust(44) + f"{base['p95_ms']:>10}{current['p95_ms']:>10}{base['rps']:>10}{current['rps']:>10}")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+        if min(base["count"], current["count"]) < min_samples:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['rps']} -> {current['rps']} req/s")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--reporters", type=int, default=16, help="Concurrent perawat sessions")
+    parser.add_argument("--pj", type=int, default=2, help="Concurrent PJ reviewers")
+    parser.add_argument("--mutu", type=int, default=2, help="Concurrent Mutu reviewers")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--relogin-every", type=int, default=5, help="Reporter iterations per login")
+    parser.add_argument("--list-pages", type=int, default=2, help="List pages fetched per reporter iteration")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--label", default="local", help="Free-form environment label stored with the results")
+    parser.add_argument("--seed-users", action="store_true", help="Create roles and load-test accounts before running")
+    parser.add_argument("--seed-only", action="store_true", help="Only create accounts, do not run load")
+    parser.add_argument("--create-schema", action="store_true", help="Create tables first (SQLite quick start)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--min-samples", type=int, default=50, help="Skip latency checks on endpoints with fewer calls")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.seed_users or args.seed_only:
+        seed_accounts(args.reporters, args.pj, args.mutu, args.create_schema)
+        if args.seed_only:
+            return
+
+    results = asyncio.run(run_load(args))
+    print_report(results)
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance, args.min_samples)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
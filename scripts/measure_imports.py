@@ -0,0 +1,79 @@
+"""Measure how long importing the app (or any module) takes, per module.
+
+Usage:
+    PYTHONPATH=. python scripts/measure_imports.py                     # src.app.main
+    PYTHONPATH=. python scripts/measure_imports.py --module src.app.services.ml --top 40
+    PYTHONPATH=. python scripts/measure_imports.py --startup          # also run the lifespan
+
+Each run is a fresh interpreter with ``-X importtime``; the table lists the
+slowest modules by cumulative time (module plus everything it imported first)
+from the fastest run. ``--heavy`` flags modules that should stay lazy.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_HEAVY = ["joblib", "numpy", "scipy", "sklearn", "src.app.services.classifier.compiled"]
+
+SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter() - started
+startup = None
+if {startup}:
+    from fastapi.testclient import TestClient
+    started = time.perf_counter()
+    with TestClient({module}.app):
+        pass
+    startup = time.perf_counter() - started
+print(json.dumps({{"import_s": imported, "startup_s": startup, "loaded": sorted(sys.modules)}}), file=sys.stdout)
+"""
+
+
+def run_once(module: str, startup: bool) -> Tuple[Dict, List[Tuple[int, int, str]]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(module=module, startup=startup)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return json.loads(result.stdout.strip().splitlines()[-1]), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.app.main")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the fastest is reported")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--startup", action="store_true", help="Also time the app lifespan (model load and warm-up)")
+    parser.add_argument("--heavy", nargs="*", default=DEFAULT_HEAVY)
+    args = parser.parse_args()
+
+    runs = [run_once(args.module, args.startup) for _ in range(args.runs)]
+    summary, rows = min(runs, key=lambda run: run[0]["import_s"])
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\nimport {args.module}: {summary['import_s'] * 1000:.0f} ms (best of {args.runs})")
+    if summary["startup_s"] is not None:
+        print(f"lifespan startup: {summary['startup_s'] * 1000:.0f} ms")
+    loaded = [name for name in args.heavy if name in summary["loaded"]]
+    print(f"heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
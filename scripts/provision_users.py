@@ -0,0 +1,55 @@
+"""Create staff accounts in bulk from a CSV file.
+
+Usage:
+    PYTHONPATH=. python scripts/provision_users.py staff.csv --dry-run
+    PYTHONPATH=. python scripts/provision_users.py staff.csv --workers 8 --report outcomes.csv
+
+Columns: email, full_name, password and optionally roles (names separated by
+";", e.g. "perawat;pj"). Emails that already exist are skipped, so a file can
+be re-run after a partial failure. Same logic as POST /v1/admin/users/bulk.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+from sqlmodel import Session
+
+from src.app.db import engine
+from src.app.services.provisioning import ProvisioningError, outcomes_as_dicts, parse_csv, provision_users, summarize
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_file", type=Path)
+    parser.add_argument("--workers", type=int, help="Hashing processes (defaults to the CPU count)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per INSERT")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without creating anyone")
+    parser.add_argument("--report", type=Path, help="Write per-row outcomes to this CSV")
+    args = parser.parse_args()
+
+    try:
+        rows = parse_csv(args.csv_file.read_text(encoding="utf-8"))
+    except ProvisioningError as exc:
+        sys.exit(str(exc))
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        outcomes = provision_users(session, rows, args.workers, batch_size=args.batch_size, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - started
+
+    for outcome in outcomes:
+        if outcome.status not in {"created", "valid"}:
+            print(f"row {outcome.row} {outcome.email}: {outcome.status} - {outcome.message}")
+    if args.report:
+        with args.report.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=["row", "email", "status", "message", "user_id"])
+            writer.writeheader()
+            writer.writerows(outcomes_as_dicts(outcomes))
+    print(f"{len(rows)} rows in {elapsed:.1f}s: {summarize(outcomes)}")
+
+
+if __name__ == "__main__":
+    main()
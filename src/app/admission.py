@@ -0,0 +1,244 @@
+"""Admission control, load shedding and per-route statement timeouts.
+
+Under a surge, requests used to queue in the threadpool behind a saturated DB
+pool until clients timed out, and the backlog slowed recovery.
+``AdmissionMiddleware`` matches each request to its route before any work is
+done and admits it through a lane:
+
+* ``critical``: submit and the approvals. These may use every slot.
+* ``standard``: everything else. It leaves ``ADMISSION_CRITICAL_RESERVE``
+  slots for critical requests.
+* ``bulk``: lists, exports and reports. At most ``ADMISSION_BULK_LIMIT`` of
+  these run at once.
+
+Routes in ``ROUTE_POLICIES`` may also cap their own concurrency. A request that
+cannot start yet waits in its lane's queue; whenever a slot frees up, critical
+waiters go first, then standard, then bulk. A request that finds its queue
+full (``ADMISSION_QUEUE_SIZE``), or waits longer than
+``ADMISSION_QUEUE_TIMEOUT_SECONDS``, is answered 503 with ``Retry-After``
+straight away, so clients back off instead of piling up.
+
+The policy also carries the route's DB statement timeout. It is put on the
+request context, and ``db.get_session`` applies it to the session.
+
+The limits are per worker process. Size ``ADMISSION_MAX_CONCURRENCY`` to the
+DB pool (``pool_size`` + ``max_overflow``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+
+from .observability.context import current_request
+from .observability.metrics import REGISTRY, Counter as MetricCounter
+
+CRITICAL = "critical"
+STANDARD = "standard"
+BULK = "bulk"
+LANES = (CRITICAL, STANDARD, BULK)  # highest priority first
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    lane: str | None = STANDARD  # None: not admission controlled (streams, health checks)
+    limit: int | None = None  # concurrent requests for this route alone
+    statement_timeout_ms: int | None = None  # None: DB_STATEMENT_TIMEOUT_MS
+
+
+ROUTE_POLICIES: Dict[Tuple[str, str], RoutePolicy] = {
+    ("GET", "/health"): RoutePolicy(lane=None),
+    ("GET", "/metrics"): RoutePolicy(lane=None),
+    ("GET", "/v1/events/incidents"): RoutePolicy(lane=None),
+    ("POST", "/v1/incidents/{incident_id}/submit"): RoutePolicy(lane=CRITICAL),
+    ("POST", "/v1/approvals/{incident_id}/pj"): RoutePolicy(lane=CRITICAL),
+    ("POST", "/v1/approvals/{incident_id}/mutu"): RoutePolicy(lane=CRITICAL),
+    ("POST", "/v1/approvals/{incident_id}/close"): RoutePolicy(lane=CRITICAL),
+    ("GET", "/v1/incidents"): RoutePolicy(lane=BULK, statement_timeout_ms=10_000),
+    ("GET", "/v1/incidents/{incident_id}/similar"): RoutePolicy(lane=BULK),
+    ("GET", "/v1/admin/users"): RoutePolicy(lane=BULK),
+    ("POST", "/v1/admin/users/bulk"): RoutePolicy(lane=BULK, limit=1, statement_timeout_ms=60_000),
+    ("POST", "/v1/reports"): RoutePolicy(lane=BULK, limit=2, statement_timeout_ms=30_000),
+    ("GET", "/v1/reports/{job_id}/download"): RoutePolicy(lane=BULK),
+}
+
+REQUESTS_SHED = REGISTRY.register(
+    MetricCounter("http_requests_shed_total", "Requests answered 503 by admission control.", ("lane", "route", "reason"))
+)
+
+
+@dataclass(eq=False)
+class Ticket:
+    lane: str
+    route: str
+    limit: int | None
+    future: asyncio.Future | None = None
+
+
+@dataclass
+class _Lane:
+    limit: int
+    queue_size: int
+    active: int = 0
+    waiters: Deque[Ticket] = field(default_factory=deque)
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """Slot accounting for one worker process; only touched from the event loop thread."""
+
+    def __init__(
+        self,
+        capacity: int,
+        critical_reserve: int = 0,
+        bulk_limit: int | None = None,
+        queue_size: int = 50,
+        queue_timeout_seconds: float = 5.0,
+    ) -> None:
+        self.capacity = capacity
+        self.queue_timeout_seconds = queue_timeout_seconds
+        standard_limit = max(1, capacity - critical_reserve)
+        self.lanes = {
+            CRITICAL: _Lane(capacity, queue_size),
+            STANDARD: _Lane(standard_limit, queue_size),
+            BULK: _Lane(min(bulk_limit or standard_limit, standard_limit), queue_size),
+        }
+        self.active = 0
+        self._routes: Counter[str] = Counter()
+
+    def _fits(self, ticket: Ticket) -> bool:
+        lane = self.lanes[ticket.lane]
+        if self.active >= self.capacity or lane.active >= lane.limit:
+            return False
+        return ticket.limit is None or self._routes[ticket.route] < ticket.limit
+
+    def _queued_ahead(self, lane_name: str) -> bool:
+        for name in LANES:
+            if self.lanes[name].waiters:
+                return True
+            if name == lane_name:
+                return False
+        return False
+
+    def _start(self, ticket: Ticket) -> None:
+        self.active += 1
+        self.lanes[ticket.lane].active += 1
+        self._routes[ticket.route] += 1
+
+    def _dispatch(self) -> None:
+        for name in LANES:
+            for ticket in list(self.lanes[name].waiters):
+                if self.active >= self.capacity:
+                    return
+                if ticket.future.done():  # timed out or cancelled; acquire cleans up
+                    continue
+                if self._fits(ticket):
+                    self.lanes[name].waiters.remove(ticket)
+                    self._start(ticket)
+                    ticket.future.set_result(None)
+
+    async def acquire(self, lane: str, route: str, limit: int | None = None) -> Ticket:
+        """Wait for a slot; raises ``Overloaded`` when the queue is full or the wait times out."""
+        ticket = Ticket(lane, route, limit)
+        if not self._queued_ahead(lane) and self._fits(ticket):
+            self._start(ticket)
+            return ticket
+        waiters = self.lanes[lane].waiters
+        if len(waiters) >= self.lanes[lane].queue_size:
+            raise Overloaded("queue_full")
+        ticket.future = asyncio.get_running_loop().create_future()
+        waiters.append(ticket)
+        try:
+            await asyncio.wait_for(ticket.future, self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise Overloaded("queue_timeout") from None
+        except asyncio.CancelledError:
+            # The client went away just after a slot was handed to it.
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(ticket)
+            raise
+        finally:
+            if ticket in waiters:
+                waiters.remove(ticket)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        self.active -= 1
+        self.lanes[ticket.lane].active -= 1
+        self._routes[ticket.route] -= 1
+        if not self._routes[ticket.route]:
+            del self._routes[ticket.route]
+        self._dispatch()
+
+    def queued(self) -> Dict[str, int]:
+        return {name: len(lane.waiters) for name, lane in self.lanes.items()}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware; sits inside the request-context and metrics middleware."""
+
+    def __init__(
+        self,
+        app: Any,
+        routes: Iterable[BaseRoute],
+        controller: AdmissionController | None,
+        statement_timeout_ms: int | None,
+        retry_after_seconds: int = 2,
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.controller = controller
+        self.statement_timeout_ms = statement_timeout_ms
+        self.retry_after_seconds = retry_after_seconds
+
+    def _match(self, scope: Dict[str, Any]) -> BaseRoute | None:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = self._match(scope)
+        path = getattr(route, "path", None)
+        policy = ROUTE_POLICIES.get((scope["method"], path), RoutePolicy()) if path else RoutePolicy(lane=None)
+        context = current_request()
+        if context is not None:
+            context.statement_timeout_ms = policy.statement_timeout_ms or self.statement_timeout_ms
+
+        if self.controller is None or policy.lane is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            ticket = await self.controller.acquire(policy.lane, path, policy.limit)
+        except Overloaded as exc:
+            scope["route"] = route  # so metrics and the access log name the route
+            REQUESTS_SHED.inc(policy.lane, path, exc.reason)
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error_code": "service_overloaded",
+                    "message": "Server is busy, retry later",
+                    "details": {"lane": policy.lane, "reason": exc.reason},
+                },
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(ticket)
@@ -18,13 +18,72 @@ class Settings(BaseSettings):
     database_url: str = Field(default="mysql+mysqlconnector://user:password@db:3306/akreditasi")
     jwt_secret_key: str = Field(default="r38jeiuffqn5MCykB4cJcV1sP3GYJy7iXYAYMsIT1nYt7kqF70rhqRBAUGGvs4Tz")
     jwt_refresh_secret_key: str = Field(default="WDjmWEe1lGGyN0tpK8aI5SwjGWIgj5fQtDXxGB96t5W4E9dEBuPGYioBMHUjh0hZ")
+    # No defaults: a published key would protect nothing. The app refuses to start without them.
+    patient_encryption_key: str | None = Field(default=None)
+    patient_blind_index_key: str | None = Field(default=None)
     jwt_algorithm: str = Field(default="HS256")
     access_token_expires_minutes: int = Field(default=30)
     refresh_token_expires_minutes: int = Field(default=60 * 24 * 7)
     password_hashing_scheme: str = Field(default="bcrypt")
     token_version: int = Field(default=1)
     model_path: str = Field(default="models/incident_classifier.pkl")
-    model_fallback_version: str = Field(default="fallback-rule-0.1")
+    model_fallback_version: str = Field(default="fallback-rule-0.2")
+    classifier_rules_path: str | None = Field(default=None)
+    model_reload_interval_seconds: float = Field(default=5.0)
+    prediction_cache_size: int = Field(default=4096)
+    metrics_enabled: bool = Field(default=True)
+    log_repeated_statements: bool = Field(default=False)
+    log_level: str = Field(default="INFO")
+    log_format: str = Field(default="json")
+    log_debug_sample_rate: float = Field(default=1.0)
+    server_timing_enabled: bool = Field(default=False)
+    profiling_enabled: bool = Field(default=False)
+    profile_dir: str = Field(default="profiles")
+    profile_sample_interval_ms: float = Field(default=5.0)
+    profile_max_stored: int = Field(default=200)
+    attachment_storage: str = Field(default="local")
+    attachment_dir: str = Field(default="data/attachments")
+    attachment_max_bytes: int = Field(default=25 * 1024 * 1024)
+    attachment_s3_bucket: str = Field(default="incident-attachments")
+    attachment_s3_endpoint_url: str | None = Field(default=None)
+    attachment_s3_region: str | None = Field(default=None)
+    incident_events_backend: str = Field(default="memory")
+    incident_events_poll_seconds: float = Field(default=1.0)
+    incident_events_buffer_size: int = Field(default=1000)
+    incident_events_queue_size: int = Field(default=100)
+    incident_events_heartbeat_seconds: float = Field(default=15.0)
+    outbox_sink: str = Field(default="file")
+    outbox_webhook_url: str | None = Field(default=None)
+    outbox_file_path: str = Field(default="data/outbox.jsonl")
+    outbox_batch_size: int = Field(default=100)
+    outbox_max_attempts: int = Field(default=10)
+    outbox_poll_seconds: float = Field(default=1.0)
+    provisioning_workers: int | None = Field(default=None)
+    provisioning_max_rows: int = Field(default=5000)
+    report_dir: str = Field(default="data/reports")
+    report_workers: int = Field(default=2)
+    report_stale_after_seconds: float = Field(default=1800.0)
+    duplicate_detection_enabled: bool = Field(default=True)
+    duplicate_window_hours: float = Field(default=12.0)
+    duplicate_threshold: float = Field(default=0.6)
+    duplicate_index_days: int = Field(default=30)
+    similarity_index_path: str = Field(default="data/similar_incidents.npz")
+    similarity_snapshot_every: int = Field(default=100)
+    archive_closed_after_days: int = Field(default=730)
+    archive_drafts_after_days: int = Field(default=90)
+    archive_batch_size: int = Field(default=500)
+    idempotency_ttl_hours: float = Field(default=24.0)
+    idempotency_wait_seconds: float = Field(default=10.0)
+    idempotency_lock_seconds: float = Field(default=60.0)
+    admission_enabled: bool = Field(default=True)
+    admission_max_concurrency: int = Field(default=15)
+    admission_critical_reserve: int = Field(default=3)
+    admission_bulk_limit: int = Field(default=4)
+    admission_queue_size: int = Field(default=50)
+    admission_queue_timeout_seconds: float = Field(default=5.0)
+    admission_retry_after_seconds: int = Field(default=2)
+    db_statement_timeout_ms: int = Field(default=5000)
+    report_statement_timeout_ms: int = Field(default=300000)
 
 
 @lru_cache
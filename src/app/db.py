@@ -1,17 +1,48 @@
 from collections.abc import Generator
 
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 
 from .config import get_settings
+from .observability.context import current_request
+from .observability.metrics import instrument_engine
 
 settings = get_settings()
 engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True)
+if settings.metrics_enabled:
+    instrument_engine(engine)
+
+STATEMENT_TIMEOUT_KEY = "statement_timeout_ms"
 
 
 def init_db() -> None:
     SQLModel.metadata.create_all(bind=engine)
 
 
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    """Apply ``session.info["statement_timeout_ms"]`` to the connection the transaction runs on.
+
+    MySQL's ``max_execution_time`` lives on the pooled connection, so it is
+    reset to 0 (no limit) for sessions that did not ask for one, and only sent
+    when it changes. It caps SELECTs only. PostgreSQL scopes it to the
+    transaction. SQLite has no statement timeout.
+    """
+    timeout_ms = int(session.info.get(STATEMENT_TIMEOUT_KEY) or 0)
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        if connection.info.get(STATEMENT_TIMEOUT_KEY, 0) != timeout_ms:
+            connection.exec_driver_sql(f"SET SESSION max_execution_time = {timeout_ms}")
+            connection.info[STATEMENT_TIMEOUT_KEY] = timeout_ms
+    elif dialect == "postgresql" and timeout_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
+        # Set per route by the admission middleware; DB_STATEMENT_TIMEOUT_MS otherwise.
+        context = current_request()
+        session.info[STATEMENT_TIMEOUT_KEY] = (
+            context.statement_timeout_ms if context is not None and context.statement_timeout_ms else settings.db_statement_timeout_ms
+        )
         yield session
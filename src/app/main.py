@@ -1,19 +1,52 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlmodel import Session
 
+from .admission import AdmissionController, AdmissionMiddleware
 from .config import get_settings
-from .routers import admin, approvals, auth, incidents, references
+from .db import engine
+from .observability.logs import RequestContextMiddleware, configure_logging, shutdown_logging
+from .observability.metrics import REGISTRY, MetricsMiddleware
+from .observability.profiling import ProfilingMiddleware, profile_store
+from .routers import admin, approvals, attachments, auth, events, incidents, patients, references, reports
 from .security.jwt import decode_token
+from .security.patient_ids import check_keys
+from .services.idempotency import REPLAY_HEADER, IdempotentReplay
+from .services.incidents.events import AuditLogPoller, broadcaster
+from .services.ml import model_manager
+from .services.reports.jobs import get_report_runner
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    listener = configure_logging(settings.log_level, settings.log_format, settings.log_debug_sample_rate)
+    check_keys()
+    model_manager.load()
+    model_manager.start_watcher(settings.model_reload_interval_seconds)
+    poller = None
+    if settings.incident_events_backend == "database":
+        poller = AuditLogPoller(lambda: Session(engine), broadcaster, settings.incident_events_poll_seconds)
+        poller.start()
+    try:
+        yield
+    finally:
+        if poller is not None:
+            poller.stop()
+        get_report_runner().shutdown()
+        model_manager.stop_watcher()
+        shutdown_logging(listener)
+
+
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
@@ -24,7 +57,9 @@ app = FastAPI(
         {"name": "Approvals", "description": "PJ and Mutu approval workflows"},
         {"name": "Admin", "description": "Administrative endpoints"},
         {"name": "References", "description": "Reference data"},
+        {"name": "Reports", "description": "Accreditation report jobs"},
     ],
+    lifespan=lifespan,
 )
 
 
@@ -43,6 +78,52 @@ async def attach_jwt_claims(request: Request, call_next):
     return response
 
 
+def _profiling_subject(headers) -> str | None:
+    """Return the user id when the bearer token carries the admin role."""
+    auth_header = headers.get("Authorization", "")
+    if not auth_header.lower().startswith("bearer "):
+        return None
+    try:
+        claims = decode_token(auth_header.split(" ", 1)[1])
+    except Exception:
+        return None
+    return claims.get("sub") if "admin" in claims.get("roles", []) else None
+
+
+# add_middleware wraps the current stack: the request-context middleware ends up
+# outermost, then metrics, then profiling, and all of them time the whole stack.
+# Admission control sits inside them so shed requests are still logged and counted.
+app.add_middleware(
+    AdmissionMiddleware,
+    routes=app.router.routes,
+    controller=AdmissionController(
+        settings.admission_max_concurrency,
+        critical_reserve=settings.admission_critical_reserve,
+        bulk_limit=settings.admission_bulk_limit,
+        queue_size=settings.admission_queue_size,
+        queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+    )
+    if settings.admission_enabled
+    else None,
+    statement_timeout_ms=settings.db_statement_timeout_ms,
+    retry_after_seconds=settings.admission_retry_after_seconds,
+)
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        authorize=_profiling_subject,
+        interval_seconds=settings.profile_sample_interval_ms / 1000,
+    )
+if settings.metrics_enabled or settings.server_timing_enabled or settings.profiling_enabled:
+    app.add_middleware(
+        MetricsMiddleware,
+        log_repeated_statements=settings.log_repeated_statements,
+        server_timing=settings.server_timing_enabled,
+    )
+app.add_middleware(RequestContextMiddleware)
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
@@ -55,13 +136,33 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(IdempotentReplay)
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay):
+    return JSONResponse(status_code=exc.status_code, content=exc.body, headers={REPLAY_HEADER: "true"})
+
+
 @app.get("/health", tags=["References"])
 def health_check() -> Dict[str, Any]:
-    return {"status": "ok", "app": settings.app_name, "holla": "Hollaa"}
+    return {
+        "status": "ok",
+        "app": settings.app_name,
+        "holla": "Hollaa",
+        "model_version": model_manager.model_version,
+        "prediction_cache": model_manager.cache.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 app.include_router(auth.router)
 app.include_router(incidents.router)
+app.include_router(patients.router)
+app.include_router(attachments.router)
+app.include_router(events.router)
 app.include_router(approvals.router)
 app.include_router(admin.router)
 app.include_router(references.router)
+app.include_router(reports.router)
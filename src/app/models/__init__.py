@@ -0,0 +1,29 @@
+"""Importing any model module imports this package first, so every table is
+registered with SQLAlchemy before relationships are configured."""
+
+from .archive import audit_logs_archive, incidents_archive
+from .attachment import AttachmentBlob
+from .department import Department
+from .idempotency import IdempotencyKey
+from .incident import AuditLog, Incident
+from .location import Location
+from .outbox import OutboxMessage
+from .report import ReportJob
+from .role import Role, UserRole
+from .user import User
+
+__all__ = [
+    "AttachmentBlob",
+    "AuditLog",
+    "Department",
+    "IdempotencyKey",
+    "Incident",
+    "Location",
+    "OutboxMessage",
+    "ReportJob",
+    "Role",
+    "User",
+    "UserRole",
+    "audit_logs_archive",
+    "incidents_archive",
+]
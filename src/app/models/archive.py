@@ -0,0 +1,29 @@
+"""Archive copies of ``incidents`` and ``audit_logs``.
+
+Same columns as the live tables plus ``archived_at``. There are no foreign
+keys, so archived rows never block changes to the live tables, and no ORM
+classes: rows are only moved with INSERT ... SELECT and read back by id
+(see ``services/archival.py``).
+"""
+
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlmodel import SQLModel
+
+from .incident import AuditLog, Incident
+
+
+def _archive_of(source: Table, name: str, *indexes: Index) -> Table:
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+        for column in source.columns
+    ]
+    return Table(name, SQLModel.metadata, *columns, Column("archived_at", DateTime, nullable=False), *indexes)
+
+
+incidents_archive = _archive_of(
+    Incident.__table__,
+    "incidents_archive",
+    Index("ix_incidents_archive_occurred_at", "occurred_at"),
+    Index("ix_incidents_archive_patient_blind_index_occurred_at", "patient_blind_index", "occurred_at"),
+)
+audit_logs_archive = _archive_of(AuditLog.__table__, "audit_logs_archive", Index("ix_audit_logs_archive_incident_id", "incident_id"))
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger
+from sqlmodel import Column, Field
+
+from .base import TimestampedModel
+
+
+class AttachmentBlob(TimestampedModel, table=True):
+    """One row per distinct file content; incidents reference blobs by ``sha256``."""
+
+    __tablename__ = "attachment_blobs"
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    size_bytes: int = Field(sa_column=Column(BigInteger, nullable=False))
+    content_type: str = Field(default="application/octet-stream", max_length=255)
+    uploaded_by_id: int | None = Field(default=None, foreign_key="users.id")
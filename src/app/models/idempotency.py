@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Column, Field
+
+from ..security.patient_ids import EncryptedText
+from .base import IDModel, TimestampedModel
+
+
+class IdempotencyKey(IDModel, TimestampedModel, table=True):
+    """A client ``Idempotency-Key`` and the response it produced.
+
+    The row is inserted before the request runs, and the unique constraint
+    decides which of several concurrent requests goes ahead. Until that
+    request finishes, ``response_status`` is NULL. The response body can
+    contain patient identifiers, so it is stored encrypted.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id: int = Field(foreign_key="users.id")
+    key: str = Field(max_length=255)
+    fingerprint: str = Field(max_length=64)
+    response_status: Optional[int] = Field(default=None)
+    response_body: Optional[str] = Field(default=None, sa_column=Column(EncryptedText(), nullable=True))
+    expires_at: datetime
@@ -2,9 +2,10 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index, event, inspect
 from sqlmodel import Column, Enum as SQLEnum, Field, Relationship
 
+from ..security.patient_ids import BLIND_INDEX_LENGTH, EncryptedString, blind_index
 from .base import IDModel, TimestampedModel
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -33,9 +34,12 @@ class IncidentCategory(str, Enum):
 
 class Incident(IDModel, TimestampedModel, table=True):
     __tablename__ = "incidents"
+    # Serves the patient timeline: equality on the blind index, ordered by time.
+    __table_args__ = (Index("ix_incidents_patient_blind_index_occurred_at", "patient_blind_index", "occurred_at"),)
 
     reporter_id: int = Field(foreign_key="users.id", index=True)
-    patient_identifier: Optional[str] = Field(default=None, index=True)
+    patient_identifier: Optional[str] = Field(default=None, sa_column=Column(EncryptedString(), nullable=True))
+    patient_blind_index: Optional[str] = Field(default=None, max_length=BLIND_INDEX_LENGTH)
     occurred_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     location_id: Optional[int] = Field(default=None, foreign_key="locations.id")
     department_id: Optional[int] = Field(default=None, foreign_key="departments.id")
@@ -55,6 +59,7 @@ class Incident(IDModel, TimestampedModel, table=True):
     mutu_decision: Optional[IncidentCategory] = Field(default=None, sa_column=Column(SQLEnum(IncidentCategory), nullable=True))
     mutu_notes: Optional[str] = Field(default=None)
     final_category: Optional[IncidentCategory] = Field(default=None, sa_column=Column(SQLEnum(IncidentCategory), nullable=True))
+    suspected_duplicate_of: Optional[int] = Field(default=None, foreign_key="incidents.id", index=True)
 
     reporter: "User" = Relationship(back_populates="reported_incidents")
     location: Optional["Location"] = Relationship(back_populates="incidents")
@@ -62,6 +67,16 @@ class Incident(IDModel, TimestampedModel, table=True):
     audit_logs: List["AuditLog"] = Relationship(back_populates="incident")
 
 
+@event.listens_for(Incident, "before_insert")
+@event.listens_for(Incident, "before_update")
+def _set_blind_index(mapper: object, connection: object, incident: Incident) -> None:
+    if inspect(incident).attrs.patient_identifier.history.has_changes():
+        # A blank identifier means "no patient"; storing it would encrypt text with no blind index.
+        if incident.patient_identifier is not None and not incident.patient_identifier.strip():
+            incident.patient_identifier = None
+        incident.patient_blind_index = blind_index(incident.patient_identifier)
+
+
 class AuditLog(IDModel, TimestampedModel, table=True):
     __tablename__ = "audit_logs"
 
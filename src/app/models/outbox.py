@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, Index
+from sqlmodel import Column, Field
+
+from .base import IDModel, TimestampedModel
+
+
+class OutboxMessage(IDModel, TimestampedModel, table=True):
+    """An event waiting to be delivered to downstream systems.
+
+    Rows are inserted in the same transaction as the change they describe and
+    sent later by ``scripts/dispatch_outbox.py``.
+    """
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (Index("ix_outbox_messages_pending", "dispatched_at", "available_at", "id"),)
+
+    topic: str = Field(max_length=100)
+    aggregate_id: int = Field(index=True)
+    payload: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    attempts: int = Field(default=0, nullable=False)
+    available_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    dispatched_at: Optional[datetime] = Field(default=None)
+    last_error: Optional[str] = Field(default=None, max_length=1000)
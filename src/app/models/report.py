@@ -0,0 +1,43 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from sqlalchemy import JSON, BigInteger, Index
+from sqlmodel import Column, Enum as SQLEnum, Field
+
+from .base import IDModel, TimestampedModel
+
+
+class ReportStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ReportJob(IDModel, TimestampedModel, table=True):
+    """One accreditation report build.
+
+    ``cache_key`` hashes the parameters together with the data watermark taken
+    when the job was requested, so a request for the same report over data that
+    has not changed since is answered with the existing job and artifact.
+    """
+
+    __tablename__ = "report_jobs"
+    __table_args__ = (Index("ix_report_jobs_cache_key_status", "cache_key", "status"),)
+
+    cache_key: str = Field(max_length=64)
+    format: str = Field(max_length=10)
+    parameters: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    watermark: str = Field(max_length=100)
+    status: ReportStatus = Field(
+        default=ReportStatus.PENDING,
+        sa_column=Column(SQLEnum(ReportStatus), default=ReportStatus.PENDING, nullable=False),
+    )
+    requested_by_id: int = Field(foreign_key="users.id")
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    row_count: Optional[int] = Field(default=None)
+    artifact_path: Optional[str] = Field(default=None, max_length=500)
+    size_bytes: Optional[int] = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    error: Optional[str] = Field(default=None, max_length=1000)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+@dataclass
+class RequestContext:
+    """Per-request accumulator shared by middleware, DB events and services.
+
+    The instance is set once per request; sync endpoints run in a worker
+    thread with a copy of the context, which still points at this object.
+    """
+
+    request_id: str | None = None
+    user_id: int | None = None
+    method: str | None = None
+    route: str | None = None
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    # Wall time per named phase (auth, ml, endpoint, serialize).
+    timings: dict[str, float] = field(default_factory=dict)
+    endpoint_finished: float | None = None
+    # Only collected when repeated-statement logging is on.
+    statements: Counter[str] | None = None
+    # Threads currently doing work for this request; only tracked while profiling.
+    threads: list[int] | None = None
+    # DB statement timeout for this request's sessions; set by the admission middleware.
+    statement_timeout_ms: int | None = None
+
+    def repeated_statements(self, threshold: int = 2) -> dict[str, int]:
+        if not self.statements:
+            return {}
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+_current: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def current_request() -> RequestContext | None:
+    return _current.get()
+
+
+def bind_request(context: RequestContext) -> Token:
+    return _current.set(context)
+
+
+def reset_request(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the wall time of the block to the current request's ``name`` timing."""
+    context = current_request()
+    if context is None:
+        yield
+        return
+    threads = context.threads
+    if threads is not None:
+        threads.append(threading.get_ident())
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        context.add_timing(name, time.perf_counter() - started)
+        if threads is not None:
+            threads.remove(threading.get_ident())
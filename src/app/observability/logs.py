@@ -0,0 +1,188 @@
+"""Structured logging with request correlation.
+
+``configure_logging`` puts a ``QueueHandler`` on the root logger. Records are
+enriched on the calling thread, while the contextvar is still visible, and
+formatted and written by a ``QueueListener`` thread, so a slow stdout or log
+shipper never blocks a request. ``RequestContextMiddleware`` binds the
+``RequestContext`` that carries the request id, and writes one access line per
+request with its timings.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, TextIO
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .context import RequestContext, bind_request, current_request, reset_request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+_CONTEXT_FIELDS = ("request_id", "user_id", "method", "route")
+# Path parameters that carry patient data; such paths are logged as the route template.
+_REDACTED_PATH_PARAMS = frozenset({"identifier"})
+
+access_logger = logging.getLogger("src.app.access")
+
+
+class RequestContextFilter(logging.Filter):
+    """Copies request id, user id and route from the current request onto the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = current_request()
+        for name in _CONTEXT_FIELDS:
+            if not hasattr(record, name):
+                setattr(record, name, getattr(context, name, None) if context is not None else None)
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps a ``rate`` share of DEBUG records; higher levels always pass.
+
+    The decision is made per request id, so a sampled request keeps all of its
+    debug lines and an unsampled one drops them all.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            return zlib.crc32(request_id.encode()) / 2**32 < self.rate
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """QueueHandler that keeps ``extra`` fields and exception info for the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+def configure_logging(level: str, fmt: str, debug_sample_rate: float, stream: TextIO | None = None) -> QueueListener:
+    """Route the root logger through a queue; returns the started listener.
+
+    Call ``shutdown_logging`` with the listener to flush and detach it.
+    """
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+
+    handler = _PreparedQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(handler)
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.handler = handler  # type: ignore[attr-defined]
+    listener.start()
+    return listener
+
+
+def shutdown_logging(listener: QueueListener) -> None:
+    logging.getLogger().removeHandler(listener.handler)  # type: ignore[attr-defined]
+    listener.stop()
+
+
+def loggable_path(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    if route is not None and _REDACTED_PATH_PARAMS.intersection(getattr(route, "param_convertors", ())):
+        return route.path
+    return scope["path"]
+
+
+def _request_id(scope: Dict[str, Any]) -> str:
+    incoming = Headers(scope=scope).get(REQUEST_ID_HEADER)
+    if incoming and _VALID_REQUEST_ID.fullmatch(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    """Outermost middleware: binds the request context and request id, logs one access line.
+
+    An incoming ``X-Request-ID`` is kept when it looks sane so ids can be
+    followed across proxies; otherwise one is generated. The id is echoed on
+    the response.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestContext(request_id=_request_id(scope), method=scope["method"])
+        token = bind_request(context)
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, context.request_id)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            context.route = getattr(scope.get("route"), "path", None)
+            path = loggable_path(scope)
+            access_logger.info(
+                "%s %s %s",
+                scope["method"],
+                path,
+                status,
+                extra={
+                    "status": status,
+                    "path": path,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "db_queries": context.db_queries,
+                    "db_ms": round(context.db_seconds * 1000, 2),
+                    "timings_ms": {name: round(seconds * 1000, 2) for name, seconds in context.timings.items()} or None,
+                },
+            )
+            reset_request(token)
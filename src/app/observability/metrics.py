@@ -0,0 +1,276 @@
+"""Minimal Prometheus metrics with text exposition.
+
+Metrics are plain dicts of label tuples guarded by a lock, so the per-request
+cost is a few dict updates. Values that are cheap to read on demand (pool
+usage, prediction cache counters) are collected at scrape time instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from .context import RequestContext, bind_request, current_request, reset_request
+from .timing import server_timing_header
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(counts), total[0])) for k, (counts, total) in self._series.items()]
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]) -> None:
+        """``collector`` yields ``(name, type, help, labels, value)`` samples at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        seen = set()
+        for collector in self._collectors:
+            for name, kind, documentation, labels, value in collector():
+                if name not in seen:
+                    seen.add(name)
+                    lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+                lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+)
+HTTP_REQUESTS = REGISTRY.register(Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+HTTP_IN_PROGRESS = REGISTRY.register(Gauge("http_requests_in_progress", "HTTP requests currently being served.", ("method",)))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(
+    Histogram("db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), buckets=COUNT_BUCKETS)
+)
+DB_TIME_PER_REQUEST = REGISTRY.register(
+    Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request.", ("route",), buckets=DB_BUCKETS)
+)
+DB_QUERY_DURATION = REGISTRY.register(
+    Histogram("db_query_duration_seconds", "Duration of individual SQL statements.", ("operation",), buckets=DB_BUCKETS)
+)
+INCIDENT_TRANSITIONS = REGISTRY.register(
+    Counter("incident_transitions_total", "Incident workflow state transitions.", ("from_status", "to_status"))
+)
+MODEL_INFERENCE_DURATION = REGISTRY.register(
+    Histogram("model_inference_duration_seconds", "Classifier inference latency (cache misses only).", ("model_version",), buckets=DB_BUCKETS)
+)
+# Outbox metrics are updated by the dispatcher process, not the API workers.
+OUTBOX_DELIVERY_LAG = REGISTRY.register(
+    Histogram("outbox_delivery_lag_seconds", "Time from outbox insert to successful delivery.", ("sink",), buckets=LAG_BUCKETS)
+)
+OUTBOX_DELIVERED = REGISTRY.register(Counter("outbox_delivered_total", "Outbox messages delivered.", ("sink",)))
+OUTBOX_FAILED_BATCHES = REGISTRY.register(Counter("outbox_failed_batches_total", "Outbox batches that failed delivery.", ("sink",)))
+OUTBOX_PENDING = REGISTRY.register(Gauge("outbox_pending_messages", "Undelivered outbox messages, including dead ones.", ("state",)))
+OUTBOX_OLDEST_PENDING_AGE = REGISTRY.register(
+    Gauge("outbox_oldest_pending_age_seconds", "Age of the oldest undelivered, retryable outbox message.")
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on ``engine`` and attribute it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        operation = statement.lstrip()[:6].upper()
+        DB_QUERY_DURATION.observe(elapsed, operation)
+        request = current_request()
+        if request is not None:
+            request.db_queries += 1
+            request.db_seconds += elapsed
+            if request.statements is not None:
+                request.statements[statement] += 1
+
+    def _pool_samples() -> Iterable[Tuple[str, str, str, Dict[str, str], float]]:
+        pool = engine.pool
+        for name, method, documentation in (
+            ("db_pool_size", "size", "Configured connection pool size."),
+            ("db_pool_checked_out", "checkedout", "Connections currently checked out of the pool."),
+            ("db_pool_overflow", "overflow", "Connections opened beyond the pool size."),
+        ):
+            reader = getattr(pool, method, None)
+            if reader is not None:
+                yield name, "gauge", documentation, {}, float(reader())
+
+    REGISTRY.register_collector(_pool_samples)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: records latency, status and DB usage per route template.
+
+    It reuses the ``RequestContext`` bound by ``RequestContextMiddleware`` (or
+    binds its own when used alone). With ``log_repeated_statements`` every SQL string is tallied per request and any
+    statement issued more than once is logged as a likely N+1; with
+    ``server_timing`` the response carries a ``Server-Timing`` phase breakdown.
+    """
+
+    def __init__(self, app: Any, log_repeated_statements: bool = False, server_timing: bool = False) -> None:
+        self.app = app
+        self.log_repeated_statements = log_repeated_statements
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                if self.server_timing:
+                    header = server_timing_header(context, time.perf_counter() - started)
+                    MutableHeaders(scope=message).append("Server-Timing", header)
+            await send(message)
+
+        context = current_request()
+        token = None
+        if context is None:
+            context = RequestContext()
+            token = bind_request(context)
+        if self.log_repeated_statements and context.statements is None:
+            context.statements = StatementCounter()
+        HTTP_IN_PROGRESS.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec(method)
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, status)
+            DB_QUERIES_PER_REQUEST.observe(context.db_queries, route)
+            DB_TIME_PER_REQUEST.observe(context.db_seconds, route)
+            for statement, count in context.repeated_statements().items():
+                logger.warning("Possible N+1 on %s %s: statement ran %d times: %s", method, route, count, " ".join(statement.split()))
+            if token is not None:
+                reset_request(token)
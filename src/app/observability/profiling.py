@@ -0,0 +1,185 @@
+"""Opt-in sampling profiler for single requests.
+
+A profiled request gets a sampler thread that reads ``sys._current_frames()``
+for the threads registered on its ``RequestContext``. Those are the event loop
+thread plus whichever worker threads are inside a timed phase (auth, endpoint)
+for that request. Stacks are stored in collapsed ("folded") format, one
+``frame;frame;frame count`` line per distinct stack, which flamegraph.pl and
+speedscope load directly. Samples taken on the event loop thread may include
+other requests' async work.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..config import get_settings
+from .context import current_request
+from .logs import loggable_path
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+_PROFILE_ID = re.compile(r"[0-9a-f]{32}")
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    for prefix in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1 :]
+    return filename
+
+
+class SamplingProfiler:
+    def __init__(self, threads: List[int], interval_seconds: float) -> None:
+        self.threads = threads
+        self.interval_seconds = interval_seconds
+        self.samples: Counter[Tuple[str, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            for thread_id in set(self.threads):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """Profiles as JSON files in one directory, shared by all workers on a host."""
+
+    def __init__(self, directory: str | Path | None = None, max_profiles: int | None = None) -> None:
+        settings = get_settings()
+        self.directory = Path(directory or settings.profile_dir)
+        self.max_profiles = settings.profile_max_stored if max_profiles is None else max_profiles
+
+    def _path(self, profile_id: str) -> Path | None:
+        if not _PROFILE_ID.fullmatch(profile_id):
+            return None
+        return self.directory / f"{profile_id}.json"
+
+    def save(self, profile_id: str, meta: Dict[str, Any], collapsed: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(profile_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({**meta, "id": profile_id, "collapsed": collapsed}), encoding="utf-8")
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in files[self.max_profiles :]:
+            stale.unlink(missing_ok=True)
+
+    def load(self, profile_id: str) -> Dict[str, Any] | None:
+        path = self._path(profile_id)
+        if path is None or not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            data.pop("collapsed", None)
+            profiles.append(data)
+        return profiles
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """Profiles requests that send ``X-Profile: 1`` and pass ``authorize``.
+
+    Must sit inside ``MetricsMiddleware``, which binds the request context. The
+    response carries ``X-Profile-Id``; the profile is saved once the response
+    has been sent.
+    """
+
+    def __init__(self, app: Any, store: ProfileStore, authorize: Callable[[Headers], str | None], interval_seconds: float) -> None:
+        self.app = app
+        self.store = store
+        self.authorize = authorize
+        self.interval_seconds = interval_seconds
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        context = current_request()
+        if scope["type"] != "http" or context is None:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER, "").lower() not in {"1", "true"}:
+            await self.app(scope, receive, send)
+            return
+        subject = self.authorize(headers)
+        if subject is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        context.threads = [threading.get_ident()]
+        profiler = SamplingProfiler(context.threads, self.interval_seconds)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            context.threads = None
+            meta = {
+                "method": scope["method"],
+                "path": loggable_path(scope),
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "user_id": subject,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "interval_ms": self.interval_seconds * 1000,
+                "samples": sum(profiler.samples.values()),
+                "timings_ms": {name: round(seconds * 1000, 2) for name, seconds in context.timings.items()},
+                "db_queries": context.db_queries,
+            }
+            await anyio.to_thread.run_sync(self.store.save, profile_id, meta, profiler.collapsed())
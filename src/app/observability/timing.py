@@ -0,0 +1,84 @@
+"""Per-request phase timings and the ``Server-Timing`` header.
+
+``TimedRoute`` splits a route handler into the endpoint body and what FastAPI
+does afterwards (response-model validation and JSON encoding). Auth and ML time
+come from ``phase()`` blocks in the dependency and the prediction service, and
+DB time from the engine hooks in ``metrics``. Phases overlap: auth and the
+endpoint include their own queries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .context import RequestContext, current_request, phase
+
+SERVER_TIMING_PHASES = ("auth", "db", "ml", "endpoint", "serialize")
+
+
+def _mark_endpoint_finished() -> None:
+    context = current_request()
+    if context is not None:
+        context.endpoint_finished = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def run_async(*args: Any, **kwargs: Any) -> Any:
+            try:
+                with phase("endpoint"):
+                    return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+
+        return run_async
+
+    @functools.wraps(call)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        try:
+            with phase("endpoint"):
+                return call(*args, **kwargs)
+        finally:
+            _mark_endpoint_finished()
+
+    return run
+
+
+class TimedRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            context = current_request()
+            if context is not None:
+                context.route = self.path
+            response = await handler(request)
+            if context is not None and context.endpoint_finished is not None:
+                context.add_timing("serialize", time.perf_counter() - context.endpoint_finished)
+            return response
+
+        return timed_handler
+
+
+def server_timing_header(context: RequestContext, total_seconds: float) -> str:
+    parts = []
+    for name in SERVER_TIMING_PHASES:
+        seconds = context.db_seconds if name == "db" else context.timings.get(name)
+        if seconds is None:
+            continue
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if name == "db":
+            entry += f';desc="{context.db_queries} queries"'
+        parts.append(entry)
+    parts.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
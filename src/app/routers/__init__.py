@@ -1,3 +1,3 @@
-from . import admin, approvals, auth, incidents, references
+from . import admin, approvals, attachments, auth, events, incidents, patients, references, reports
 
-__all__ = ["admin", "approvals", "auth", "incidents", "references"]
+__all__ = ["admin", "approvals", "attachments", "auth", "events", "incidents", "patients", "references", "reports"]
@@ -1,15 +1,25 @@
+import base64
+import csv
+import json
 from datetime import datetime, timezone
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import and_, exists, or_
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
+from ..config import get_settings
 from ..db import get_session
 from ..models.department import Department
 from ..models.location import Location
-from ..models.role import Role
+from ..models.role import Role, UserRole
 from ..models.user import User
-from ..schemas.common import APIResponse
+from ..observability.profiling import profile_store
+from ..observability.timing import TimedRoute
+from ..schemas.common import APIResponse, CursorPage
 from ..schemas.reference import (
     DepartmentCreate,
     DepartmentRead,
@@ -18,18 +28,90 @@ from ..schemas.reference import (
     LocationRead,
     LocationUpdate,
 )
-from ..schemas.user import UserCreate, UserRead, UserUpdate
+from ..schemas.user import UserCreate, UserRead, UserSummary, UserUpdate
 from ..security.permissions import RequireRole
 from ..security.passwords import hash_password
+from ..services.provisioning import ProvisioningError, outcomes_as_dicts, parse_csv, provision_users, summarize
 
-router = APIRouter(prefix="/v1/admin", tags=["Admin"], dependencies=[Depends(RequireRole("admin"))])
+router = APIRouter(prefix="/v1/admin", tags=["Admin"], dependencies=[Depends(RequireRole("admin"))], route_class=TimedRoute)
 
 
-@router.get("/users", response_model=APIResponse[list[UserRead]])
-def list_users(session: Session = Depends(get_session)) -> APIResponse[list[UserRead]]:
-    users = session.exec(select(User).options(selectinload(User.roles))).all()
-    data = [UserRead.model_validate(u) for u in users]
-    return APIResponse(status_code=200, message="Users fetched", data=data)
+USER_SORT_COLUMNS = {"id": User.id, "email": User.email, "full_name": User.full_name}
+
+
+def _encode_cursor(sort: str, value: Any, user_id: int) -> str:
+    raw = json.dumps([sort, value, user_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    try:
+        cursor_sort, value, user_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if cursor_sort != sort:
+            raise ValueError(cursor_sort)
+        return value, int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail={"error_code": "invalid_cursor", "message": "Cursor is invalid for this sort order"})
+
+
+def _prefix_pattern(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+@router.get("/users", response_model=APIResponse[CursorPage[UserRead | UserSummary]])
+def list_users(
+    q: str | None = Query(None, min_length=1, max_length=100, description="Prefix of the email or full name"),
+    role: str | None = Query(None, description="Only users holding this role name"),
+    is_active: bool | None = None,
+    sort: Literal["id", "email", "full_name"] | None = Query(None, description="Defaults to full_name when searching, id otherwise"),
+    fields: Literal["full", "compact"] = Query("full", description="compact returns id, email and full_name only"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    session: Session = Depends(get_session),
+) -> APIResponse[CursorPage[UserRead | UserSummary]]:
+    """Keyset-paginated user directory.
+
+    Pages are ordered by ``(sort column, id)`` and continue from ``cursor``,
+    so page N costs the same as page 1. ``q`` is a prefix match (a ``LIKE
+    'q%'`` range on the email and full_name indexes), never a substring scan.
+    """
+    sort = sort or ("full_name" if q else "id")
+    column = USER_SORT_COLUMNS[sort]
+    filters = []
+    if q:
+        pattern = _prefix_pattern(q)
+        filters.append(or_(User.email.like(pattern, escape="\\"), User.full_name.like(pattern, escape="\\")))
+    if role:
+        filters.append(
+            exists().where(UserRole.user_id == User.id, UserRole.role_id == Role.id, Role.name == role)
+        )
+    if is_active is not None:
+        filters.append(User.is_active == is_active)
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort)
+        if sort == "id":
+            filters.append(User.id > last_id)
+        else:
+            filters.append(or_(column > value, and_(column == value, User.id > last_id)))
+
+    order = [User.id] if sort == "id" else [column, User.id]
+    if fields == "compact":
+        statement = select(User.id, User.email, User.full_name)
+    else:
+        statement = select(User).options(selectinload(User.roles))
+    rows = session.exec(statement.where(*filters).order_by(*order).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(sort, getattr(last, sort), last.id)
+    if fields == "compact":
+        items = [UserSummary(id=row.id, email=row.email, full_name=row.full_name) for row in rows]
+    else:
+        items = [UserRead.model_validate(user) for user in rows]
+    return APIResponse(status_code=200, message="Users fetched", data=CursorPage(items=items, limit=limit, next_cursor=next_cursor))
 
 
 @router.post("/users", response_model=APIResponse[UserRead], status_code=201)
@@ -53,6 +135,35 @@ def create_user(payload: UserCreate, session: Session = Depends(get_session)) ->
     return APIResponse(status_code=201, message="User created", data=UserRead.model_validate(user))
 
 
+@router.post("/users/bulk", response_model=APIResponse[dict])
+async def bulk_create_users(
+    request: Request,
+    dry_run: bool = Query(False, description="Validate and report without creating anyone"),
+    session: Session = Depends(get_session),
+) -> APIResponse[dict]:
+    """Create users from a CSV request body (``Content-Type: text/csv``).
+
+    Columns: ``email``, ``full_name``, ``password`` and optionally ``roles``
+    (role names separated by ``;``). Existing emails are skipped, so the same
+    file can be sent again safely. Returns one outcome per row.
+    """
+    settings = get_settings()
+    try:
+        rows = parse_csv((await request.body()).decode("utf-8"))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail={"error_code": "invalid_csv", "message": "CSV must be UTF-8"})
+    except (ProvisioningError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail={"error_code": "invalid_csv", "message": str(exc)})
+    if len(rows) > settings.provisioning_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail={"error_code": "too_many_rows", "message": f"At most {settings.provisioning_max_rows} rows per request"},
+        )
+    outcomes = await run_in_threadpool(provision_users, session, rows, settings.provisioning_workers, dry_run=dry_run)
+    data = {"dry_run": dry_run, "summary": summarize(outcomes), "rows": outcomes_as_dicts(outcomes)}
+    return APIResponse(status_code=200, message="Users provisioned" if not dry_run else "Users validated", data=data)
+
+
 @router.put("/users/{user_id}", response_model=APIResponse[UserRead])
 def update_user(user_id: int, payload: UserUpdate, session: Session = Depends(get_session)) -> APIResponse[UserRead]:
     user = session.exec(select(User).options(selectinload(User.roles)).where(User.id == user_id)).one_or_none()
@@ -137,3 +248,19 @@ def update_location(location_id: int, payload: LocationUpdate, session: Session
     session.commit()
     session.refresh(location)
     return APIResponse(status_code=200, message="Location updated", data=LocationRead.model_validate(location))
+
+
+@router.get("/profiles", response_model=APIResponse[list[dict]])
+def list_profiles() -> APIResponse[list[dict]]:
+    return APIResponse(status_code=200, message="Profiles fetched", data=profile_store.list())
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str) -> PlainTextResponse:
+    profile = profile_store.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail={"error_code": "profile_not_found", "message": "Profile not found"})
+    return PlainTextResponse(
+        profile["collapsed"],
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
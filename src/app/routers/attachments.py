@@ -0,0 +1,243 @@
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..db import get_session
+from ..models.attachment import AttachmentBlob
+from ..models.incident import Incident, IncidentStatus
+from ..models.user import User
+from ..observability.timing import TimedRoute
+from ..schemas.attachment import AttachmentRead, AttachmentUploadResult
+from ..schemas.common import APIResponse
+from ..security.dependencies import get_current_user
+from ..security.permissions import RequireRole
+from ..services.attachments.storage import AttachmentStorage, AttachmentTooLarge, StagedUpload, get_storage, is_digest
+
+router = APIRouter(prefix="/v1/incidents", tags=["Incidents"], route_class=TimedRoute)
+
+DIGEST_HEADER = "X-Content-SHA256"
+_SINGLE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+# Types a browser will not run as script; anything else is served as opaque bytes.
+ALLOWED_CONTENT_TYPES = frozenset(
+    {"image/jpeg", "image/png", "image/gif", "image/webp", "image/heic", "image/heif", "application/pdf"}
+)
+FALLBACK_CONTENT_TYPE = "application/octet-stream"
+
+
+def safe_content_type(declared: str | None) -> str:
+    """Return the declared media type if it is on the allowlist, else ``application/octet-stream``."""
+    media_type = (declared or "").split(";", 1)[0].strip().lower()
+    return media_type if media_type in ALLOWED_CONTENT_TYPES else FALLBACK_CONTENT_TYPE
+
+
+def _get_incident(session: Session, incident_id: int, for_update: bool = False) -> Incident:
+    statement = select(Incident).where(Incident.id == incident_id)
+    if for_update:
+        statement = statement.with_for_update()
+    incident = session.exec(statement).one_or_none()
+    if not incident:
+        raise HTTPException(status_code=404, detail={"error_code": "incident_not_found", "message": "Incident not found"})
+    return incident
+
+
+def _get_editable_incident(session: Session, incident_id: int, current_user: User, for_update: bool = False) -> Incident:
+    incident = _get_incident(session, incident_id, for_update)
+    if incident.reporter_id != current_user.id:
+        raise HTTPException(status_code=403, detail={"error_code": "forbidden", "message": "Cannot modify others' incidents"})
+    if incident.status != IncidentStatus.DRAFT:
+        raise HTTPException(status_code=409, detail={"error_code": "invalid_state", "message": "Only draft incidents can be edited"})
+    return incident
+
+
+def _get_readable_incident(session: Session, incident_id: int, current_user: User) -> Incident:
+    incident = _get_incident(session, incident_id)
+    user_roles = {role.name for role in current_user.roles}
+    if incident.reporter_id != current_user.id and not user_roles.intersection({"admin", "pj", "mutu"}):
+        raise HTTPException(status_code=403, detail={"error_code": "forbidden", "message": "Access denied"})
+    return incident
+
+
+def _attach_blob(
+    session: Session,
+    incident_id: int,
+    current_user: User,
+    storage: AttachmentStorage,
+    staged: StagedUpload,
+    digest: str,
+    content_type: str,
+) -> tuple[AttachmentBlob, bool]:
+    """Publish ``staged`` and record it on the draft in one transaction.
+
+    The draft is locked and checked again first: an upload that loses the race
+    with submit leaves neither a blob row nor a stored file behind.
+    """
+    incident = _get_editable_incident(session, incident_id, current_user, for_update=True)
+    blob = session.get(AttachmentBlob, digest)
+    deduplicated = blob is not None
+    if blob is None:
+        blob = AttachmentBlob(sha256=digest, size_bytes=staged.size, content_type=content_type, uploaded_by_id=current_user.id)
+        session.add(blob)
+    if digest not in (incident.attachments or []):
+        # Reassign rather than mutate: the JSON column does not track in-place changes.
+        incident.attachments = [*(incident.attachments or []), digest]
+        incident.touch()
+        session.add(incident)
+    try:
+        session.flush()
+    except IntegrityError:
+        # Another upload of the same content won the insert; attach its row instead.
+        session.rollback()
+        return _attach_blob(session, incident_id, current_user, storage, staged, digest, content_type)
+    # Published before the commit, so a committed row always has its content.
+    storage.commit(staged, digest)
+    session.commit()
+    session.refresh(blob)
+    return blob, deduplicated
+
+
+@router.post(
+    "/{incident_id}/attachments",
+    response_model=APIResponse[AttachmentUploadResult],
+    dependencies=[Depends(RequireRole("perawat"))],
+    status_code=201,
+)
+async def upload_attachment(
+    incident_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    storage: AttachmentStorage = Depends(get_storage),
+) -> APIResponse[AttachmentUploadResult]:
+    """Store the raw request body as an attachment of a draft incident.
+
+    The body is streamed to a staging file chunk by chunk while its SHA-256 is
+    computed; identical content is stored once. Send the file as the body with
+    its own ``Content-Type``; an optional ``X-Content-SHA256`` header is checked
+    against the computed digest.
+    """
+    await run_in_threadpool(_get_editable_incident, session, incident_id, current_user)
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > storage.max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail={"error_code": "attachment_too_large", "message": f"Attachments are limited to {storage.max_bytes} bytes"},
+        )
+    expected = request.headers.get(DIGEST_HEADER, "").lower() or None
+    if expected is not None and not is_digest(expected):
+        raise HTTPException(status_code=400, detail={"error_code": "invalid_digest", "message": f"{DIGEST_HEADER} must be a hex SHA-256"})
+
+    staged = await run_in_threadpool(storage.stage)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(staged.write, chunk)
+        digest = await run_in_threadpool(staged.finish)
+    except AttachmentTooLarge:
+        await run_in_threadpool(staged.discard)
+        raise HTTPException(
+            status_code=413,
+            detail={"error_code": "attachment_too_large", "message": f"Attachments are limited to {storage.max_bytes} bytes"},
+        )
+    except BaseException:
+        await run_in_threadpool(staged.discard)
+        raise
+    if staged.size == 0:
+        await run_in_threadpool(staged.discard)
+        raise HTTPException(status_code=400, detail={"error_code": "empty_attachment", "message": "Request body is empty"})
+    if expected is not None and expected != digest:
+        await run_in_threadpool(staged.discard)
+        raise HTTPException(status_code=400, detail={"error_code": "digest_mismatch", "message": "Body does not match X-Content-SHA256"})
+
+    content_type = safe_content_type(request.headers.get("content-type"))
+    try:
+        blob, deduplicated = await run_in_threadpool(
+            _attach_blob, session, incident_id, current_user, storage, staged, digest, content_type
+        )
+    finally:
+        await run_in_threadpool(staged.discard)
+    data = AttachmentUploadResult(**AttachmentRead.model_validate(blob).model_dump(), deduplicated=deduplicated)
+    return APIResponse(status_code=201, message="Attachment stored", data=data)
+
+
+@router.get("/{incident_id}/attachments", response_model=APIResponse[list[AttachmentRead]])
+def list_attachments(
+    incident_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> APIResponse[list[AttachmentRead]]:
+    incident = _get_readable_incident(session, incident_id, current_user)
+    digests = [value for value in incident.attachments or [] if is_digest(value)]
+    blobs = {}
+    if digests:
+        rows = session.exec(select(AttachmentBlob).where(AttachmentBlob.sha256.in_(digests))).all()
+        blobs = {blob.sha256: blob for blob in rows}
+    items = [AttachmentRead.model_validate(blobs[digest]) for digest in digests if digest in blobs]
+    return APIResponse(status_code=200, message="Attachments fetched", data=items)
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the inclusive byte range of a single-range ``Range`` header.
+
+    ``None`` means serve the whole file (no header, a malformed one, or several
+    ranges); ``ValueError`` means the range cannot be satisfied.
+    """
+    match = _SINGLE_RANGE.fullmatch(header.strip()) if header else None
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError(header)
+    return start, end
+
+
+@router.get("/{incident_id}/attachments/{sha256}")
+def download_attachment(
+    incident_id: int,
+    sha256: str,
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    storage: AttachmentStorage = Depends(get_storage),
+) -> StreamingResponse:
+    incident = _get_readable_incident(session, incident_id, current_user)
+    blob = session.get(AttachmentBlob, sha256) if sha256 in (incident.attachments or []) else None
+    if blob is None:
+        raise HTTPException(status_code=404, detail={"error_code": "attachment_not_found", "message": "Attachment not found"})
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{blob.sha256}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+        # Never render uploads inline on the API origin.
+        "Content-Disposition": f'attachment; filename="{blob.sha256}"',
+        "X-Content-Type-Options": "nosniff",
+    }
+    try:
+        byte_range = parse_range(request.headers.get("range"), blob.size_bytes)
+    except ValueError:
+        raise HTTPException(
+            status_code=416,
+            detail={"error_code": "range_not_satisfiable", "message": "Requested range is outside the attachment"},
+            headers={"Content-Range": f"bytes */{blob.size_bytes}"},
+        )
+    status_code = 200
+    start, end = 0, blob.size_bytes - 1
+    if byte_range is not None and request.headers.get("if-range", headers["ETag"]) == headers["ETag"]:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{blob.size_bytes}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.iter_range(blob.sha256, start, end), status_code=status_code, media_type=safe_content_type(blob.content_type), headers=headers
+    )
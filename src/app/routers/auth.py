@@ -7,13 +7,14 @@ from sqlmodel import Session, select
 from ..db import get_session
 from ..models.role import Role
 from ..models.user import User
+from ..observability.timing import TimedRoute
 from ..schemas.auth import LoginRequest, RefreshRequest, RegisterRequest, TokenPair
 from ..schemas.common import APIResponse
 from ..security.dependencies import get_current_user
 from ..security.jwt import TokenType, create_access_token, create_refresh_token, decode_token
 from ..security.passwords import hash_password, verify_password
 
-router = APIRouter(prefix="/v1/auth", tags=["Auth"])
+router = APIRouter(prefix="/v1/auth", tags=["Auth"], route_class=TimedRoute)
 
 
 def _issue_tokens(user: User) -> TokenPair:
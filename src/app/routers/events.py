@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..db import get_session
+from ..models.user import User
+from ..observability.timing import TimedRoute
+from ..security.dependencies import get_current_user
+from ..services.incidents.events import EventScope, broadcaster, load_events, stream_events
+
+router = APIRouter(prefix="/v1/events", tags=["Incidents"], route_class=TimedRoute)
+
+REVIEWER_ROLES = {"admin", "pj", "mutu"}
+
+
+def _last_event_id(request: Request, query_value: int | None) -> int | None:
+    header = request.headers.get("last-event-id", "")
+    if header.isdigit():
+        return int(header)
+    return query_value
+
+
+@router.get("/incidents", response_class=StreamingResponse)
+async def incident_events(
+    request: Request,
+    department_id: int | None = Query(None, description="Only incidents of this department"),
+    last_event_id: int | None = Query(None, ge=0, description="Resume after this event id when the Last-Event-ID header cannot be set"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Server-Sent Events stream of incident status changes.
+
+    PJ, mutu and admin users see every incident, other users only their own
+    reports. Event ids are audit log ids; reconnecting with ``Last-Event-ID``
+    replays what was missed.
+    """
+    settings = get_settings()
+    roles = {role.name for role in current_user.roles}
+    scope = EventScope(
+        reporter_id=None if roles & REVIEWER_ROLES else current_user.id,
+        department_id=department_id,
+    )
+    resume_after = _last_event_id(request, last_event_id)
+    subscription = broadcaster.subscribe(scope)
+    try:
+        backlog = []
+        live = True
+        if resume_after is not None:
+            backlog = broadcaster.replay(resume_after)
+            if backlog is None:
+                limit = settings.incident_events_buffer_size
+                backlog = await run_in_threadpool(load_events, session, resume_after, limit, scope)
+                live = len(backlog) < limit
+        # The stream can stay open for hours; do not hold a pooled connection for it.
+        await run_in_threadpool(session.close)
+    except BaseException:
+        subscription.close()
+        raise
+    return StreamingResponse(
+        stream_events(subscription, backlog, settings.incident_events_heartbeat_seconds, live=live),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
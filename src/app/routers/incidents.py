@@ -4,21 +4,35 @@ from sqlalchemy import func
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
+from ..config import get_settings
 from ..db import get_session
 from ..models.incident import Incident, IncidentStatus
 from ..models.user import User
+from ..observability.timing import TimedRoute
 from ..schemas.common import APIResponse
 from ..schemas.incident import (
     IncidentCreate,
     IncidentRead,
     IncidentSubmitRequest,
     IncidentUpdate,
+    SimilarIncident,
 )
 from ..security.dependencies import get_current_user
 from ..security.permissions import RequireRole
+from ..services.archival import load_archived_incident, load_archived_incidents
+from ..services.idempotency import Idempotency, get_idempotency
+from ..services.incidents.duplicates import index_on_commit
 from ..services.incidents.service import submit_incident
 
-router = APIRouter(prefix="/v1/incidents", tags=["Incidents"])
+router = APIRouter(prefix="/v1/incidents", tags=["Incidents"], route_class=TimedRoute)
+
+settings = get_settings()
+
+
+def _index_for_duplicates(session: Session, incident: Incident) -> None:
+    # Computing the signature now keeps it off the submit path.
+    if settings.duplicate_detection_enabled:
+        index_on_commit(session, incident)
 
 
 @router.post("", response_model=APIResponse[IncidentRead], dependencies=[Depends(RequireRole("perawat"))], status_code=201)
@@ -26,6 +40,7 @@ def create_incident(
     payload: IncidentCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
 ) -> APIResponse[IncidentRead]:
     incident = Incident(
         reporter_id=current_user.id,
@@ -38,9 +53,13 @@ def create_incident(
         attachments=payload.attachments,
     )
     session.add(incident)
-    session.commit()
+    session.flush()
     session.refresh(incident)
-    return APIResponse(status_code=201, message="Incident draft created", data=IncidentRead.model_validate(incident))
+    _index_for_duplicates(session, incident)
+    # Stored in the same transaction as the draft, so a retry can never create a second one.
+    response = idempotency.respond(APIResponse(status_code=201, message="Incident draft created", data=IncidentRead.model_validate(incident)))
+    session.commit()
+    return response
 
 
 @router.put("/{incident_id}", response_model=APIResponse[IncidentRead], dependencies=[Depends(RequireRole("perawat"))])
@@ -62,6 +81,8 @@ def update_incident(
         setattr(incident, key, value)
     incident.updated_at = datetime.utcnow()
     session.add(incident)
+    session.flush()
+    _index_for_duplicates(session, incident)
     session.commit()
     session.refresh(incident)
     return APIResponse(status_code=200, message="Incident updated", data=IncidentRead.model_validate(incident))
@@ -73,6 +94,7 @@ def submit(
     payload: IncidentSubmitRequest,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
 ) -> APIResponse[IncidentRead]:
     incident = session.exec(select(Incident).where(Incident.id == incident_id)).one_or_none()
     if not incident:
@@ -82,9 +104,14 @@ def submit(
     if incident.status != IncidentStatus.DRAFT:
         raise HTTPException(status_code=409, detail={"error_code": "invalid_state", "message": "Only draft incidents can be submitted"})
     submit_incident(session, incident, current_user)
-    session.commit()
+    session.flush()
     session.refresh(incident)
-    return APIResponse(status_code=200, message="Incident submitted. Prediction generated.", data=IncidentRead.model_validate(incident))
+    _index_for_duplicates(session, incident)
+    response = idempotency.respond(
+        APIResponse(status_code=200, message="Incident submitted. Prediction generated.", data=IncidentRead.model_validate(incident))
+    )
+    session.commit()
+    return response
 
 
 @router.get("", response_model=APIResponse[dict])
@@ -127,9 +154,56 @@ def get_incident(
     incident = session.exec(
         select(Incident).options(selectinload(Incident.audit_logs)).where(Incident.id == incident_id)
     ).one_or_none()
-    if not incident:
-        raise HTTPException(status_code=404, detail={"error_code": "incident_not_found", "message": "Incident not found"})
+    if incident is not None:
+        data = IncidentRead.model_validate(incident)
+    else:
+        archived = load_archived_incident(session, incident_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail={"error_code": "incident_not_found", "message": "Incident not found"})
+        data = IncidentRead.model_validate(archived)
     user_roles = {role.name for role in current_user.roles}
-    if incident.reporter_id != current_user.id and not user_roles.intersection({"admin", "pj", "mutu"}):
+    if data.reporter_id != current_user.id and not user_roles.intersection({"admin", "pj", "mutu"}):
         raise HTTPException(status_code=403, detail={"error_code": "forbidden", "message": "Access denied"})
-    return APIResponse(status_code=200, message="Incident detail", data=IncidentRead.model_validate(incident))
+    return APIResponse(status_code=200, message="Incident detail", data=data)
+
+
+@router.get(
+    "/{incident_id}/similar",
+    response_model=APIResponse[list[SimilarIncident]],
+    dependencies=[Depends(RequireRole("pj", "mutu", "admin"))],
+)
+def similar_incidents(
+    incident_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    session: Session = Depends(get_session),
+) -> APIResponse[list[SimilarIncident]]:
+    """Closed incidents whose descriptions are most similar to this one, best first."""
+    from ..services.incidents.similar import similar_index
+
+    incident = session.exec(select(Incident).where(Incident.id == incident_id)).one_or_none()
+    if not incident:
+        raise HTTPException(status_code=404, detail={"error_code": "incident_not_found", "message": "Incident not found"})
+    if not similar_index.loaded:
+        bind = session.get_bind()
+        similar_index.build_in_background(lambda: Session(bind))
+        raise HTTPException(
+            status_code=503,
+            detail={"error_code": "similar_index_loading", "message": "Similar-incident index is still loading, retry later"},
+            headers={"Retry-After": "5"},
+        )
+    similar_index.sync(session, wait=False)
+    hits = similar_index.search(incident.free_text_description, k=limit, exclude=incident.id)
+    found: dict[int, IncidentRead] = {}
+    if hits:
+        statement = select(Incident).where(Incident.id.in_([hit.incident_id for hit in hits]))
+        found = {row.id: IncidentRead.model_validate(row) for row in session.exec(statement).all()}
+        missing = [hit.incident_id for hit in hits if hit.incident_id not in found]
+        if missing:
+            found.update((row["id"], IncidentRead.model_validate(row)) for row in load_archived_incidents(session, missing))
+    fields = set(SimilarIncident.model_fields) - {"similarity"}
+    items = [
+        SimilarIncident(similarity=hit.score, **found[hit.incident_id].model_dump(include=fields))
+        for hit in hits
+        if hit.incident_id in found
+    ]
+    return APIResponse(status_code=200, message="Similar incidents fetched", data=items)
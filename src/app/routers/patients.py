@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import false, func, true, union_all
+from sqlmodel import Session, select
+
+from ..db import get_session
+from ..models.archive import incidents_archive
+from ..models.incident import Incident
+from ..observability.timing import TimedRoute
+from ..schemas.common import APIResponse
+from ..schemas.incident import IncidentRead
+from ..security.patient_ids import blind_index
+from ..security.permissions import RequireRole
+from ..services.archival import load_archived_incidents
+
+router = APIRouter(prefix="/v1/patients", tags=["Patients"], route_class=TimedRoute)
+
+
+@router.get("/{identifier}/incidents", response_model=APIResponse[dict], dependencies=[Depends(RequireRole("pj", "mutu", "admin"))])
+def patient_incidents(
+    identifier: str,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session),
+) -> APIResponse[dict]:
+    """Every incident recorded for one patient, newest first, archived ones included.
+
+    Matching is on the blind index, so ``rm-001`` finds ``RM-001``. The page is
+    picked from the ``(patient_blind_index, occurred_at)`` indexes alone; only
+    the incidents on it are then read in full.
+    """
+    key = blind_index(identifier)
+    if key is None:
+        # A NULL key would match every incident recorded without a patient.
+        raise HTTPException(status_code=422, detail={"error_code": "invalid_identifier", "message": "Patient identifier is blank"})
+    timeline = union_all(
+        select(Incident.id, Incident.occurred_at, false().label("archived")).where(Incident.patient_blind_index == key),
+        select(incidents_archive.c.id, incidents_archive.c.occurred_at, true().label("archived")).where(
+            incidents_archive.c.patient_blind_index == key
+        ),
+    ).subquery()
+    total = int(session.exec(select(func.count()).select_from(timeline)).one())
+    entries = session.exec(
+        select(timeline.c.id, timeline.c.archived)
+        .order_by(timeline.c.occurred_at.desc(), timeline.c.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    ).all()
+
+    found: dict[int, IncidentRead] = {}
+    live = [entry.id for entry in entries if not entry.archived]
+    if live:
+        found.update((row.id, IncidentRead.model_validate(row)) for row in session.exec(select(Incident).where(Incident.id.in_(live))))
+    archived = [entry.id for entry in entries if entry.archived]
+    if archived:
+        found.update((row["id"], IncidentRead.model_validate(row)) for row in load_archived_incidents(session, archived))
+    items = [found[entry.id].model_dump() for entry in entries if entry.id in found]
+    return APIResponse(
+        status_code=200,
+        message="Patient incidents fetched",
+        data={"items": items, "page": page, "per_page": per_page, "total": total},
+    )
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
 from ..models.incident import IncidentCategory
+from ..observability.timing import TimedRoute
 from ..schemas.common import APIResponse
 
-router = APIRouter(prefix="/v1/references", tags=["References"])
+router = APIRouter(prefix="/v1/references", tags=["References"], route_class=TimedRoute)
 
 
 CATEGORY_DESCRIPTIONS = {
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import FileResponse
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..db import get_session
+from ..models.report import ReportJob, ReportStatus
+from ..models.user import User
+from ..observability.timing import TimedRoute
+from ..schemas.common import APIResponse
+from ..schemas.report import ReportJobRead, ReportRequest
+from ..security.permissions import RequireRole
+from ..services.reports.jobs import (
+    MEDIA_TYPES,
+    ReportParameters,
+    ReportRunner,
+    cache_key,
+    data_watermark,
+    find_reusable_job,
+    get_report_runner,
+)
+
+router = APIRouter(prefix="/v1/reports", tags=["Reports"], route_class=TimedRoute)
+
+settings = get_settings()
+require_reporting = RequireRole("mutu", "admin")
+
+
+def _get_job(session: Session, job_id: int) -> ReportJob:
+    job = session.get(ReportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error_code": "report_not_found", "message": "Report job not found"})
+    return job
+
+
+@router.post("", response_model=APIResponse[ReportJobRead], status_code=202)
+def request_report(
+    payload: ReportRequest,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_reporting),
+    runner: ReportRunner = Depends(get_report_runner),
+) -> APIResponse[ReportJobRead]:
+    """Queue an accreditation report, or return the existing one for unchanged data.
+
+    Responds 202 with a new or still-running job and 200 with a finished one;
+    poll ``GET /v1/reports/{id}`` until it is ``DONE``, then download it.
+    """
+    params = ReportParameters(payload.date_from, payload.date_to, payload.department_id)
+    watermark = data_watermark(session, params)
+    key = cache_key(payload.format, params, watermark)
+    job = find_reusable_job(session, key, settings.report_stale_after_seconds)
+    if job is None:
+        job = ReportJob(
+            cache_key=key,
+            format=payload.format,
+            parameters=params.as_dict(),
+            watermark=watermark,
+            requested_by_id=current_user.id,
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        runner.submit(job.id)
+        message = "Report queued"
+    else:
+        message = "Report reused"
+    response.status_code = 200 if job.status == ReportStatus.DONE else 202
+    return APIResponse(status_code=response.status_code, message=message, data=ReportJobRead.model_validate(job))
+
+
+@router.get("/{job_id}", response_model=APIResponse[ReportJobRead], dependencies=[Depends(require_reporting)])
+def get_report(job_id: int, session: Session = Depends(get_session)) -> APIResponse[ReportJobRead]:
+    job = _get_job(session, job_id)
+    return APIResponse(status_code=200, message="Report job fetched", data=ReportJobRead.model_validate(job))
+
+
+@router.get("/{job_id}/download", dependencies=[Depends(require_reporting)])
+def download_report(job_id: int, session: Session = Depends(get_session)) -> FileResponse:
+    job = _get_job(session, job_id)
+    if job.status != ReportStatus.DONE:
+        raise HTTPException(
+            status_code=409,
+            detail={"error_code": "report_not_ready", "message": f"Report job is {job.status.value}"},
+        )
+    path = Path(settings.report_dir) / job.artifact_path
+    if not path.is_file():
+        raise HTTPException(status_code=410, detail={"error_code": "report_expired", "message": "Report file is no longer available"})
+    params = job.parameters
+    suffix = f"-dept{params['department_id']}" if params.get("department_id") is not None else ""
+    filename = f"laporan-akreditasi-{params['date_from']}-{params['date_to']}{suffix}.{job.format}"
+    return FileResponse(path, media_type=MEDIA_TYPES[job.format], filename=filename)
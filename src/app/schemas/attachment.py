@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AttachmentRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    sha256: str
+    size_bytes: int
+    content_type: str
+    created_at: datetime
+
+
+class AttachmentUploadResult(AttachmentRead):
+    deduplicated: bool
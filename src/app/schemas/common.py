@@ -1,4 +1,4 @@
-from typing import Generic, Optional, TypeVar
+from typing import Generic, List, Optional, TypeVar
 
 from pydantic import BaseModel
 
@@ -18,6 +18,12 @@ class Pagination(BaseModel):
     total: int
 
 
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
 class ErrorResponse(BaseModel):
     error_code: str
     message: str
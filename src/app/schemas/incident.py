@@ -7,7 +7,7 @@ from ..models.incident import IncidentCategory, IncidentStatus
 
 
 class IncidentBase(BaseModel):
-    patient_identifier: str | None = None
+    patient_identifier: str | None = Field(default=None, max_length=64)
     occurred_at: datetime | None = None
     location_id: int | None = None
     department_id: int | None = None
@@ -58,8 +58,20 @@ class IncidentRead(BaseModel):
     mutu_decision: IncidentCategory | None
     mutu_notes: str | None
     final_category: IncidentCategory | None
+    suspected_duplicate_of: int | None = None
     created_at: datetime
     updated_at: datetime
+    archived_at: datetime | None = None
 
     class Config:
         from_attributes = True
+
+
+class SimilarIncident(BaseModel):
+    id: int
+    similarity: float
+    occurred_at: datetime
+    department_id: int | None
+    location_id: int | None
+    final_category: IncidentCategory | None
+    free_text_description: str
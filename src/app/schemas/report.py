@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from ..models.report import ReportStatus
+
+
+class ReportRequest(BaseModel):
+    format: Literal["xlsx", "pdf"] = "xlsx"
+    date_from: date
+    date_to: date
+    department_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_period(self) -> "ReportRequest":
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        return self
+
+
+class ReportJobRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    format: str
+    parameters: dict[str, Any]
+    status: ReportStatus
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    row_count: int | None = None
+    size_bytes: int | None = None
+    error: str | None = None
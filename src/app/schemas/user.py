@@ -9,6 +9,9 @@ class RoleRead(BaseModel):
     name: str
     description: str | None = None
 
+    class Config:
+        from_attributes = True
+
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -26,6 +29,14 @@ class UserRead(UserBase):
         from_attributes = True
 
 
+class UserSummary(BaseModel):
+    """Compact projection for user pickers: no roles, no timestamps."""
+
+    id: int
+    email: str
+    full_name: str
+
+
 class UserCreate(UserBase):
     password: str
     role_ids: List[int] | None = None
@@ -1,19 +1,31 @@
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, select
 
 from ..db import get_session
 from ..models.user import User
+from ..observability.context import current_request, phase
 from .jwt import TokenType, decode_token
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Security(bearer_scheme),
     session: Session = Depends(get_session),
 ) -> User:
+    # Plain ``def`` so FastAPI runs it in the threadpool: the query blocks, and on
+    # the event loop a drained connection pool would stall every request.
+    with phase("auth"):
+        user = _authenticate(credentials, session)
+    context = current_request()
+    if context is not None:
+        context.user_id = user.id
+    return user
+
+
+def _authenticate(credentials: HTTPAuthorizationCredentials | None, session: Session) -> User:
     if credentials is None:
         raise HTTPException(status_code=401, detail={"error_code": "auth_required", "message": "Authorization header missing"})
     try:
@@ -29,9 +41,11 @@ async def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=401, detail={"error_code": "invalid_token", "message": "Missing subject"})
 
+    # Joined rather than select-in: every authenticated request pays for this, and
+    # a user has a handful of roles, so one round trip beats two.
     user = session.exec(
-        select(User).options(selectinload(User.roles)).where(User.id == int(user_id))
-    ).one_or_none()
+        select(User).options(joinedload(User.roles)).where(User.id == int(user_id))
+    ).unique().one_or_none()
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail={"error_code": "user_not_active", "message": "Inactive or missing user"})
 
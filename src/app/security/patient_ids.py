@@ -0,0 +1,110 @@
+"""Encryption and blind indexing of patient identifiers.
+
+``Incident.patient_identifier`` is stored AES-256-GCM encrypted with a random
+nonce, so equal identifiers never produce equal ciphertexts. The model reads
+and writes plaintext, because the ``EncryptedString`` column type encrypts on
+the way into the database and decrypts on the way out.
+
+Equality lookups use ``patient_blind_index`` instead. It is a truncated
+HMAC-SHA256 of the normalized identifier (trimmed, upper-cased), under a
+separate key. It is indexed together with ``occurred_at``. Without the key,
+the blind index reveals only which incidents share a patient.
+
+Keys are base64-encoded 32-byte values from ``PATIENT_ENCRYPTION_KEY`` and
+``PATIENT_BLIND_INDEX_KEY``; they have no defaults, and ``check_keys`` fails
+startup when either is missing or malformed. ``cryptography`` is imported on
+first use.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import String, Text
+from sqlalchemy.types import TypeDecorator
+
+from ..config import get_settings
+
+BLIND_INDEX_LENGTH = 32
+_PREFIX = "v1:"
+_NONCE_BYTES = 12
+
+
+def _key(value: str | None, name: str) -> bytes:
+    if not value:
+        raise RuntimeError(f"{name} is not set; generate one with: python -c \"import os, base64; print(base64.b64encode(os.urandom(32)).decode())\"")
+    try:
+        key = base64.b64decode(value, validate=True)
+    except ValueError:
+        key = b""
+    if len(key) != 32:
+        raise RuntimeError(f"{name} must be 32 bytes, base64 encoded")
+    return key
+
+
+@lru_cache
+def _cipher() -> Any:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    return AESGCM(_key(get_settings().patient_encryption_key, "PATIENT_ENCRYPTION_KEY"))
+
+
+@lru_cache
+def _index_key() -> bytes:
+    return _key(get_settings().patient_blind_index_key, "PATIENT_BLIND_INDEX_KEY")
+
+
+def check_keys() -> None:
+    """Raise ``RuntimeError`` unless both keys are configured and valid."""
+    _cipher()
+    _index_key()
+
+
+def normalize(identifier: str) -> str:
+    return identifier.strip().upper()
+
+
+def blind_index(identifier: str | None) -> str | None:
+    normalized = normalize(identifier) if identifier else ""
+    if not normalized:
+        return None
+    digest = hmac.new(_index_key(), normalized.encode(), hashlib.sha256).hexdigest()
+    return digest[:BLIND_INDEX_LENGTH]
+
+
+def encrypt(identifier: str) -> str:
+    nonce = os.urandom(_NONCE_BYTES)
+    sealed = _cipher().encrypt(nonce, identifier.encode(), None)
+    return _PREFIX + base64.urlsafe_b64encode(nonce + sealed).decode()
+
+
+def decrypt(token: str) -> str:
+    if not token.startswith(_PREFIX):
+        raise ValueError("Not an encrypted patient identifier")
+    raw = base64.urlsafe_b64decode(token[len(_PREFIX) :])
+    return _cipher().decrypt(raw[:_NONCE_BYTES], raw[_NONCE_BYTES:], None).decode()
+
+
+class EncryptedString(TypeDecorator):
+    """String column holding ``encrypt``-ed text; Python code sees plaintext."""
+
+    impl = String(255)
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Any) -> str | None:
+        return None if value is None else encrypt(value)
+
+    def process_result_value(self, value: str | None, dialect: Any) -> str | None:
+        return None if value is None else decrypt(value)
+
+
+class EncryptedText(EncryptedString):
+    """Unbounded variant, for stored payloads that may contain identifiers."""
+
+    impl = Text
+    cache_ok = True
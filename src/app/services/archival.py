@@ -0,0 +1,170 @@
+"""Retention: move old closed incidents to archive tables and purge stale drafts.
+
+Each batch is one short transaction. It claims up to ``batch_size`` incidents
+in id order with ``FOR UPDATE SKIP LOCKED``, so a row a reviewer is writing
+is skipped rather than waited on. It copies them and their audit logs with
+INSERT ... SELECT, then deletes the originals. A keyset cursor moves through
+the table, so skipped rows do not stall the run; the next run picks them up.
+
+An incident that a live incident points at through ``suspected_duplicate_of``
+stays until that incident is archived as well.
+
+Archived incidents remain readable by id through ``load_archived_incident``.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import delete, insert, literal, select as sa_select
+from sqlmodel import Session, select
+
+from ..models.archive import audit_logs_archive, incidents_archive
+from ..models.incident import AuditLog, Incident, IncidentStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionResult:
+    archived: int = 0
+    audit_logs: int = 0
+    purged_drafts: int = 0
+    batches: int = 0
+
+
+def _claim(session: Session, conditions: list, after_id: int, batch_size: int) -> List[int]:
+    return list(
+        session.exec(
+            select(Incident.id)
+            .where(Incident.id > after_id, *conditions)
+            .order_by(Incident.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+    )
+
+
+def _move(session: Session, ids: List[int], archived_at: datetime) -> int:
+    """Copy ``ids`` and their audit logs into the archive, then delete them; returns audit rows moved."""
+    incident_columns = [column.name for column in Incident.__table__.columns]
+    session.execute(
+        insert(incidents_archive).from_select(
+            [*incident_columns, "archived_at"],
+            sa_select(*Incident.__table__.columns, literal(archived_at)).where(Incident.id.in_(ids)),
+        )
+    )
+    log_columns = [column.name for column in AuditLog.__table__.columns]
+    moved_logs = session.execute(
+        insert(audit_logs_archive).from_select(
+            [*log_columns, "archived_at"],
+            sa_select(*AuditLog.__table__.columns, literal(archived_at)).where(AuditLog.incident_id.in_(ids)),
+        )
+    ).rowcount
+    session.execute(delete(AuditLog).where(AuditLog.incident_id.in_(ids)))
+    session.execute(delete(Incident).where(Incident.id.in_(ids)))
+    return moved_logs
+
+
+def _movable(ids: List[int], references: List[tuple[int, int]]) -> List[int]:
+    """``ids`` minus every incident still referenced by a row that stays behind.
+
+    Keeping one incident can strand the incidents it references in turn, so
+    this repeats until nothing changes.
+    """
+    moving = set(ids)
+    while True:
+        kept = {target for source, target in references if source not in moving} & moving
+        if not kept:
+            return [incident_id for incident_id in ids if incident_id in moving]
+        moving -= kept
+
+
+def archive_closed(
+    session_factory: Callable[[], Session],
+    older_than: timedelta,
+    batch_size: int = 500,
+    pause_seconds: float = 0.0,
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> RetentionResult:
+    """Archive incidents CLOSED (last updated) more than ``older_than`` ago."""
+    now = now or datetime.utcnow()
+    cutoff = now - older_than
+    conditions = [Incident.status == IncidentStatus.CLOSED, Incident.updated_at < cutoff]
+    result = RetentionResult()
+    after_id = 0
+    while True:
+        with session_factory() as session:
+            ids = _claim(session, conditions, after_id, batch_size)
+            if not ids:
+                return result
+            after_id = ids[-1]
+            references = session.exec(
+                select(Incident.id, Incident.suspected_duplicate_of).where(Incident.suspected_duplicate_of.in_(ids))
+            ).all()
+            movable = _movable(ids, references)
+            if movable and not dry_run:
+                result.audit_logs += _move(session, movable, now)
+                session.commit()
+            else:
+                session.rollback()
+        result.archived += len(movable)
+        result.batches += 1
+        logger.info(
+            "Archived %d closed incidents up to id %d",
+            len(movable),
+            after_id,
+            extra={"archived": len(movable), "skipped": len(ids) - len(movable), "last_id": after_id, "dry_run": dry_run},
+        )
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def purge_drafts(
+    session_factory: Callable[[], Session],
+    older_than: timedelta,
+    batch_size: int = 500,
+    pause_seconds: float = 0.0,
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> RetentionResult:
+    """Delete DRAFT incidents nobody has touched for ``older_than``; drafts are never archived."""
+    cutoff = (now or datetime.utcnow()) - older_than
+    conditions = [Incident.status == IncidentStatus.DRAFT, Incident.updated_at < cutoff]
+    result = RetentionResult()
+    after_id = 0
+    while True:
+        with session_factory() as session:
+            ids = _claim(session, conditions, after_id, batch_size)
+            if not ids:
+                return result
+            after_id = ids[-1]
+            if not dry_run:
+                session.execute(delete(AuditLog).where(AuditLog.incident_id.in_(ids)))
+                session.execute(delete(Incident).where(Incident.id.in_(ids)))
+                session.commit()
+        result.purged_drafts += len(ids)
+        result.batches += 1
+        logger.info(
+            "Purged %d abandoned drafts up to id %d",
+            len(ids),
+            after_id,
+            extra={"purged": len(ids), "last_id": after_id, "dry_run": dry_run},
+        )
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def load_archived_incidents(session: Session, ids: List[int]) -> List[Dict[str, Any]]:
+    statement = sa_select(incidents_archive).where(incidents_archive.c.id.in_(ids))
+    return [dict(row) for row in session.execute(statement).mappings()]
+
+
+def load_archived_incident(session: Session, incident_id: int) -> Dict[str, Any] | None:
+    rows = load_archived_incidents(session, [incident_id])
+    return rows[0] if rows else None
@@ -0,0 +1,176 @@
+"""Content-addressed blob storage for incident attachments.
+
+Uploads are streamed into a staging file while being hashed, so a request body
+is never held in memory and the SHA-256 is known the moment the last chunk
+arrives. The staged file is then published under its digest; a digest that is
+already stored is simply dropped, which deduplicates identical photos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+from ...config import get_settings
+
+CHUNK_SIZE = 64 * 1024
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+class AttachmentTooLarge(Exception):
+    pass
+
+
+def is_digest(value: str) -> bool:
+    return bool(_DIGEST.fullmatch(value))
+
+
+class StagedUpload:
+    """Temporary file plus running SHA-256 for one upload."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        handle, name = tempfile.mkstemp(dir=directory, prefix="upload-")
+        self.path = Path(name)
+        self._file: BinaryIO = os.fdopen(handle, "wb")
+        self._hash = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise AttachmentTooLarge(self.max_bytes)
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> str:
+        self._file.close()
+        return self._hash.hexdigest()
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class AttachmentStorage(ABC):
+    """Where attachment blobs live; staging is always a local directory."""
+
+    def __init__(self, staging_dir: str | Path, max_bytes: int) -> None:
+        self.staging_dir = Path(staging_dir)
+        self.max_bytes = max_bytes
+
+    def stage(self) -> StagedUpload:
+        return StagedUpload(self.staging_dir, self.max_bytes)
+
+    @abstractmethod
+    def commit(self, staged: StagedUpload, digest: str) -> bool:
+        """Publish ``staged`` under ``digest``; returns False when the content already existed."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """Whether content with ``digest`` is stored."""
+
+    @abstractmethod
+    def iter_range(self, digest: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield bytes ``start``..``end`` inclusive."""
+
+
+class LocalStorage(AttachmentStorage):
+    """Files under ``root/ab/cd/<digest>``; staging lives in the same filesystem so publishing is a rename."""
+
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        super().__init__(self.root / "staging", max_bytes)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def commit(self, staged: StagedUpload, digest: str) -> bool:
+        target = self._path(digest)
+        if target.exists():
+            staged.discard()
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged.path, target)
+        return True
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def iter_range(self, digest: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(digest), "rb") as handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+
+class S3Storage(AttachmentStorage):
+    """S3 or any S3-compatible store (MinIO locally); ``boto3`` is imported only when this backend is used."""
+
+    def __init__(self, bucket: str, staging_dir: str | Path, max_bytes: int, endpoint_url: str | None = None, region: str | None = None) -> None:
+        super().__init__(staging_dir, max_bytes)
+        try:
+            import boto3
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("ATTACHMENT_STORAGE=s3 requires the boto3 package") from exc
+        self.bucket = bucket
+        self.client: Any = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def _key(self, digest: str) -> str:
+        return f"attachments/{digest[:2]}/{digest}"
+
+    def exists(self, digest: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(digest))
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return False
+            raise
+        return True
+
+    def commit(self, staged: StagedUpload, digest: str) -> bool:
+        try:
+            if self.exists(digest):
+                return False
+            # upload_file switches to multipart for large files and streams from disk.
+            self.client.upload_file(str(staged.path), self.bucket, self._key(digest))
+            return True
+        finally:
+            staged.discard()
+
+    def iter_range(self, digest: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(digest), Range=f"bytes={start}-{end}")
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+
+@lru_cache
+def get_storage() -> AttachmentStorage:
+    settings = get_settings()
+    if settings.attachment_storage == "s3":
+        return S3Storage(
+            bucket=settings.attachment_s3_bucket,
+            staging_dir=Path(settings.attachment_dir) / "staging",
+            max_bytes=settings.attachment_max_bytes,
+            endpoint_url=settings.attachment_s3_endpoint_url,
+            region=settings.attachment_s3_region,
+        )
+    return LocalStorage(settings.attachment_dir, settings.attachment_max_bytes)
@@ -0,0 +1,10 @@
+"""Artifact-layout helpers that do not need NumPy, so checking for a compiled
+model does not import the scorer."""
+
+from pathlib import Path
+
+META_FILE = "meta.json"
+
+
+def is_compiled_artifact(path: Path) -> bool:
+    return path.is_dir() and (path / META_FILE).exists()
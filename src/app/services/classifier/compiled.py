@@ -0,0 +1,412 @@
+"""Pure-NumPy scorer for text-vectorizer + linear-model pipelines.
+
+``compile_pipeline``/``export_compiled`` need scikit-learn and are only used
+offline (see ``scripts/compile_model.py``). ``CompiledScorer`` only needs NumPy
+and reproduces the pipeline's ``predict``/``predict_proba`` from the exported
+vocabulary and weight matrix.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import shutil
+import tempfile
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .artifact import META_FILE, is_compiled_artifact  # noqa: F401 - re-exported
+
+FORMAT_VERSION = 1
+VOCABULARY_FILE = "vocabulary.json"
+COEF_FILE = "coef.npy"
+INTERCEPT_FILE = "intercept.npy"
+IDF_FILE = "idf.npy"
+
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+
+class UnsupportedPipelineError(ValueError):
+    pass
+
+
+def _strip_accents_unicode(text: str) -> str:
+    try:
+        text.encode("ASCII", errors="strict")
+        return text
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize("NFKD", text)
+        return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+
+
+_ACCENT_FUNCTIONS = {None: None, "unicode": _strip_accents_unicode, "ascii": _strip_accents_ascii}
+
+
+def _rotl32(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (32 - shift))) & 0xFFFFFFFF
+
+
+@lru_cache(maxsize=65536)
+def murmurhash3_32(key: str, seed: int = 0) -> int:
+    """Signed MurmurHash3 (x86, 32-bit) of the UTF-8 bytes, matching ``sklearn.utils.murmurhash3_32``."""
+    data = key.encode("utf-8")
+    c1, c2 = 0xCC9E2D51, 0x1B873593
+    h1 = seed & 0xFFFFFFFF
+    length = len(data)
+    rounded = length - (length % 4)
+    for offset in range(0, rounded, 4):
+        k1 = int.from_bytes(data[offset : offset + 4], "little")
+        k1 = _rotl32((k1 * c1) & 0xFFFFFFFF, 15)
+        h1 ^= (k1 * c2) & 0xFFFFFFFF
+        h1 = (_rotl32(h1, 13) * 5 + 0xE6546B64) & 0xFFFFFFFF
+    tail = data[rounded:]
+    k1 = 0
+    if len(tail) >= 3:
+        k1 ^= tail[2] << 16
+    if len(tail) >= 2:
+        k1 ^= tail[1] << 8
+    if tail:
+        k1 ^= tail[0]
+        k1 = _rotl32((k1 * c1) & 0xFFFFFFFF, 15)
+        h1 ^= (k1 * c2) & 0xFFFFFFFF
+    h1 ^= length
+    h1 ^= h1 >> 16
+    h1 = (h1 * 0x85EBCA6B) & 0xFFFFFFFF
+    h1 ^= h1 >> 13
+    h1 = (h1 * 0xC2B2AE35) & 0xFFFFFFFF
+    h1 ^= h1 >> 16
+    return h1 - (1 << 32) if h1 & 0x80000000 else h1
+
+
+class Analyzer:
+    """Re-implementation of scikit-learn's built-in ``word``/``char``/``char_wb`` analyzers."""
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.kind = config["analyzer"]
+        self.lowercase = config["lowercase"]
+        self.strip_accents = _ACCENT_FUNCTIONS[config["strip_accents"]]
+        self.token_pattern = re.compile(config["token_pattern"]) if config.get("token_pattern") else None
+        self.min_n, self.max_n = config["ngram_range"]
+        self.stop_words = frozenset(config["stop_words"]) if config.get("stop_words") else None
+
+    def __call__(self, doc: str) -> List[str]:
+        if self.lowercase:
+            doc = doc.lower()
+        if self.strip_accents is not None:
+            doc = self.strip_accents(doc)
+        if self.kind == "word":
+            return self._word_ngrams(self.token_pattern.findall(doc))
+        if self.kind == "char_wb":
+            return self._char_wb_ngrams(doc)
+        return self._char_ngrams(doc)
+
+    def _word_ngrams(self, tokens: List[str]) -> List[str]:
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+        min_n, max_n = self.min_n, self.max_n
+        if max_n == 1:
+            return tokens
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        for n in range(min_n, min(max_n + 1, len(original) + 1)):
+            for i in range(len(original) - n + 1):
+                tokens.append(" ".join(original[i : i + n]))
+        return tokens
+
+    def _char_ngrams(self, doc: str) -> List[str]:
+        doc = _WHITE_SPACES.sub(" ", doc)
+        min_n, max_n = self.min_n, self.max_n
+        if min_n == 1:
+            ngrams = list(doc)
+            min_n += 1
+        else:
+            ngrams = []
+        for n in range(min_n, min(max_n + 1, len(doc) + 1)):
+            for i in range(len(doc) - n + 1):
+                ngrams.append(doc[i : i + n])
+        return ngrams
+
+    def _char_wb_ngrams(self, doc: str) -> List[str]:
+        doc = _WHITE_SPACES.sub(" ", doc)
+        ngrams: List[str] = []
+        for word in doc.split():
+            word = f" {word} "
+            for n in range(self.min_n, self.max_n + 1):
+                offset = 0
+                ngrams.append(word[offset : offset + n])
+                while offset + n < len(word):
+                    offset += 1
+                    ngrams.append(word[offset : offset + n])
+                if offset == 0:
+                    break
+        return ngrams
+
+
+def _normalize(values: np.ndarray, norm: str | None) -> np.ndarray:
+    if norm == "l2":
+        scale = math.sqrt(float(np.dot(values, values)))
+    elif norm == "l1":
+        scale = float(np.abs(values).sum())
+    else:
+        return values
+    return values / scale if scale > 0 else values
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+def _softmax(values: np.ndarray) -> np.ndarray:
+    shifted = np.exp(values - values.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+class CompiledScorer:
+    """Duck-types the ``predict``/``predict_proba``/``classes_`` surface of the source pipeline."""
+
+    def __init__(
+        self,
+        meta: Dict[str, Any],
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        vocabulary: Dict[str, int] | None = None,
+        idf: np.ndarray | None = None,
+    ) -> None:
+        self.meta = meta
+        self.version = meta["model_version"]
+        self.classes_ = np.asarray(meta["classes"], dtype=object)
+        self.vectorizer = meta["vectorizer"]
+        self.tfidf = meta.get("tfidf")
+        self.proba = meta["classifier"]["proba"]
+        self.analyzer = Analyzer(self.vectorizer)
+        self.vocabulary = vocabulary
+        self.coef = coef
+        self.intercept = intercept
+        self.idf = idf
+        if self.proba != "none":
+            self.predict_proba = self._predict_proba
+
+    @classmethod
+    def load(cls, path: str | Path, mmap_mode: str | None = "r") -> "CompiledScorer":
+        path = Path(path)
+        meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise UnsupportedPipelineError(f"Unsupported compiled format {meta.get('format_version')}")
+        vocabulary = None
+        if meta["vectorizer"]["kind"] == "count":
+            vocabulary = json.loads((path / VOCABULARY_FILE).read_text(encoding="utf-8"))
+        idf = np.load(path / IDF_FILE, mmap_mode=mmap_mode) if (path / IDF_FILE).exists() else None
+        return cls(
+            meta,
+            coef=np.load(path / COEF_FILE, mmap_mode=mmap_mode),
+            intercept=np.load(path / INTERCEPT_FILE, mmap_mode=mmap_mode),
+            vocabulary=vocabulary,
+            idf=idf,
+        )
+
+    def _features(self, doc: str) -> tuple[np.ndarray, np.ndarray]:
+        tokens = self.analyzer(doc)
+        vectorizer = self.vectorizer
+        if vectorizer["kind"] == "count":
+            vocabulary = self.vocabulary
+            counts = Counter(vocabulary[token] for token in tokens if token in vocabulary)
+        else:
+            n_features = vectorizer["n_features"]
+            alternate_sign = vectorizer["alternate_sign"]
+            counts = Counter()
+            for token in tokens:
+                h = murmurhash3_32(token)
+                index = (2147483647 - (n_features - 1)) % n_features if h == -2147483648 else abs(h) % n_features
+                counts[index] += -1 if alternate_sign and h < 0 else 1
+        if not counts:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if vectorizer["binary"]:
+            values = np.ones_like(values)
+        if vectorizer["kind"] == "hashing":
+            values = _normalize(values, vectorizer["norm"])
+        tfidf = self.tfidf
+        if tfidf is not None:
+            if tfidf["sublinear_tf"]:
+                values = np.log(values) + 1.0
+            if self.idf is not None:
+                values = values * self.idf[indices]
+            values = _normalize(values, tfidf["norm"])
+        return indices, values
+
+    def decision_function(self, docs: Sequence[str]) -> np.ndarray:
+        scores = np.empty((len(docs), self.coef.shape[1]), dtype=np.float64)
+        for row, doc in enumerate(docs):
+            indices, values = self._features(doc)
+            scores[row] = values @ self.coef[indices] + self.intercept
+        return scores[:, 0] if scores.shape[1] == 1 else scores
+
+    def _predict_proba(self, docs: Sequence[str]) -> np.ndarray:
+        decision = self.decision_function(docs)
+        if self.proba == "softmax":
+            if decision.ndim == 1:
+                decision = np.c_[-decision, decision]
+            return _softmax(decision)
+        prob = _sigmoid(decision)
+        if prob.ndim == 1:
+            return np.vstack([1 - prob, prob]).T
+        return prob / prob.sum(axis=1, keepdims=True)
+
+    def predict(self, docs: Sequence[str]) -> np.ndarray:
+        decision = self.decision_function(docs)
+        if decision.ndim == 1:
+            return self.classes_[(decision > 0).astype(int)]
+        return self.classes_[decision.argmax(axis=1)]
+
+
+def _vectorizer_config(vectorizer: Any) -> Dict[str, Any]:
+    from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+
+    if not isinstance(vectorizer, (CountVectorizer, HashingVectorizer)):
+        raise UnsupportedPipelineError(f"Unsupported vectorizer {type(vectorizer).__name__}")
+    if callable(vectorizer.analyzer) or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        raise UnsupportedPipelineError("Custom analyzer/tokenizer/preprocessor callables cannot be compiled")
+    if callable(vectorizer.strip_accents) or vectorizer.strip_accents not in _ACCENT_FUNCTIONS:
+        raise UnsupportedPipelineError(f"Unsupported strip_accents={vectorizer.strip_accents!r}")
+    if vectorizer.input != "content":
+        raise UnsupportedPipelineError("Only input='content' vectorizers can be compiled")
+    stop_words = None
+    if vectorizer.analyzer == "word":
+        stop_words = vectorizer.get_stop_words()
+    config: Dict[str, Any] = {
+        "analyzer": vectorizer.analyzer,
+        "lowercase": bool(vectorizer.lowercase),
+        "strip_accents": vectorizer.strip_accents,
+        "token_pattern": vectorizer.token_pattern if vectorizer.analyzer == "word" else None,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": bool(vectorizer.binary),
+    }
+    if isinstance(vectorizer, HashingVectorizer):
+        config.update(
+            kind="hashing",
+            n_features=int(vectorizer.n_features),
+            alternate_sign=bool(vectorizer.alternate_sign),
+            norm=vectorizer.norm,
+        )
+    else:
+        config["kind"] = "count"
+    return config
+
+
+def _tfidf_config(transformer: Any) -> Dict[str, Any]:
+    return {"norm": transformer.norm, "sublinear_tf": bool(transformer.sublinear_tf), "use_idf": bool(transformer.use_idf)}
+
+
+def _proba_mode(classifier: Any) -> str:
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    if isinstance(classifier, LogisticRegression):
+        ovr = classifier.multi_class in ("ovr", "warn") or (
+            classifier.multi_class == "auto" and (classifier.classes_.size <= 2 or classifier.solver == "liblinear")
+        )
+        return "ovr" if ovr else "softmax"
+    if isinstance(classifier, SGDClassifier) and classifier.loss in ("log_loss", "log"):
+        return "ovr"
+    if hasattr(classifier, "predict_proba"):
+        raise UnsupportedPipelineError(f"Probability calibration of {type(classifier).__name__} is not supported")
+    return "none"
+
+
+def compile_pipeline(pipeline: Any, model_version: str | None = None) -> CompiledScorer:
+    """Extract vocabulary, idf and weights from a fitted ``Pipeline`` into a ``CompiledScorer``."""
+    from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
+    from sklearn.linear_model._base import LinearClassifierMixin
+
+    steps = [step for _, step in getattr(pipeline, "steps", []) if step not in (None, "passthrough")]
+    if len(steps) not in (2, 3):
+        raise UnsupportedPipelineError("Expected vectorizer [+ TfidfTransformer] + linear classifier")
+    vectorizer, classifier = steps[0], steps[-1]
+    if not isinstance(classifier, LinearClassifierMixin):
+        raise UnsupportedPipelineError(f"Unsupported classifier {type(classifier).__name__}")
+
+    config = _vectorizer_config(vectorizer)
+    vocabulary = None
+    n_features = config.get("n_features")
+    if config["kind"] == "count":
+        vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+        n_features = len(vocabulary)
+
+    tfidf = None
+    idf = None
+    if isinstance(vectorizer, TfidfVectorizer):
+        tfidf = _tfidf_config(vectorizer)
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else None
+    if len(steps) == 3:
+        if tfidf is not None or not isinstance(steps[1], TfidfTransformer):
+            raise UnsupportedPipelineError("Only a TfidfTransformer may sit between vectorizer and classifier")
+        tfidf = _tfidf_config(steps[1])
+        idf = np.asarray(steps[1].idf_, dtype=np.float64) if steps[1].use_idf else None
+
+    coef = np.ascontiguousarray(np.asarray(classifier.coef_, dtype=np.float64).T)
+    if coef.shape[0] != n_features:
+        raise UnsupportedPipelineError(f"Classifier expects {coef.shape[0]} features, vectorizer yields {n_features}")
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version or getattr(pipeline, "version", None) or "compiled",
+        "classes": [str(label) for label in classifier.classes_],
+        "vectorizer": config,
+        "tfidf": tfidf,
+        "classifier": {"type": type(classifier).__name__, "proba": _proba_mode(classifier)},
+    }
+    intercept = np.atleast_1d(np.asarray(classifier.intercept_, dtype=np.float64))
+    return CompiledScorer(meta, coef=coef, intercept=intercept, vocabulary=vocabulary, idf=idf)
+
+
+def export_compiled(scorer: CompiledScorer, out_dir: str | Path) -> Path:
+    """Write the artifact next to ``out_dir`` and swap it into place in one rename."""
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}-", dir=out_dir.parent))
+    np.save(staging / COEF_FILE, scorer.coef)
+    np.save(staging / INTERCEPT_FILE, scorer.intercept)
+    if scorer.idf is not None:
+        np.save(staging / IDF_FILE, scorer.idf)
+    if scorer.vocabulary is not None:
+        (staging / VOCABULARY_FILE).write_text(json.dumps(scorer.vocabulary, ensure_ascii=False), encoding="utf-8")
+    (staging / META_FILE).write_text(json.dumps(scorer.meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    if out_dir.exists():
+        retired = out_dir.with_name(f".{out_dir.name}-retired")
+        shutil.rmtree(retired, ignore_errors=True)
+        out_dir.rename(retired)
+        staging.rename(out_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        staging.rename(out_dir)
+    return out_dir
+
+
+def verify_compiled(pipeline: Any, scorer: CompiledScorer, corpus: Iterable[str], atol: float = 1e-9) -> Dict[str, Any]:
+    """Compare compiled output with the sklearn pipeline on ``corpus``."""
+    docs = list(corpus)
+    expected_labels = np.asarray(pipeline.predict(docs)).astype(str)
+    labels_match = bool(np.array_equal(expected_labels, scorer.predict(docs).astype(str)))
+    max_abs_diff = 0.0
+    if hasattr(pipeline, "predict_proba") and hasattr(scorer, "predict_proba"):
+        max_abs_diff = float(np.max(np.abs(pipeline.predict_proba(docs) - scorer.predict_proba(docs)), initial=0.0))
+    return {
+        "documents": len(docs),
+        "labels_match": labels_match,
+        "max_abs_proba_diff": max_abs_diff,
+        "ok": labels_match and max_abs_diff <= atol,
+    }
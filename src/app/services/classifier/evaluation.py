@@ -0,0 +1,127 @@
+"""Streaming classification metrics for offline model evaluation."""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from ...models.incident import IncidentCategory
+
+LABELS = [category.value for category in IncidentCategory]
+
+
+class ClassificationReport:
+    """Accumulates a confusion matrix and confidence calibration one prediction at a time."""
+
+    def __init__(self, bins: int = 10) -> None:
+        self.bins = bins
+        self.confusion: Dict[str, Dict[str, int]] = {actual: defaultdict(int) for actual in LABELS}
+        self._bin_count = [0] * bins
+        self._bin_confidence = [0.0] * bins
+        self._bin_correct = [0] * bins
+        self._brier = 0.0
+        self._calibrated = 0
+        self.total = 0
+        self.correct = 0
+
+    def add(self, actual: str, predicted: str | None, confidence: float | None = None) -> None:
+        predicted = predicted or "<none>"
+        self.confusion.setdefault(actual, defaultdict(int))[predicted] += 1
+        self.total += 1
+        hit = actual == predicted
+        self.correct += hit
+        if confidence is None:
+            return
+        confidence = min(max(float(confidence), 0.0), 1.0)
+        index = min(int(confidence * self.bins), self.bins - 1)
+        self._bin_count[index] += 1
+        self._bin_confidence[index] += confidence
+        self._bin_correct[index] += hit
+        self._brier += (confidence - hit) ** 2
+        self._calibrated += 1
+
+    def per_category(self) -> Dict[str, Dict[str, float]]:
+        predicted_totals: Dict[str, int] = defaultdict(int)
+        for row in self.confusion.values():
+            for predicted, count in row.items():
+                predicted_totals[predicted] += count
+        metrics = {}
+        for label in LABELS:
+            true_positive = self.confusion[label].get(label, 0)
+            support = sum(self.confusion[label].values())
+            precision = true_positive / predicted_totals[label] if predicted_totals[label] else 0.0
+            recall = true_positive / support if support else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            metrics[label] = {"precision": precision, "recall": recall, "f1": f1, "support": support}
+        return metrics
+
+    def calibration(self) -> Dict[str, Any]:
+        bins = []
+        expected_error = 0.0
+        for index in range(self.bins):
+            count = self._bin_count[index]
+            if not count:
+                continue
+            mean_confidence = self._bin_confidence[index] / count
+            accuracy = self._bin_correct[index] / count
+            expected_error += count / self._calibrated * abs(accuracy - mean_confidence)
+            bins.append(
+                {
+                    "range": [index / self.bins, (index + 1) / self.bins],
+                    "count": count,
+                    "mean_confidence": mean_confidence,
+                    "accuracy": accuracy,
+                }
+            )
+        return {
+            "ece": expected_error,
+            "brier": self._brier / self._calibrated if self._calibrated else None,
+            "bins": bins,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        per_category = self.per_category()
+        supported = [metrics for metrics in per_category.values() if metrics["support"]]
+        return {
+            "total": self.total,
+            "accuracy": self.correct / self.total if self.total else 0.0,
+            "macro_f1": sum(m["f1"] for m in supported) / len(supported) if supported else 0.0,
+            "per_category": per_category,
+            "confusion": {actual: dict(row) for actual, row in self.confusion.items()},
+            "calibration": self.calibration(),
+        }
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure_latency(predict: Callable[[str], Any], texts: Iterable[str]) -> Dict[str, float]:
+    """Time single-text predictions; returns throughput and latency percentiles in milliseconds."""
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for text in texts:
+        call_started = time.perf_counter()
+        predict(text)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def measure_batch_throughput(predict_batch: Callable[[List[str]], Any], texts: Sequence[str], batch_size: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        predict_batch(list(texts[offset : offset + batch_size]))
+    elapsed = time.perf_counter() - started
+    return len(texts) / elapsed if elapsed else 0.0
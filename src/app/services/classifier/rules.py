@@ -0,0 +1,137 @@
+"""Keyword rules used when no trained model is available.
+
+The rules table maps phrases to an ``IncidentCategory`` with a weight. At load
+time every phrase is folded into a character trie and emitted as one regular
+expression, so a text is scanned once no matter how many rules exist; the
+regex engine only ever branches on the next character. Matches are
+word-bounded, so ``obat`` does not fire inside ``pengobatan`` unless that form
+is listed explicitly.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+from ...models.incident import IncidentCategory
+
+DEFAULT_RULES_TABLE: Dict[str, Any] = {
+    "default": {"category": "KTC", "confidence": 0.5},
+    "rules": [
+        {"category": "KTD", "weight": 1.5, "phrases": ["jatuh", "terjatuh", "fall", "fell"]},
+        {"category": "KTD", "weight": 1.0, "phrases": ["cedera", "luka", "memar", "fraktur", "injury"]},
+        {
+            "category": "KNC",
+            "weight": 1.2,
+            "phrases": ["obat", "medikasi", "medication", "medicine", "dosis", "salah obat"],
+        },
+        {"category": "KNC", "weight": 1.0, "phrases": ["nyaris", "hampir", "near miss"]},
+        {"category": "KPCS", "weight": 1.0, "phrases": ["berpotensi", "potensi cedera", "membahayakan"]},
+        {
+            "category": "Sentinel",
+            "weight": 2.0,
+            "phrases": ["meninggal", "kematian", "salah sisi operasi", "salah pasien operasi", "death"],
+        },
+    ],
+}
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    category: IncidentCategory
+    phrase: str
+    weight: float
+
+
+def _normalize_phrase(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [(r"\s+" if char == " " else re.escape(char)) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+class RulesEngine:
+    def __init__(self, rules: Sequence[KeywordRule], default_category: IncidentCategory, default_confidence: float) -> None:
+        self.rules = list(rules)
+        self.default_category = default_category
+        self.default_confidence = default_confidence
+        self._phrase_rules: Dict[str, List[int]] = defaultdict(list)
+        for index, rule in enumerate(self.rules):
+            self._phrase_rules[rule.phrase].append(index)
+        # Table order breaks score ties, so earlier categories win.
+        self._priority = {}
+        for rule in self.rules:
+            self._priority.setdefault(rule.category, len(self._priority))
+        self._pattern = (
+            re.compile(rf"(?<!\w){_trie_pattern(self._phrase_rules)}(?!\w)") if self._phrase_rules else None
+        )
+
+    @classmethod
+    def from_table(cls, table: Dict[str, Any]) -> "RulesEngine":
+        rules = [
+            KeywordRule(IncidentCategory(entry["category"]), _normalize_phrase(phrase), float(entry.get("weight", 1.0)))
+            for entry in table.get("rules", [])
+            for phrase in entry["phrases"]
+            if phrase.strip()
+        ]
+        default = table.get("default", {})
+        return cls(
+            rules,
+            default_category=IncidentCategory(default.get("category", IncidentCategory.KTC.value)),
+            default_confidence=float(default.get("confidence", 0.5)),
+        )
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "RulesEngine":
+        return cls.from_table(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def matches(self, text: str) -> set[int]:
+        if self._pattern is None:
+            return set()
+        matched: set[int] = set()
+        for phrase in self._pattern.findall(text.lower()):
+            matched.update(self._phrase_rules[" ".join(phrase.split())])
+        return matched
+
+    def score(self, text: str) -> Dict[str, Any]:
+        scores: Dict[IncidentCategory, float] = defaultdict(float)
+        for index in self.matches(text):
+            rule = self.rules[index]
+            scores[rule.category] += rule.weight
+        if not scores:
+            return {"category": self.default_category, "confidence": self.default_confidence}
+        category = min(scores, key=lambda c: (-scores[c], self._priority[c]))
+        # Share of the evidence with one pseudo-count of doubt: a lone weight-1.5
+        # keyword gives 0.6, and conflicting keywords pull confidence down.
+        confidence = scores[category] / (sum(scores.values()) + 1.0)
+        return {"category": category, "confidence": round(confidence, 4)}
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.score(text) for text in texts]
+
+
+def load_rules_engine(path: str | None) -> RulesEngine:
+    if path:
+        return RulesEngine.from_file(path)
+    return RulesEngine.from_table(DEFAULT_RULES_TABLE)
@@ -0,0 +1,215 @@
+"""Idempotency keys for retried POST requests.
+
+Clients on flaky connections retry POSTs whose response they never saw. A
+request with an ``Idempotency-Key`` header first claims the key for its user
+by inserting an ``IdempotencyKey`` row; the unique constraint lets exactly one
+request through. The endpoint puts its response on the row through
+``Idempotency.respond`` before its own commit, so the response is stored in
+the same transaction as the work. A later request with the same key and the same method,
+path and body gets that stored response back, and the endpoint does not run.
+A duplicate that arrives while the first one is still running polls the row
+for up to ``IDEMPOTENCY_WAIT_SECONDS`` rather than running alongside it.
+
+A request whose transaction rolls back releases its claim so the client can
+retry. A claim
+abandoned by a killed worker is taken over after ``IDEMPOTENCY_LOCK_SECONDS``.
+Keys live for ``IDEMPOTENCY_TTL_HOURS``; ``purge_expired`` deletes old rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+
+from fastapi import Depends, Header, HTTPException, Request
+from sqlalchemy import delete, event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from ..config import get_settings
+from ..db import get_session
+from ..models.idempotency import IdempotencyKey
+from ..models.user import User
+from ..schemas.common import APIResponse
+from ..security.dependencies import get_current_user
+
+logger = logging.getLogger(__name__)
+
+KEY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+_POLL_SECONDS = (0.05, 0.1, 0.2, 0.5)
+_STAGED_KEY = "idempotency_staged"
+_STORED_KEY = "idempotency_stored"
+
+
+class IdempotentReplay(Exception):
+    """Raised instead of running the endpoint again; main.py turns it into the stored response."""
+
+    def __init__(self, status_code: int, body: Any) -> None:
+        super().__init__(status_code)
+        self.status_code = status_code
+        self.body = body
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _insert(session: Session, user_id: int, key: str, request_fingerprint: str, now: datetime) -> IdempotencyKey | None:
+    ttl = timedelta(hours=get_settings().idempotency_ttl_hours)
+    record = IdempotencyKey(user_id=user_id, key=key, fingerprint=request_fingerprint, expires_at=now + ttl)
+    session.add(record)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+    return record
+
+
+def _take_over(session: Session, existing: IdempotencyKey, request_fingerprint: str, now: datetime) -> IdempotencyKey | None:
+    """Reuse an expired or abandoned row; the ``created_at`` check makes sure only one request wins it."""
+    ttl = timedelta(hours=get_settings().idempotency_ttl_hours)
+    taken = session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.id == existing.id, IdempotencyKey.created_at == existing.created_at)
+        .values(
+            fingerprint=request_fingerprint,
+            response_status=None,
+            response_body=None,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + ttl,
+        )
+    ).rowcount
+    session.commit()
+    return session.get(IdempotencyKey, existing.id) if taken else None
+
+
+def claim(session: Session, user_id: int, key: str, request_fingerprint: str) -> IdempotencyKey:
+    """Claim ``key`` for this request, or raise with the outcome of the request that already holds it."""
+    settings = get_settings()
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    polls = 0
+    now = datetime.utcnow()
+    record = _insert(session, user_id, key, request_fingerprint, now)
+    while record is None:
+        now = datetime.utcnow()
+        existing = session.exec(
+            select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).one_or_none()
+        if existing is None:  # released by a failed request in the meantime
+            record = _insert(session, user_id, key, request_fingerprint, now)
+            continue
+        abandoned = existing.response_status is None and existing.created_at < now - timedelta(seconds=settings.idempotency_lock_seconds)
+        if existing.expires_at <= now or abandoned:
+            record = _take_over(session, existing, request_fingerprint, now)
+            continue
+        if existing.fingerprint != request_fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail={"error_code": "idempotency_key_reused", "message": "Idempotency-Key was already used for a different request"},
+            )
+        if existing.response_status is not None:
+            raise IdempotentReplay(existing.response_status, json.loads(existing.response_body or "null"))
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail={"error_code": "idempotency_in_progress", "message": "A request with this Idempotency-Key is still in progress"},
+            )
+        # End the transaction so the next read sees the other request's commit.
+        session.rollback()
+        time.sleep(_POLL_SECONDS[min(polls, len(_POLL_SECONDS) - 1)])
+        polls += 1
+    return record
+
+
+def release(session: Session, record: IdempotencyKey) -> None:
+    session.rollback()
+    session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record.id, IdempotencyKey.response_status.is_(None)))
+    session.commit()
+
+
+class Idempotency:
+    """What ``get_idempotency`` hands to an endpoint; without a key header it does nothing."""
+
+    def __init__(self, session: Session, record: IdempotencyKey | None = None) -> None:
+        self.session = session
+        self.record = record
+
+    def respond(self, response: APIResponse) -> APIResponse:
+        """Stage ``response`` for replays and return it; call before the endpoint's commit, which stores both."""
+        if self.record is not None:
+            self.record.response_status = response.status_code
+            self.record.response_body = json.dumps(response.model_dump(mode="json"))
+            self.record.touch()
+            self.session.add(self.record)
+            self.session.info[_STAGED_KEY] = self.record.id
+        return response
+
+    @property
+    def stored(self) -> bool:
+        """Whether the response was committed; read once the endpoint has returned or raised."""
+        return self.record is not None and self.session.info.get(_STORED_KEY) == self.record.id
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _mark_stored(session: ORMSession) -> None:
+    staged = session.info.pop(_STAGED_KEY, None)
+    if staged is not None:
+        session.info[_STORED_KEY] = staged
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_staged(session: ORMSession) -> None:
+    session.info.pop(_STAGED_KEY, None)
+
+
+async def _request_body(request: Request) -> bytes:
+    # FastAPI has already read the body to parse it; this returns the cached bytes.
+    return await request.body()
+
+
+def get_idempotency(
+    request: Request,
+    body: bytes = Depends(_request_body),
+    idempotency_key: str | None = Header(default=None, alias=KEY_HEADER, min_length=1, max_length=255),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Iterator[Idempotency]:
+    if idempotency_key is None:
+        yield Idempotency(session)
+        return
+    record = claim(session, current_user.id, idempotency_key, fingerprint(request.method, request.url.path, body))
+    guard = Idempotency(session, record)
+    try:
+        yield guard
+    finally:
+        # Work that committed keeps its key even if the endpoint failed afterwards; a retry replays it.
+        if not guard.stored:
+            release(session, record)
+        session.info.pop(_STORED_KEY, None)
+
+
+def purge_expired(session_factory: Callable[[], Session], batch_size: int = 500, now: datetime | None = None) -> int:
+    """Delete expired keys in batches; returns how many were deleted."""
+    now = now or datetime.utcnow()
+    purged = 0
+    while True:
+        with session_factory() as session:
+            ids = list(
+                session.exec(select(IdempotencyKey.id).where(IdempotencyKey.expires_at < now).limit(batch_size)).all()
+            )
+            if not ids:
+                return purged
+            session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+            session.commit()
+        purged += len(ids)
+        logger.info("Purged %d expired idempotency keys", len(ids), extra={"purged": len(ids)})
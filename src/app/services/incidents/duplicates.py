@@ -0,0 +1,321 @@
+"""Near-duplicate detection for incident reports.
+
+Two nurses on the same shift often report the same fall. Each description is
+reduced to character 4-gram shingles and a MinHash signature of
+``NUM_PERM`` values, which is split into ``BANDS`` bands for locality
+sensitive hashing: two reports land in the same bucket when one whole band
+matches, which is likely above roughly 50% Jaccard similarity and unlikely
+below it. Buckets are keyed by location as well, so a lookup only sees
+reports from the same place. Candidates are then checked for
+``occurred_at`` within the window, for patient identifiers that do not
+conflict (compared by blind index, so nothing is decrypted), and for an
+estimated similarity of at least the threshold.
+
+The index lives in process memory and only covers recent incidents
+(``DUPLICATE_INDEX_DAYS``). Signatures are computed when a draft is created or
+edited and enter the index when that transaction commits, so
+``submit_incident`` only pays for a few dictionary lookups. Before each
+lookup, ``sync`` reads rows changed since the previous one, which brings in
+reports written by other workers. The first load signs every recent incident,
+which takes seconds on a busy hospital, so it runs in a background thread
+started by the first submit; until it finishes, submits are not checked.
+``scripts/flag_duplicates.py`` runs the same matching over historical data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import operator
+import re
+import threading
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from ...config import get_settings
+from ...models.incident import Incident, IncidentStatus
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+# Only the candidates sharing the most bands get a full signature comparison.
+MAX_COMPARISONS = 8
+# Rows committed just before the previous sync may carry an older updated_at.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+_PENDING_KEY = "duplicate_index_entries"
+
+INDEXED_COLUMNS = (
+    Incident.id,
+    Incident.free_text_description,
+    Incident.location_id,
+    Incident.patient_blind_index,
+    Incident.occurred_at,
+    Incident.status,
+)
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def _permutations() -> List[Tuple[int, int]]:
+    # Fixed seeds: signatures must agree across workers and restarts.
+    params = []
+    for index in range(NUM_PERM):
+        digest = hashlib.blake2b(f"minhash-{index}".encode(), digest_size=16).digest()
+        params.append((int.from_bytes(digest[:8], "big") % (_MERSENNE - 1) + 1, int.from_bytes(digest[8:], "big") % _MERSENNE))
+    return params
+
+
+_PERMUTATIONS = _permutations()
+
+
+def shingles(text: str) -> Set[int]:
+    normalized = " ".join(_NON_WORD.sub(" ", text.lower()).split())
+    if len(normalized) <= SHINGLE_SIZE:
+        return {zlib.crc32(normalized.encode())}
+    return {zlib.crc32(normalized[i : i + SHINGLE_SIZE].encode()) for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> array:
+    values = shingles(text)
+    return array("I", (min(((a * value + b) % _MERSENNE) & _MAX_HASH for value in values) for a, b in _PERMUTATIONS))
+
+
+def similarity(left: array, right: array) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(map(operator.eq, left, right)) / NUM_PERM
+
+
+@dataclass
+class _Entry:
+    signature: array
+    text_crc: int
+    location_id: int | None
+    patient_blind_index: str | None
+    occurred_at: datetime
+    submitted: bool
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    incident_id: int
+    similarity: float
+
+
+class DuplicateIndex:
+    """MinHash/LSH index of recent incidents; safe to share between threads."""
+
+    def __init__(self, window_hours: float = 12.0, threshold: float = 0.6, retention_days: int = 30) -> None:
+        self.window = timedelta(hours=window_hours)
+        self.threshold = threshold
+        self.retention = timedelta(days=retention_days)
+        self._entries: Dict[int, _Entry] = {}
+        self._buckets: Dict[Tuple[int | None, int, bytes], Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+        # Serializes syncs so concurrent requests do not each reload the same rows.
+        self._sync_lock = threading.Lock()
+        self._builder: threading.Thread | None = None
+        self.synced_at: datetime | None = None
+        self._evicted_at: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the initial load has finished."""
+        return self.synced_at is not None
+
+    @staticmethod
+    def _bands(entry: _Entry) -> Iterable[Tuple[int | None, int, bytes]]:
+        for band in range(BANDS):
+            rows = entry.signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+            yield entry.location_id, band, rows.tobytes()
+
+    def _remove(self, incident_id: int) -> None:
+        entry = self._entries.pop(incident_id, None)
+        if entry is None:
+            return
+        for key in self._bands(entry):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(incident_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, incident: Incident) -> None:
+        """Index ``incident`` or refresh its entry; the signature is reused while the text is unchanged.
+
+        Accepts anything with the incident's attributes, such as a row from
+        ``select(*INDEXED_COLUMNS)``.
+        """
+        self._put(incident.id, self._make_entry(incident))
+
+    def _make_entry(self, incident: Incident) -> _Entry:
+        text_crc = zlib.crc32(incident.free_text_description.encode())
+        with self._lock:
+            current = self._entries.get(incident.id)
+        sig = current.signature if current is not None and current.text_crc == text_crc else signature(incident.free_text_description)
+        return _Entry(
+            signature=sig,
+            text_crc=text_crc,
+            location_id=incident.location_id,
+            patient_blind_index=incident.patient_blind_index,
+            occurred_at=incident.occurred_at,
+            submitted=incident.status != IncidentStatus.DRAFT,
+        )
+
+    def _put(self, incident_id: int, entry: _Entry) -> None:
+        with self._lock:
+            self._remove(incident_id)
+            self._entries[incident_id] = entry
+            for key in self._bands(entry):
+                self._buckets[key].add(incident_id)
+
+    def discard(self, incident_id: int) -> None:
+        with self._lock:
+            self._remove(incident_id)
+
+    def find(self, incident: Incident) -> DuplicateMatch | None:
+        """The most similar submitted report of the same event, if any."""
+        probe = self._entries.get(incident.id)
+        sig = probe.signature if probe is not None else signature(incident.free_text_description)
+        best: DuplicateMatch | None = None
+        with self._lock:
+            band_hits: Counter[int] = Counter()
+            for band in range(BANDS):
+                key = (incident.location_id, band, sig[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].tobytes())
+                band_hits.update(self._buckets.get(key, ()))
+            band_hits.pop(incident.id, None)
+            compared = 0
+            for candidate_id, _ in band_hits.most_common():
+                entry = self._entries[candidate_id]
+                if not entry.submitted or abs(entry.occurred_at - incident.occurred_at) > self.window:
+                    continue
+                if incident.patient_blind_index and entry.patient_blind_index and entry.patient_blind_index != incident.patient_blind_index:
+                    continue
+                score = similarity(sig, entry.signature)
+                if score >= self.threshold and (best is None or (score, -candidate_id) > (best.similarity, -best.incident_id)):
+                    best = DuplicateMatch(candidate_id, score)
+                compared += 1
+                if compared == MAX_COMPARISONS:
+                    break
+        return best
+
+    def sync(self, session: Session, now: datetime | None = None, wait: bool = True) -> int:
+        """Load incidents changed since the last sync (everything recent on the first call).
+
+        With ``wait=False`` the call returns 0 straight away while another
+        thread is syncing; that sync brings in the same rows.
+        """
+        if not self._sync_lock.acquire(blocking=wait):
+            return 0
+        try:
+            now = now or datetime.utcnow()
+            statement = select(*INDEXED_COLUMNS)
+            if self.synced_at is None:
+                statement = statement.where(Incident.occurred_at >= now - self.retention)
+            else:
+                statement = statement.where(Incident.updated_at >= self.synced_at - SYNC_OVERLAP)
+            rows = session.exec(statement).all()
+            for row in rows:
+                self.add(row)
+            self.synced_at = now
+            if self._evicted_at is None or now - self._evicted_at > timedelta(hours=1):
+                self.evict(now)
+            return len(rows)
+        finally:
+            self._sync_lock.release()
+
+    def build_in_background(self, session_factory: Callable[[], Session]) -> threading.Thread:
+        """Start the initial load in a daemon thread, unless one is already running."""
+        with self._lock:
+            if self._builder is None or not self._builder.is_alive():
+                self._builder = threading.Thread(
+                    target=self._build, args=(session_factory,), name="duplicate-index-build", daemon=True
+                )
+                self._builder.start()
+            return self._builder
+
+    def _build(self, session_factory: Callable[[], Session]) -> None:
+        try:
+            with session_factory() as session:
+                loaded = self.sync(session)
+        except Exception:
+            # The next submit starts another attempt.
+            logger.exception("Building the duplicate index failed")
+            return
+        logger.info("Duplicate index loaded %d incidents", loaded, extra={"indexed": loaded})
+
+    def evict(self, now: datetime) -> None:
+        cutoff = now - self.retention
+        self._evicted_at = now
+        with self._lock:
+            for incident_id in [key for key, entry in self._entries.items() if entry.occurred_at < cutoff]:
+                self._remove(incident_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.synced_at = None
+            self._evicted_at = None
+
+
+_settings = get_settings()
+duplicate_index = DuplicateIndex(_settings.duplicate_window_hours, _settings.duplicate_threshold, _settings.duplicate_index_days)
+
+
+def index_on_commit(session: Session, incident: Incident) -> None:
+    """Add ``incident`` to the shared index once ``session`` commits.
+
+    The signature is computed now, while the attributes are loaded; a rollback
+    drops it, so the index never holds a report that was not saved.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append((incident.id, duplicate_index._make_entry(incident)))
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _index_committed(session: ORMSession) -> None:
+    for incident_id, entry in session.info.pop(_PENDING_KEY, []):
+        duplicate_index._put(incident_id, entry)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_uncommitted(session: ORMSession) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def check_duplicate(session: Session, incident: Incident) -> DuplicateMatch | None:
+    """Sync the shared index and look up ``incident`` in it.
+
+    Returns ``None`` without looking while the index is still being loaded.
+    The match is confirmed against the database, so an entry for a report that
+    was archived or never committed is dropped rather than returned.
+    """
+    if not duplicate_index.ready:
+        bind = session.get_bind()
+        duplicate_index.build_in_background(lambda: Session(bind))
+        return None
+    duplicate_index.sync(session, wait=False)
+    while (match := duplicate_index.find(incident)) is not None:
+        exists = session.exec(
+            select(Incident.id).where(Incident.id == match.incident_id, Incident.status != IncidentStatus.DRAFT)
+        ).first()
+        if exists is not None:
+            return match
+        duplicate_index.discard(match.incident_id)
+    return None
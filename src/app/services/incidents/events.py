@@ -0,0 +1,333 @@
+"""Incident status changes pushed to dashboards over Server-Sent Events.
+
+``create_audit_log`` queues an event on the session; it is published to the
+in-process ``broadcaster`` only once the transaction commits, with the audit
+log id as the event id. Each SSE client owns a bounded queue: a client that
+falls behind is disconnected instead of buffering without limit, and its
+browser reconnects with ``Last-Event-ID`` and catches up from the ring buffer
+or, when it fell further behind than that, from ``audit_logs``.
+
+With several workers, only the worker that committed a transition sees it
+through the session hook. ``AuditLogPoller`` (``INCIDENT_EVENTS_BACKEND=database``)
+makes ``audit_logs`` the shared backend: every worker polls it and publishes
+rows it has not seen yet.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from ...config import get_settings
+from ...models.incident import AuditLog, Incident
+from ...observability.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "incident_events"
+
+
+@dataclass(frozen=True)
+class IncidentEvent:
+    id: int
+    incident_id: int
+    reporter_id: int
+    department_id: int | None
+    from_status: str | None
+    to_status: str | None
+    actor_id: int
+    occurred_at: str
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: incident.status_changed\ndata: {json.dumps(asdict(self))}\n\n"
+
+
+@dataclass(frozen=True)
+class EventScope:
+    """What one subscriber may see: every incident for reviewers, own incidents otherwise."""
+
+    reporter_id: int | None = None
+    department_id: int | None = None
+
+    def allows(self, incident_event: IncidentEvent) -> bool:
+        if self.reporter_id is not None and incident_event.reporter_id != self.reporter_id:
+            return False
+        if self.department_id is not None and incident_event.department_id != self.department_id:
+            return False
+        return True
+
+
+def event_from_rows(log: AuditLog, incident: Incident) -> IncidentEvent:
+    return IncidentEvent(
+        id=log.id,
+        incident_id=incident.id,
+        reporter_id=incident.reporter_id,
+        department_id=incident.department_id,
+        from_status=log.from_status.value if log.from_status else None,
+        to_status=log.to_status.value if log.to_status else None,
+        actor_id=log.actor_id,
+        occurred_at=(log.created_at or datetime.utcnow()).isoformat(),
+    )
+
+
+class _Overflow:
+    """Queued in place of events when a subscriber's queue fills up."""
+
+
+OVERFLOW = _Overflow()
+
+
+class Subscription:
+    def __init__(self, broadcaster: "Broadcaster", scope: EventScope, max_queue: int) -> None:
+        self.broadcaster = broadcaster
+        self.scope = scope
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[IncidentEvent | _Overflow] = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def _deliver(self, incident_event: IncidentEvent) -> None:
+        # Runs on the subscriber's loop.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(incident_event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broadcaster.dropped_subscribers += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    def offer(self, incident_event: IncidentEvent) -> None:
+        if self.scope.allows(incident_event):
+            self.loop.call_soon_threadsafe(self._deliver, incident_event)
+
+    async def get(self, timeout: float) -> IncidentEvent | _Overflow | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Fans published events out to subscribers and remembers the last ``buffer_size``.
+
+    ``publish`` may be called from any thread; delivery hops onto each
+    subscriber's event loop.
+    """
+
+    def __init__(self, buffer_size: int = 1000, max_queue: int = 100) -> None:
+        self.buffer_size = buffer_size
+        self.max_queue = max_queue
+        self._buffer: OrderedDict[int, IncidentEvent] = OrderedDict()
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.dropped_subscribers = 0
+
+    def publish(self, incident_event: IncidentEvent) -> bool:
+        """Record and fan out ``incident_event``; returns False for an id already seen."""
+        with self._lock:
+            if incident_event.id in self._buffer or (self._buffer and incident_event.id < next(iter(self._buffer))):
+                return False
+            self._buffer[incident_event.id] = incident_event
+            if incident_event.id < next(reversed(self._buffer)):
+                # Out-of-order commit: keep the buffer sorted by id.
+                self._buffer = OrderedDict(sorted(self._buffer.items()))
+            while len(self._buffer) > self.buffer_size:
+                self._buffer.popitem(last=False)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.offer(incident_event)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(subscription)
+        return True
+
+    def subscribe(self, scope: EventScope) -> Subscription:
+        subscription = Subscription(self, scope, self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_event_id(self) -> int | None:
+        with self._lock:
+            return next(reversed(self._buffer)) if self._buffer else None
+
+    def replay(self, after_id: int) -> list[IncidentEvent] | None:
+        """Buffered events newer than ``after_id``, or None when the buffer no longer reaches back that far."""
+        with self._lock:
+            if not self._buffer:
+                return None
+            if after_id < next(iter(self._buffer)) - 1:
+                return None
+            return [item for event_id, item in self._buffer.items() if event_id > after_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffer.clear()
+
+
+_settings = get_settings()
+broadcaster = Broadcaster(_settings.incident_events_buffer_size, _settings.incident_events_queue_size)
+
+
+def _broadcaster_samples():
+    yield "incident_event_subscribers", "gauge", "Open incident event streams.", {}, broadcaster.subscriber_count
+    yield (
+        "incident_event_dropped_subscribers_total",
+        "counter",
+        "Event streams closed because the client fell behind.",
+        {},
+        broadcaster.dropped_subscribers,
+    )
+
+
+REGISTRY.register_collector(_broadcaster_samples)
+
+
+def queue_event(session: Session, log: AuditLog, incident: Incident) -> None:
+    """Publish the transition recorded by ``log`` once ``session`` commits."""
+    session.info.setdefault(_PENDING_KEY, []).append((log, incident))
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _capture_events(session: ORMSession, _: Any) -> None:
+    # Ids exist from the first flush on, and attributes are still loaded here;
+    # after the commit they are expired and reading them would query again.
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    ready = session.info.setdefault(f"{_PENDING_KEY}_ready", [])
+    ready.extend(event_from_rows(log, incident) for log, incident in pending if log.id is not None)
+    session.info[_PENDING_KEY] = [(log, incident) for log, incident in pending if log.id is None]
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _publish_events(session: ORMSession) -> None:
+    for incident_event in session.info.pop(f"{_PENDING_KEY}_ready", []):
+        broadcaster.publish(incident_event)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_events(session: ORMSession) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(f"{_PENDING_KEY}_ready", None)
+
+
+def load_events(session: Session, after_id: int, limit: int, scope: EventScope | None = None) -> list[IncidentEvent]:
+    statement = (
+        select(AuditLog, Incident)
+        .join(Incident, Incident.id == AuditLog.incident_id)
+        .where(AuditLog.id > after_id)
+        .order_by(AuditLog.id)
+        .limit(limit)
+    )
+    if scope is not None and scope.reporter_id is not None:
+        statement = statement.where(Incident.reporter_id == scope.reporter_id)
+    if scope is not None and scope.department_id is not None:
+        statement = statement.where(Incident.department_id == scope.department_id)
+    return [event_from_rows(log, incident) for log, incident in session.exec(statement).all()]
+
+
+class AuditLogPoller:
+    """Publishes ``audit_logs`` rows written by any worker into a local broadcaster."""
+
+    # Re-read this many ids below the cursor: ids are assigned at insert but
+    # become visible at commit, so a lower id can show up after a higher one.
+    OVERLAP = 50
+
+    def __init__(self, session_factory: Callable[[], Session], target: Broadcaster, interval_seconds: float) -> None:
+        self.session_factory = session_factory
+        self.target = target
+        self.interval_seconds = interval_seconds
+        self.cursor: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll_once(self) -> int:
+        with self.session_factory() as session:
+            if self.cursor is None:
+                self.cursor = session.exec(select(AuditLog.id).order_by(AuditLog.id.desc()).limit(1)).first() or 0
+                return 0
+            rows = load_events(session, max(self.cursor - self.OVERLAP, 0), self.target.buffer_size)
+        published = sum(self.target.publish(row) for row in rows)
+        if rows:
+            self.cursor = max(self.cursor, rows[-1].id)
+        return published
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="incident-events-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.poll_once()
+            except Exception:  # pragma: no cover - keep polling through DB hiccups
+                logger.exception("Polling audit_logs for incident events failed")
+
+
+async def stream_events(
+    subscription: Subscription,
+    backlog: Iterable[IncidentEvent],
+    heartbeat_seconds: float,
+    retry_ms: int = 3000,
+    live: bool = True,
+) -> AsyncIterator[str]:
+    """SSE frames: the replayed backlog, then live events, with comment heartbeats.
+
+    Subscribe before loading the backlog; live events already covered by the
+    backlog are skipped. Ends after an overflow, or right after the backlog
+    when ``live`` is false (a truncated replay), so the client reconnects and
+    resumes from its last id.
+    """
+    replayed: set[int] = set()
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        for incident_event in backlog:
+            if subscription.scope.allows(incident_event):
+                replayed.add(incident_event.id)
+                yield incident_event.to_sse()
+        while live:
+            item = await subscription.get(heartbeat_seconds)
+            if item is None:
+                yield ": keep-alive\n\n"
+            elif item is OVERFLOW:
+                logger.warning("Dropping slow incident event subscriber")
+                return
+            elif item.id not in replayed:
+                yield item.to_sse()
+    finally:
+        subscription.close()
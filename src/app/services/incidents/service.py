@@ -1,14 +1,38 @@
+import logging
 from datetime import datetime, timezone
 from typing import Any, Dict
 
 from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
 from sqlmodel import Session
 
 from ...models.incident import AuditLog, Incident, IncidentCategory, IncidentStatus
 from ...models.user import User
+from ...config import get_settings
+from ...observability.metrics import INCIDENT_TRANSITIONS
 from ...services.ml import predict_incident
+from ...services.outbox import INCIDENT_STATUS_CHANGED, enqueue
+from .duplicates import check_duplicate
+from .events import queue_event
 from .state import ensure_transition
 
+logger = logging.getLogger(__name__)
+settings = get_settings()
+_TRANSITIONS_KEY = "incident_transitions"
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _count_transitions(session: ORMSession) -> None:
+    # Counted on commit, like the SSE events, so rolled-back transitions never show up.
+    for from_status, to_status in session.info.pop(_TRANSITIONS_KEY, []):
+        INCIDENT_TRANSITIONS.inc(from_status, to_status)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_transitions(session: ORMSession) -> None:
+    session.info.pop(_TRANSITIONS_KEY, None)
+
 
 def create_audit_log(
     session: Session,
@@ -26,18 +50,72 @@ def create_audit_log(
         payload_diff=None if payload_diff is None else str(payload_diff),
     )
     session.add(log)
+    queue_event(session, log, incident)
+    enqueue(
+        session,
+        INCIDENT_STATUS_CHANGED,
+        incident.id,
+        {
+            "incident_id": incident.id,
+            "reporter_id": incident.reporter_id,
+            "department_id": incident.department_id,
+            "actor_id": actor.id,
+            "from_status": from_status.value,
+            "to_status": to_status.value,
+            "final_category": incident.final_category.value if incident.final_category else None,
+            "changes": payload_diff,
+            "occurred_at": log.created_at.isoformat(),
+        },
+    )
+    session.info.setdefault(_TRANSITIONS_KEY, []).append((from_status.value, to_status.value))
+    logger.info(
+        "Incident %s %s -> %s",
+        incident.id,
+        from_status.value,
+        to_status.value,
+        extra={"incident_id": incident.id, "actor_id": actor.id, "from_status": from_status.value, "to_status": to_status.value},
+    )
 
 
 def submit_incident(session: Session, incident: Incident, actor: User) -> Incident:
     ensure_transition(incident, IncidentStatus.SUBMITTED, {role.name for role in actor.roles})
     previous_status = incident.status
-    # prediction = predict_incident(incident.free_text_description, {"department": incident.department_id})
-    incident.predicted_category = "KTC" #prediction["category"]
-    incident.predicted_confidence = 12.0 #prediction["confidence"]
-    incident.model_version = "beta" #prediction["model_version"]
+    prediction = predict_incident(incident.free_text_description, {"department": incident.department_id})
+    incident.predicted_category = prediction["category"]
+    incident.predicted_confidence = prediction["confidence"]
+    incident.model_version = prediction["model_version"]
+    logger.info(
+        "Incident %s classified as %s",
+        incident.id,
+        prediction["category"].value,
+        extra={
+            "incident_id": incident.id,
+            "predicted_category": prediction["category"].value,
+            "predicted_confidence": prediction["confidence"],
+            "model_version": prediction["model_version"],
+        },
+    )
+    changes: Dict[str, Any] = {
+        "prediction": {
+            "category": prediction["category"].value,
+            "confidence": prediction["confidence"],
+            "model_version": prediction["model_version"],
+        }
+    }
+    if settings.duplicate_detection_enabled:
+        match = check_duplicate(session, incident)
+        incident.suspected_duplicate_of = match.incident_id if match else None
+        if match is not None:
+            changes["suspected_duplicate"] = {"incident_id": match.incident_id, "similarity": match.similarity}
+            logger.info(
+                "Incident %s looks like a duplicate of %s",
+                incident.id,
+                match.incident_id,
+                extra={"incident_id": incident.id, "duplicate_of": match.incident_id, "similarity": match.similarity},
+            )
     incident.status = IncidentStatus.SUBMITTED
     incident.updated_at = datetime.now(timezone.utc)
-    create_audit_log(session, incident, actor, previous_status, IncidentStatus.SUBMITTED, payload_diff={"prediction": "test"})
+    create_audit_log(session, incident, actor, previous_status, IncidentStatus.SUBMITTED, payload_diff=changes)
     session.add(incident)
     return incident
 
@@ -0,0 +1,349 @@
+"""Similar-incident search over closed incidents.
+
+Descriptions become hashed word unigram+bigram TF-IDF vectors (sublinear
+term frequency, smoothed IDF, L2 normalized) held in SciPy sparse matrices.
+A query multiplies only the columns of its own terms, then ``argpartition``
+picks the top k.
+Feature hashing keeps the column space fixed, so closed incidents can be
+appended without refitting a vocabulary. IDF weights are refreshed once the
+corpus has grown by ``REWEIGHT_GROWTH`` since the last weighting; until then
+new rows are weighted with the current IDF.
+
+The raw term-frequency matrix, document frequencies and sync watermark are
+snapshotted to ``SIMILARITY_INDEX_PATH`` from a background thread. A worker
+loads the snapshot and reads only the incidents closed since then, instead of
+rebuilding from the whole table. Loading or building runs in a background
+thread started by the first search; until it finishes the endpoint answers 503.
+
+Once loaded, the index also picks up incidents closed by this worker as soon
+as their transaction commits (a session hook, as in ``events``); the catch-up
+query covers the other workers.
+
+NumPy and SciPy are slow to import, so this module is only imported when the
+endpoint is first called.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from ...config import get_settings
+from ...models.archive import incidents_archive
+from ...models.incident import Incident, IncidentStatus
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 1 << 18
+REWEIGHT_GROWTH = 0.1
+SNAPSHOT_VERSION = 1
+SYNC_OVERLAP = timedelta(seconds=30)
+BUILD_BATCH_SIZE = 5000
+MAX_SEGMENTS = 8
+
+_PENDING_KEY = "similar_incidents"
+_TOKEN = re.compile(r"[0-9a-z]{2,}")
+
+
+def _features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed column indices and sublinear term frequencies of ``text``."""
+    tokens = _TOKEN.findall(text.lower())
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    counts: dict[int, int] = {}
+    for term in terms:
+        column = zlib.crc32(term.encode()) % N_FEATURES
+        counts[column] = counts.get(column, 0) + 1
+    columns = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    values = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    order = np.argsort(columns)
+    return columns[order], values[order].astype(np.float32)
+
+
+def _tf_matrix(texts: Sequence[str]) -> sparse.csr_matrix:
+    indptr = [0]
+    columns: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    for text in texts:
+        cols, vals = _features(text)
+        columns.append(cols)
+        values.append(vals)
+        indptr.append(indptr[-1] + cols.size)
+    return sparse.csr_matrix(
+        (
+            np.concatenate(values) if values else np.empty(0, np.float32),
+            np.concatenate(columns) if columns else np.empty(0, np.int32),
+            np.asarray(indptr, dtype=np.int64),
+        ),
+        shape=(len(texts), N_FEATURES),
+    )
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+@dataclass(frozen=True)
+class SimilarHit:
+    incident_id: int
+    score: float
+
+
+class SimilarityIndex:
+    """Sparse TF-IDF rows for closed incidents, searched by cosine similarity.
+
+    Appended rows go into small tail segments so an update does not copy the
+    whole matrix; the tail is folded into the main segment whenever the IDF
+    weights are refreshed.
+    """
+
+    def __init__(self, snapshot_path: str | Path | None = None, snapshot_every: int = 100) -> None:
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._builder: threading.Thread | None = None
+        self._saver: threading.Thread | None = None
+        self._tf: List[sparse.csr_matrix] = []
+        # Column-major: a query only reads the columns of its own terms.
+        self._weighted: List[sparse.csc_matrix] = []
+        self._ids = np.empty(0, dtype=np.int64)
+        self._positions: dict[int, int] = {}
+        self._df = np.zeros(N_FEATURES, dtype=np.int32)
+        self._idf = np.ones(N_FEATURES, dtype=np.float32)
+        self._weighted_docs = 0
+        self._unsaved = 0
+        self.synced_at: datetime | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.synced_at is not None
+
+    def __len__(self) -> int:
+        return int(self._ids.size)
+
+    def _tf_matrix(self) -> sparse.csr_matrix:
+        if len(self._tf) != 1:
+            self._tf = [sparse.vstack(self._tf, format="csr") if self._tf else _tf_matrix([])]
+        return self._tf[0]
+
+    def _reweight(self) -> None:
+        n_docs = len(self)
+        self._idf = (np.log((1.0 + n_docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        self._weighted = [_normalize_rows(self._tf_matrix() @ sparse.diags(self._idf)).tocsc()]
+        self._weighted_docs = n_docs
+
+    def add_many(self, rows: Iterable[Tuple[int, str]], reweight: bool = True) -> int:
+        """Append ``(incident_id, description)`` pairs; ids already indexed are skipped.
+
+        With ``reweight=False`` the weighted rows are not kept up to date; the
+        caller rebuilds them once at the end (``_build`` adds in batches).
+        """
+        with self._lock:
+            fresh = [(incident_id, text) for incident_id, text in rows if incident_id not in self._positions]
+            if not fresh:
+                return 0
+            tf = _tf_matrix([text for _, text in fresh])
+            start = len(self)
+            self._tf.append(tf)
+            self._ids = np.concatenate([self._ids, np.fromiter((incident_id for incident_id, _ in fresh), dtype=np.int64)])
+            for offset, (incident_id, _) in enumerate(fresh):
+                self._positions[incident_id] = start + offset
+            np.add.at(self._df, tf.indices, 1)
+            if not reweight:
+                pass
+            elif len(self) > self._weighted_docs * (1 + REWEIGHT_GROWTH):
+                self._reweight()
+            else:
+                self._weighted.append(_normalize_rows(tf @ sparse.diags(self._idf)).tocsc())
+                if len(self._weighted) > MAX_SEGMENTS:
+                    self._weighted[1:] = [sparse.vstack(self._weighted[1:], format="csc")]
+            self._unsaved += len(fresh)
+            return len(fresh)
+
+    def add(self, incident_id: int, text: str) -> None:
+        self.add_many([(incident_id, text)])
+
+    def search(self, text: str, k: int = 10, exclude: int | None = None) -> List[SimilarHit]:
+        """Top ``k`` indexed incidents by cosine similarity to ``text``."""
+        columns, values = _features(text)
+        with self._lock:
+            if not len(self) or not columns.size:
+                return []
+            query = values * self._idf[columns]
+            query /= np.linalg.norm(query) or 1.0
+            scores = np.concatenate([segment[:, columns] @ query for segment in self._weighted])
+            ids = self._ids
+            if exclude is not None and exclude in self._positions:
+                scores[self._positions[exclude]] = -1.0
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [SimilarHit(int(ids[i]), round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+    def sync(self, session: Session, now: datetime | None = None, wait: bool = True) -> int:
+        """Index incidents closed since the last sync; the first call loads the snapshot or builds from scratch.
+
+        With ``wait=False`` the call returns 0 straight away while another
+        thread is syncing. A due snapshot is written by ``save_in_background``.
+        """
+        if not self._sync_lock.acquire(blocking=wait):
+            return 0
+        try:
+            now = now or datetime.utcnow()
+            if self.synced_at is None and not self.load():
+                added = self._build(session)
+            else:
+                statement = (
+                    select(Incident.id, Incident.free_text_description)
+                    .where(Incident.status == IncidentStatus.CLOSED, Incident.updated_at >= self.synced_at - SYNC_OVERLAP)
+                    .order_by(Incident.id)
+                )
+                added = self.add_many(session.exec(statement).all())
+            with self._lock:
+                self.synced_at = now
+        finally:
+            self._sync_lock.release()
+        if self._unsaved >= self.snapshot_every:
+            self.save_in_background()
+        return added
+
+    def _build(self, session: Session) -> int:
+        # Archived incidents are closed ones too, and stay searchable.
+        statements = [
+            select(Incident.id, Incident.free_text_description).where(Incident.status == IncidentStatus.CLOSED),
+            select(incidents_archive.c.id, incidents_archive.c.free_text_description),
+        ]
+        added = 0
+        for statement in statements:
+            batch: List[Tuple[int, str]] = []
+            for row in session.exec(statement.order_by(statement.selected_columns[0]).execution_options(yield_per=BUILD_BATCH_SIZE)):
+                batch.append((row[0], row[1]))
+                if len(batch) == BUILD_BATCH_SIZE:
+                    added += self.add_many(batch, reweight=False)
+                    batch = []
+            added += self.add_many(batch, reweight=False)
+        with self._lock:
+            self._reweight()
+        logger.info("Built similar-incident index over %d incidents", added)
+        return added
+
+    def build_in_background(self, session_factory: Callable[[], Session]) -> threading.Thread:
+        """Start the initial load in a daemon thread, unless one is already running."""
+        with self._lock:
+            if self._builder is None or not self._builder.is_alive():
+                self._builder = threading.Thread(
+                    target=self._build_with, args=(session_factory,), name="similar-index-build", daemon=True
+                )
+                self._builder.start()
+            return self._builder
+
+    def _build_with(self, session_factory: Callable[[], Session]) -> None:
+        try:
+            with session_factory() as session:
+                self.sync(session)
+        except Exception:
+            # The next search starts another attempt.
+            logger.exception("Building the similar-incident index failed")
+
+    def save_in_background(self) -> threading.Thread:
+        """Write the snapshot in a daemon thread, unless a write is already running."""
+        with self._lock:
+            if self._saver is None or not self._saver.is_alive():
+                self._saver = threading.Thread(target=self._save_logged, name="similar-index-save", daemon=True)
+                self._saver.start()
+            return self._saver
+
+    def _save_logged(self) -> None:
+        try:
+            self.save()
+        except Exception:
+            logger.exception("Saving the similar-incident snapshot to %s failed", self.snapshot_path)
+
+    def save(self) -> None:
+        if self.snapshot_path is None or self.synced_at is None:
+            return
+        # Appends replace these arrays rather than change them (``_df`` aside),
+        # so the file is written without blocking searches.
+        with self._lock:
+            tf, ids, df, synced_at, saved = self._tf_matrix(), self._ids, self._df.copy(), self.synced_at, self._unsaved
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.snapshot_path.with_name(self.snapshot_path.name + f".{os.getpid()}.tmp")
+        with staging.open("wb") as handle:
+            np.savez(
+                handle,
+                version=np.int64(SNAPSHOT_VERSION),
+                ids=ids,
+                data=tf.data,
+                indices=tf.indices,
+                indptr=tf.indptr,
+                df=df,
+                synced_at=np.array(synced_at.isoformat()),
+            )
+        # Workers may save concurrently; the rename makes the last complete one win.
+        os.replace(staging, self.snapshot_path)
+        with self._lock:
+            self._unsaved -= saved
+
+    def load(self) -> bool:
+        if self.snapshot_path is None or not self.snapshot_path.is_file():
+            return False
+        try:
+            with np.load(self.snapshot_path) as snapshot:
+                if int(snapshot["version"]) != SNAPSHOT_VERSION:
+                    return False
+                ids = snapshot["ids"]
+                tf = sparse.csr_matrix(
+                    (snapshot["data"], snapshot["indices"], snapshot["indptr"]), shape=(ids.size, N_FEATURES)
+                )
+                df = snapshot["df"]
+                synced_at = datetime.fromisoformat(str(snapshot["synced_at"]))
+        except (OSError, ValueError, KeyError):
+            logger.warning("Ignoring unreadable similar-incident snapshot %s", self.snapshot_path, exc_info=True)
+            return False
+        with self._lock:
+            self._ids, self._tf, self._df = ids, [tf], df
+            self._positions = {int(incident_id): position for position, incident_id in enumerate(ids)}
+            self._reweight()
+            self._unsaved = 0
+            self.synced_at = synced_at
+        logger.info("Loaded similar-incident index with %d incidents from %s", ids.size, self.snapshot_path)
+        return True
+
+
+_settings = get_settings()
+similar_index = SimilarityIndex(_settings.similarity_index_path, _settings.similarity_snapshot_every)
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _capture_closed(session: ORMSession, _: object) -> None:
+    for instance in session.dirty:
+        if isinstance(instance, Incident) and instance.status == IncidentStatus.CLOSED:
+            if inspect(instance).attrs.status.history.has_changes():
+                session.info.setdefault(_PENDING_KEY, []).append((instance.id, instance.free_text_description))
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _index_closed(session: ORMSession) -> None:
+    closed = session.info.pop(_PENDING_KEY, None)
+    if closed and similar_index.loaded:
+        similar_index.add_many(closed)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_closed(session: ORMSession) -> None:
+    session.info.pop(_PENDING_KEY, None)
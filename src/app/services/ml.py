@@ -1,29 +1,49 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict
-
-import joblib
+from typing import Any, Dict, List, Sequence
 
 from ..config import get_settings
 from ..models.incident import IncidentCategory
+from ..observability.context import phase
+from ..observability.metrics import MODEL_INFERENCE_DURATION, REGISTRY
+from .classifier.cache import PredictionCache, cache_key
+from .classifier.artifact import META_FILE, is_compiled_artifact
+from .classifier.rules import load_rules_engine
 
 logger = logging.getLogger(__name__)
 
+WARMUP_TEXT = "Pasien jatuh dari tempat tidur saat pemberian obat"
+
 
 class IncidentClassifier:
-    def __init__(self) -> None:
+    def __init__(self, model_path: str | Path | None = None) -> None:
         self.settings = get_settings()
+        self.model_path = Path(model_path or self.settings.model_path)
         self.model = None
         self.model_version = self.settings.model_fallback_version
+        self.rules = load_rules_engine(self.settings.classifier_rules_path)
         self._load_model()
 
     def _load_model(self) -> None:
-        model_path = Path(self.settings.model_path)
+        model_path = self.model_path
         if model_path.exists():
             try:
-                self.model = joblib.load(model_path)
+                # mmap_mode="r" keeps numpy arrays in the page cache so every
+                # uvicorn worker maps the same physical pages. The loaders are
+                # imported here: NumPy, joblib and (via unpickling) scikit-learn
+                # cost more to import than the rest of the app.
+                if is_compiled_artifact(model_path):
+                    from .classifier.compiled import CompiledScorer
+
+                    self.model = CompiledScorer.load(model_path, mmap_mode="r")
+                else:
+                    import joblib
+
+                    self.model = joblib.load(model_path, mmap_mode="r")
                 self.model_version = getattr(self.model, "version", model_path.stem)
                 logger.info("Loaded ML model from %s", model_path)
             except Exception as exc:  # pragma: no cover - best effort
@@ -32,37 +52,173 @@ class IncidentClassifier:
         else:
             logger.warning("Model file %s not found. Using fallback heuristic.", model_path)
 
+    def warm_up(self) -> None:
+        """Run one throwaway inference so the first real request does not pay for lazy init."""
+        self.predict(WARMUP_TEXT)
+
     def predict(self, text: str, metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        prediction = self._predict_one(text)
+        MODEL_INFERENCE_DURATION.observe(time.perf_counter() - started, self.model_version)
+        return prediction
+
+    def _predict_one(self, text: str) -> Dict[str, Any]:
         if self.model is not None:
-            prediction = self.model.predict([text])[0]
-            confidence = max(getattr(self.model, "predict_proba", lambda _: [[1.0]])([text])[0])  # type: ignore[arg-type]
+            if hasattr(self.model, "predict_proba") and hasattr(self.model, "classes_"):
+                # One scoring pass: the label is the argmax of the probabilities.
+                probabilities = self.model.predict_proba([text])[0]
+                best = int(probabilities.argmax())
+                prediction, confidence = self.model.classes_[best], probabilities[best]
+            else:
+                prediction = self.model.predict([text])[0]
+                confidence = 1.0
             category = IncidentCategory(prediction)
             return {
                 "category": category,
                 "confidence": float(confidence),
                 "model_version": self.model_version,
             }
-        # fallback heuristic
-        lower = text.lower()
-        if "jatuh" in lower or "fall" in lower:
-            category = IncidentCategory.KTD
-            confidence = 0.6
-        elif "med" in lower or "obat" in lower:
-            category = IncidentCategory.KNC
-            confidence = 0.55
-        else:
-            category = IncidentCategory.KTC
-            confidence = 0.5
-        return {
-            "category": category,
-            "confidence": confidence,
-            "model_version": self.model_version,
-        }
+        # fallback keyword rules
+        prediction = self.rules.score(text)
+        prediction["model_version"] = self.model_version
+        return prediction
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """Score many texts with one vectorizer/model call instead of one per text."""
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.model is not None and hasattr(self.model, "predict_proba") and hasattr(self.model, "classes_"):
+            probabilities = self.model.predict_proba(texts)
+            best = probabilities.argmax(axis=1)
+            return [
+                {
+                    "category": IncidentCategory(self.model.classes_[index]),
+                    "confidence": float(probabilities[row, index]),
+                    "model_version": self.model_version,
+                }
+                for row, index in enumerate(best)
+            ]
+        if self.model is not None:
+            return [
+                {"category": IncidentCategory(label), "confidence": 1.0, "model_version": self.model_version}
+                for label in self.model.predict(texts)
+            ]
+        predictions = self.rules.score_batch(texts)
+        for prediction in predictions:
+            prediction["model_version"] = self.model_version
+        return predictions
+
+
+class ModelManager:
+    """Owns the active classifier and swaps it atomically when the artifact changes.
+
+    Callers take a reference to ``classifier`` for the duration of a prediction,
+    so a reload never pulls the model out from under an in-flight call; the old
+    instance is released once the last such reference is dropped.
+    """
+
+    def __init__(self, model_path: str | Path | None = None, cache_size: int | None = None) -> None:
+        settings = get_settings()
+        self.model_path = Path(model_path or settings.model_path)
+        self.cache = PredictionCache(settings.prediction_cache_size if cache_size is None else cache_size)
+        self._classifier: IncidentClassifier | None = None
+        self._signature: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    @property
+    def classifier(self) -> IncidentClassifier:
+        classifier = self._classifier
+        if classifier is None:
+            classifier = self.load()
+        return classifier
+
+    @property
+    def model_version(self) -> str | None:
+        classifier = self._classifier
+        return classifier.model_version if classifier is not None else None
+
+    def _artifact_signature(self) -> tuple[int, int] | None:
+        # Compiled artifacts are directories whose meta.json is written last.
+        path = self.model_path / META_FILE if self.model_path.is_dir() else self.model_path
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> IncidentClassifier:
+        with self._lock:
+            signature = self._artifact_signature()
+            classifier = IncidentClassifier(self.model_path)
+            classifier.warm_up()
+            self._classifier = classifier
+            self._signature = signature
+            # Keys carry the model version, but dropping stale entries frees the slots immediately.
+            self.cache.clear()
+        logger.info("Active model version %s", classifier.model_version)
+        return classifier
+
+    def reload_if_changed(self) -> bool:
+        signature = self._artifact_signature()
+        # A vanished artifact is usually a deploy mid-swap; keep serving what we have.
+        if signature is None or signature == self._signature:
+            return False
+        logger.info("Model artifact %s changed, reloading", self.model_path)
+        try:
+            self.load()
+        except Exception as exc:  # pragma: no cover - keep serving the old model
+            logger.exception("Model reload failed; keeping version %s", self.model_version, exc_info=exc)
+            return False
+        return True
+
+    def start_watcher(self, interval_seconds: float) -> None:
+        if interval_seconds <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name="model-reloader", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=5)
+        self._watcher = None
+
+    def _watch(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            self.reload_if_changed()
+
+    def predict(self, text: str, metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        classifier = self.classifier
+        key = cache_key(text, classifier.model_version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        prediction = classifier.predict(text, metadata)
+        self.cache.put(key, prediction)
+        return prediction
+
+
+model_manager = ModelManager()
+
+
+def _cache_samples():
+    stats = model_manager.cache.stats()
+    yield "prediction_cache_hits_total", "counter", "Prediction cache hits.", {}, stats["hits"]
+    yield "prediction_cache_misses_total", "counter", "Prediction cache misses.", {}, stats["misses"]
+    yield "prediction_cache_evictions_total", "counter", "Prediction cache evictions.", {}, stats["evictions"]
+    yield "prediction_cache_size", "gauge", "Entries currently in the prediction cache.", {}, stats["size"]
 
 
-# classifier = IncidentClassifier()
+REGISTRY.register_collector(_cache_samples)
 
 
 def predict_incident(text: str, metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    # return classifier.predict(text, metadata)
-    return
+    with phase("ml"):
+        return model_manager.predict(text, metadata)
@@ -0,0 +1,235 @@
+"""Transactional outbox for feeding incident transitions to downstream systems.
+
+``enqueue`` adds an ``OutboxMessage`` to the caller's session, so the message
+commits or rolls back together with the change it describes and requests never
+wait on a downstream system. ``Dispatcher`` runs in its own process
+(``scripts/dispatch_outbox.py``): it claims due messages in id order, delivers
+them to a sink in one batch, and marks them dispatched. A failed batch is
+retried with exponential backoff and jitter; after ``max_attempts`` its
+messages stay in the table as dead letters until an operator resets them.
+
+Delivery is at least once. Consumers should dedupe on the message ``id``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Protocol
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from ..models.outbox import OutboxMessage
+from ..observability.metrics import (
+    OUTBOX_DELIVERED,
+    OUTBOX_DELIVERY_LAG,
+    OUTBOX_FAILED_BATCHES,
+    OUTBOX_OLDEST_PENDING_AGE,
+    OUTBOX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+INCIDENT_STATUS_CHANGED = "incident.status_changed"
+
+
+def enqueue(session: Session, topic: str, aggregate_id: int, payload: Dict[str, Any]) -> OutboxMessage:
+    message = OutboxMessage(topic=topic, aggregate_id=aggregate_id, payload=payload)
+    session.add(message)
+    return message
+
+
+def serialize(message: OutboxMessage) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "topic": message.topic,
+        "aggregate_id": message.aggregate_id,
+        "created_at": message.created_at.isoformat(),
+        "payload": message.payload,
+    }
+
+
+class Sink(Protocol):
+    name: str
+
+    def send(self, messages: List[Dict[str, Any]]) -> None:
+        """Deliver the whole batch or raise."""
+
+
+class WebhookSink:
+    """POSTs each batch as ``{"messages": [...]}``; any non-2xx response fails the batch."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout_seconds: float = 10.0, headers: Dict[str, str] | None = None) -> None:
+        import httpx
+
+        self.url = url
+        self.client = httpx.Client(timeout=timeout_seconds, headers=headers)
+
+    def send(self, messages: List[Dict[str, Any]]) -> None:
+        response = self.client.post(self.url, json={"messages": messages})
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class FileSink:
+    """Appends one JSON line per message; useful for batch imports and local runs."""
+
+    name = "file"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, messages: List[Dict[str, Any]]) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write("".join(json.dumps(message, default=str) + "\n" for message in messages))
+            handle.flush()
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class DispatchResult:
+    delivered: int = 0
+    failed: int = 0
+
+    @property
+    def claimed(self) -> int:
+        return self.delivered + self.failed
+
+
+class Dispatcher:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sink: Sink,
+        batch_size: int = 100,
+        max_attempts: int = 10,
+        base_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 300.0,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential backoff for a batch that has failed ``attempts`` times."""
+        ceiling = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (attempts - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def dispatch_batch(self) -> DispatchResult:
+        now = self.clock()
+        with self.session_factory() as session:
+            # SKIP LOCKED lets several dispatchers share the table on MySQL 8 and
+            # PostgreSQL; SQLite ignores the locking clause.
+            messages = session.exec(
+                select(OutboxMessage)
+                .where(
+                    OutboxMessage.dispatched_at.is_(None),
+                    OutboxMessage.available_at <= now,
+                    OutboxMessage.attempts < self.max_attempts,
+                )
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not messages:
+                return DispatchResult()
+            ids = [message.id for message in messages]
+            try:
+                self.sink.send([serialize(message) for message in messages])
+            except Exception as exc:
+                attempts = max(message.attempts for message in messages) + 1
+                retry_at = now + timedelta(seconds=self.backoff(attempts))
+                session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(ids))
+                    .values(
+                        attempts=OutboxMessage.attempts + 1,
+                        available_at=retry_at,
+                        last_error=f"{type(exc).__name__}: {exc}"[:1000],
+                        updated_at=now,
+                    )
+                )
+                session.commit()
+                OUTBOX_FAILED_BATCHES.inc(self.sink.name)
+                logger.warning(
+                    "Outbox delivery to %s failed; retrying %d messages at %s",
+                    self.sink.name,
+                    len(ids),
+                    retry_at.isoformat(),
+                    extra={"sink": self.sink.name, "attempts": attempts, "first_id": ids[0], "last_id": ids[-1]},
+                )
+                return DispatchResult(failed=len(ids))
+
+            delivered_at = self.clock()
+            lags = [(delivered_at - message.created_at).total_seconds() for message in messages]
+            session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(ids))
+                .values(dispatched_at=delivered_at, last_error=None, updated_at=delivered_at)
+            )
+            session.commit()
+        for lag in lags:
+            OUTBOX_DELIVERY_LAG.observe(lag, self.sink.name)
+        OUTBOX_DELIVERED.inc(self.sink.name, amount=len(ids))
+        logger.info(
+            "Delivered %d outbox messages to %s",
+            len(ids),
+            self.sink.name,
+            extra={"sink": self.sink.name, "first_id": ids[0], "last_id": ids[-1], "max_lag_seconds": round(max(lags), 3)},
+        )
+        return DispatchResult(delivered=len(ids))
+
+    def drain(self) -> DispatchResult:
+        """Dispatch full batches until nothing is due or a batch fails."""
+        total = DispatchResult()
+        while True:
+            result = self.dispatch_batch()
+            total.delivered += result.delivered
+            total.failed += result.failed
+            if result.failed or result.claimed < self.batch_size:
+                return total
+
+    def backlog(self) -> Dict[str, Any]:
+        """Pending/dead counts and the oldest retryable message's age; also updates the gauges."""
+        now = self.clock()
+        with self.session_factory() as session:
+            undelivered = OutboxMessage.dispatched_at.is_(None)
+            retryable = OutboxMessage.attempts < self.max_attempts
+            pending, oldest = session.exec(
+                select(func.count(), func.min(OutboxMessage.created_at)).where(undelivered, retryable)
+            ).one()
+            dead = session.exec(select(func.count()).select_from(OutboxMessage).where(undelivered, ~retryable)).one()
+        age = (now - oldest).total_seconds() if oldest is not None else 0.0
+        OUTBOX_PENDING.set("pending", value=pending)
+        OUTBOX_PENDING.set("dead", value=dead)
+        OUTBOX_OLDEST_PENDING_AGE.set(value=age)
+        return {"pending": pending, "dead": dead, "oldest_pending_age_seconds": age}
+
+    def run_forever(self, interval_seconds: float, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                result = self.drain()
+                self.backlog()
+            except Exception:  # keep the dispatcher alive through DB outages
+                logger.exception("Outbox dispatch round failed")
+                result = DispatchResult()
+            if not result.delivered:
+                stop.wait(interval_seconds)
@@ -0,0 +1,15 @@
+"""Process pools for CPU-bound work started from the API process."""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """A pool of ``workers`` processes started with spawn, not fork.
+
+    The API process runs threads (the threadpool, log writer, watchers), and
+    forking a process with threads can leave locks held in the child.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
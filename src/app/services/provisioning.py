@@ -0,0 +1,223 @@
+"""Bulk user provisioning from CSV.
+
+The CSV needs ``email``, ``full_name`` and ``password`` columns and may have a
+``roles`` column of role names separated by ``;``. Provisioning is idempotent
+on email: rows whose email already exists are reported and left untouched, so
+re-running a partly applied file only creates what is missing.
+
+Roles are resolved with one query. Password hashing dominates the cost (it is
+deliberately slow), so hashes are computed across a process pool. Users and
+their ``user_roles`` links are inserted with one multi-row statement per
+batch.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..models.role import Role, UserRole
+from ..models.user import User
+from ..security.passwords import hash_password
+from .pools import spawn_pool
+
+REQUIRED_COLUMNS = ("email", "full_name", "password")
+# parse_csv stores a row's values beyond the header under this key.
+EXTRA_FIELDS = "_extra"
+MIN_PASSWORD_LENGTH = 8
+# Below this many hashes a process pool costs more to start than it saves.
+POOL_THRESHOLD = 8
+
+_email_adapter = TypeAdapter(EmailStr)
+
+
+class ProvisioningError(ValueError):
+    """The file as a whole cannot be processed (missing columns, not CSV)."""
+
+
+@dataclass
+class RowOutcome:
+    row: int
+    email: str
+    status: str  # created | exists | duplicate | invalid | valid (dry run)
+    message: str | None = None
+    user_id: int | None = None
+
+
+@dataclass
+class _Candidate:
+    row: int
+    email: str
+    full_name: str
+    password: str
+    role_ids: List[int]
+
+
+def _clean(row: Dict[str, object]) -> Dict[str, str]:
+    cleaned = {}
+    for key, value in row.items():
+        if key == EXTRA_FIELDS:
+            # Trailing empty cells are harmless; anything else means the row does not fit the header.
+            cleaned[EXTRA_FIELDS] = ",".join(item.strip() for item in value if item.strip())
+        else:
+            cleaned[key.strip().lower()] = (value or "").strip()
+    return cleaned
+
+
+def parse_csv(text: str) -> List[Dict[str, str]]:
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")), restkey=EXTRA_FIELDS)
+    columns = {name.strip().lower() for name in reader.fieldnames or []}
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ProvisioningError(f"CSV is missing column(s): {', '.join(missing)}")
+    return [_clean(row) for row in reader]
+
+
+def _validate(rows: Sequence[Dict[str, str]], role_ids: Dict[str, int]) -> tuple[List[_Candidate], List[RowOutcome]]:
+    candidates: List[_Candidate] = []
+    rejected: List[RowOutcome] = []
+    seen: set[str] = set()
+    for number, row in enumerate(rows, start=2):  # row 1 is the header
+        raw_email = row.get("email", "")
+        if row.get(EXTRA_FIELDS):
+            rejected.append(RowOutcome(number, raw_email, "invalid", "Row has more fields than the header"))
+            continue
+        try:
+            email = str(_email_adapter.validate_python(raw_email)).lower()
+        except ValidationError:
+            rejected.append(RowOutcome(number, raw_email, "invalid", "Invalid email"))
+            continue
+        if email in seen:
+            rejected.append(RowOutcome(number, email, "duplicate", "Email appears earlier in the file"))
+            continue
+        seen.add(email)
+        if not row.get("full_name"):
+            rejected.append(RowOutcome(number, email, "invalid", "full_name is required"))
+            continue
+        if len(row.get("password", "")) < MIN_PASSWORD_LENGTH:
+            rejected.append(RowOutcome(number, email, "invalid", f"Password must be at least {MIN_PASSWORD_LENGTH} characters"))
+            continue
+        names = [name.strip().lower() for name in row.get("roles", "").split(";") if name.strip()]
+        unknown = [name for name in names if name not in role_ids]
+        if unknown:
+            rejected.append(RowOutcome(number, email, "invalid", f"Unknown role(s): {', '.join(unknown)}"))
+            continue
+        candidates.append(_Candidate(number, email, row["full_name"], row["password"], [role_ids[name] for name in names]))
+    return candidates, rejected
+
+
+def hash_passwords(passwords: Sequence[str], workers: int) -> List[str]:
+    if workers <= 1 or len(passwords) < POOL_THRESHOLD:
+        return [hash_password(password) for password in passwords]
+    with spawn_pool(workers) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _existing_emails(session: Session, emails: Iterable[str]) -> Dict[str, int]:
+    rows = session.exec(select(User.email, User.id).where(User.email.in_(list(emails)))).all()
+    return {email.lower(): user_id for email, user_id in rows}
+
+
+def _insert_batch(session: Session, batch: List[_Candidate], hashes: Dict[str, str]) -> Dict[str, int]:
+    now = datetime.utcnow()
+    session.execute(
+        insert(User),
+        [
+            {
+                "email": candidate.email,
+                "full_name": candidate.full_name,
+                "hashed_password": hashes[candidate.email],
+                "is_active": True,
+                "token_version": 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for candidate in batch
+        ],
+    )
+    # MySQL has no INSERT ... RETURNING; one indexed lookup gets every new id.
+    ids = _existing_emails(session, [candidate.email for candidate in batch])
+    links = [{"user_id": ids[candidate.email], "role_id": role_id} for candidate in batch for role_id in candidate.role_ids]
+    if links:
+        session.execute(insert(UserRole), links)
+    return ids
+
+
+def provision_users(
+    session: Session,
+    rows: Sequence[Dict[str, str]],
+    workers: int | None = None,
+    batch_size: int = 500,
+    dry_run: bool = False,
+) -> List[RowOutcome]:
+    """Create the users described by ``rows`` (as returned by ``parse_csv``); returns one outcome per row."""
+    role_ids = {role.name.lower(): role.id for role in session.exec(select(Role)).all()}
+    candidates, outcomes = _validate(rows, role_ids)
+
+    existing = _existing_emails(session, [candidate.email for candidate in candidates]) if candidates else {}
+    pending = []
+    for candidate in candidates:
+        if candidate.email in existing:
+            outcomes.append(RowOutcome(candidate.row, candidate.email, "exists", "Email already registered", existing[candidate.email]))
+        else:
+            pending.append(candidate)
+
+    if dry_run:
+        outcomes.extend(RowOutcome(candidate.row, candidate.email, "valid") for candidate in pending)
+        return sorted(outcomes, key=lambda outcome: outcome.row)
+
+    hashes = dict(
+        zip(
+            (candidate.email for candidate in pending),
+            hash_passwords([candidate.password for candidate in pending], workers or os.cpu_count() or 1),
+        )
+    )
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        try:
+            ids = _insert_batch(session, batch, hashes)
+            session.commit()
+        except IntegrityError:
+            # A concurrent run created some of these emails; skip those and retry once.
+            session.rollback()
+            taken = _existing_emails(session, [candidate.email for candidate in batch])
+            outcomes.extend(
+                RowOutcome(candidate.row, candidate.email, "exists", "Email already registered", taken[candidate.email])
+                for candidate in batch
+                if candidate.email in taken
+            )
+            batch = [candidate for candidate in batch if candidate.email not in taken]
+            try:
+                ids = _insert_batch(session, batch, hashes) if batch else {}
+                session.commit()
+            except IntegrityError:
+                # Still racing another run: report the rest as taken rather than fail the whole file.
+                session.rollback()
+                taken = _existing_emails(session, [candidate.email for candidate in batch])
+                outcomes.extend(
+                    RowOutcome(candidate.row, candidate.email, "exists", "Email already registered", taken.get(candidate.email))
+                    for candidate in batch
+                )
+                continue
+        outcomes.extend(RowOutcome(candidate.row, candidate.email, "created", user_id=ids[candidate.email]) for candidate in batch)
+    return sorted(outcomes, key=lambda outcome: outcome.row)
+
+
+def summarize(outcomes: Sequence[RowOutcome]) -> Dict[str, int]:
+    summary: Dict[str, int] = {}
+    for outcome in outcomes:
+        summary[outcome.status] = summary.get(outcome.status, 0) + 1
+    return summary
+
+
+def outcomes_as_dicts(outcomes: Sequence[RowOutcome]) -> List[Dict[str, object]]:
+    return [asdict(outcome) for outcome in outcomes]
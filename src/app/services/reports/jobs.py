@@ -0,0 +1,340 @@
+"""Accreditation report jobs.
+
+``POST /v1/reports`` records a ``ReportJob`` and hands its id to a
+``ReportRunner``; the API worker never builds a report itself. The default
+runner is a process pool: each worker process opens its own engine, streams
+incidents (joined to their submission/closure times from ``audit_logs``) in
+``yield_per`` batches, aggregates per department and category while writing,
+and moves the finished XLSX or PDF into ``REPORT_DIR``.
+
+Jobs are cached by ``cache_key``: the parameters hashed with a watermark of
+the matching data (row count, latest ``updated_at``, latest audit log id). An
+identical request over unchanged data gets the existing job back; any edit or
+transition inside the period changes the watermark and builds a fresh report.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import case, func
+from sqlmodel import Session, create_engine, select
+
+from ...config import get_settings
+from ...db import STATEMENT_TIMEOUT_KEY
+from ...models.department import Department
+from ...models.incident import AuditLog, Incident, IncidentStatus
+from ...models.location import Location
+from ...models.report import ReportJob, ReportStatus
+from ..pools import spawn_pool
+from .pdf import write_pdf
+from .xlsx import XlsxWriter
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("xlsx", "pdf")
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+STREAM_BATCH_SIZE = 1000
+UNCATEGORIZED = "Belum ditetapkan"
+NO_DEPARTMENT = "Tanpa departemen"
+
+DETAIL_HEADER = (
+    "ID",
+    "Tanggal kejadian",
+    "Departemen",
+    "Lokasi",
+    "Status",
+    "Kategori final",
+    "Kategori prediksi",
+    "Indikator cedera",
+    "Diajukan",
+    "Ditutup",
+    "Jam hingga selesai",
+)
+SUMMARY_HEADER = ("Departemen", "Kategori", "Jumlah", "Selesai", "Dalam proses", "Rata-rata jam hingga selesai")
+
+
+@dataclass(frozen=True)
+class ReportParameters:
+    date_from: date
+    date_to: date  # inclusive
+    department_id: int | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "date_from": self.date_from.isoformat(),
+            "date_to": self.date_to.isoformat(),
+            "department_id": self.department_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReportParameters":
+        return cls(date.fromisoformat(data["date_from"]), date.fromisoformat(data["date_to"]), data.get("department_id"))
+
+    def conditions(self) -> list:
+        start = datetime.combine(self.date_from, time.min)
+        end = datetime.combine(self.date_to + timedelta(days=1), time.min)
+        conditions = [Incident.occurred_at >= start, Incident.occurred_at < end, Incident.status != IncidentStatus.DRAFT]
+        if self.department_id is not None:
+            conditions.append(Incident.department_id == self.department_id)
+        return conditions
+
+
+def data_watermark(session: Session, params: ReportParameters) -> str:
+    """Changes whenever an incident in the period is added, edited or transitioned."""
+    conditions = params.conditions()
+    count, last_update = session.exec(select(func.count(Incident.id), func.max(Incident.updated_at)).where(*conditions)).one()
+    last_log = session.exec(
+        select(func.max(AuditLog.id)).join(Incident, Incident.id == AuditLog.incident_id).where(*conditions)
+    ).one()
+    return f"{count}:{last_update.isoformat() if last_update else '-'}:{last_log or 0}"
+
+
+def cache_key(report_format: str, params: ReportParameters, watermark: str) -> str:
+    material = json.dumps({"format": report_format, "parameters": params.as_dict(), "watermark": watermark}, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def find_reusable_job(session: Session, key: str, stale_after_seconds: float) -> ReportJob | None:
+    """A finished job for ``key``, or one still in flight that has not gone stale."""
+    fresh_since = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+    jobs = session.exec(
+        select(ReportJob)
+        .where(ReportJob.cache_key == key, ReportJob.status != ReportStatus.FAILED)
+        .order_by(ReportJob.id.desc())
+    ).all()
+    for job in jobs:
+        if job.status == ReportStatus.DONE or job.updated_at >= fresh_since:
+            return job
+    return None
+
+
+def _incident_rows(session: Session, params: ReportParameters) -> Iterator[Sequence[Any]]:
+    conditions = params.conditions()
+    timeline = (
+        select(
+            AuditLog.incident_id,
+            func.min(case((AuditLog.to_status == IncidentStatus.SUBMITTED, AuditLog.created_at))).label("submitted_at"),
+            func.max(case((AuditLog.to_status == IncidentStatus.CLOSED, AuditLog.created_at))).label("closed_at"),
+        )
+        .join(Incident, Incident.id == AuditLog.incident_id)
+        .where(*conditions)
+        .group_by(AuditLog.incident_id)
+        .subquery()
+    )
+    statement = (
+        select(
+            Incident.id,
+            Incident.occurred_at,
+            Department.name,
+            Location.name,
+            Incident.status,
+            Incident.final_category,
+            Incident.predicted_category,
+            Incident.harm_indicator,
+            timeline.c.submitted_at,
+            timeline.c.closed_at,
+        )
+        .outerjoin(Department, Department.id == Incident.department_id)
+        .outerjoin(Location, Location.id == Incident.location_id)
+        .outerjoin(timeline, timeline.c.incident_id == Incident.id)
+        .where(*conditions)
+        .order_by(Incident.id)
+        # Server-side cursor where the driver has one; rows arrive in batches.
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    yield from session.exec(statement)
+
+
+@dataclass
+class _Bucket:
+    total: int = 0
+    closed: int = 0
+    hours_total: float = 0.0
+    hours_count: int = 0
+
+
+class Summary:
+    """Counts per (department, category), accumulated one incident at a time."""
+
+    def __init__(self) -> None:
+        self.buckets: Dict[Tuple[str, str], _Bucket] = defaultdict(_Bucket)
+        self.rows = 0
+
+    def add(self, department: str, category: str, status: IncidentStatus, hours: float | None) -> None:
+        self.rows += 1
+        bucket = self.buckets[(department, category)]
+        bucket.total += 1
+        if status == IncidentStatus.CLOSED:
+            bucket.closed += 1
+        if hours is not None:
+            bucket.hours_total += hours
+            bucket.hours_count += 1
+
+    def table(self) -> List[Tuple[str, str, int, int, int, float | None]]:
+        rows = []
+        for (department, category), bucket in sorted(self.buckets.items()):
+            average = round(bucket.hours_total / bucket.hours_count, 1) if bucket.hours_count else None
+            rows.append((department, category, bucket.total, bucket.closed, bucket.total - bucket.closed, average))
+        return rows
+
+
+def _detail_rows(rows: Iterable[Sequence[Any]], summary: Summary) -> Iterator[Sequence[Any]]:
+    for incident_id, occurred_at, department, location, status, final, predicted, harm, submitted_at, closed_at in rows:
+        hours = None
+        if submitted_at is not None and closed_at is not None:
+            hours = round((closed_at - submitted_at).total_seconds() / 3600, 1)
+        department = department or NO_DEPARTMENT
+        summary.add(department, final.value if final else UNCATEGORIZED, status, hours)
+        yield (
+            incident_id,
+            occurred_at,
+            department,
+            location,
+            status.value,
+            final.value if final else None,
+            predicted.value if predicted else None,
+            harm,
+            submitted_at,
+            closed_at,
+            hours,
+        )
+
+
+def _write_xlsx(handle, rows: Iterable[Sequence[Any]]) -> int:
+    summary = Summary()
+    with XlsxWriter(handle) as workbook:
+        workbook.write_sheet("Insiden", DETAIL_HEADER, _detail_rows(rows, summary))
+        workbook.write_sheet("Ringkasan", SUMMARY_HEADER, summary.table(), position=0)
+    return summary.rows
+
+
+def _pdf_lines(params: ReportParameters, summary: Summary) -> Iterator[str]:
+    yield "Laporan Akreditasi Insiden Keselamatan Pasien"
+    yield f"Periode {params.date_from.isoformat()} s.d. {params.date_to.isoformat()}"
+    yield f"Dibuat {datetime.utcnow().isoformat(timespec='minutes')} UTC, {summary.rows} insiden"
+    yield ""
+    yield f"{'Departemen':<28} {'Kategori':<16} {'Jumlah':>7} {'Selesai':>8} {'Proses':>7} {'Rata jam':>9}"
+    yield "-" * 80
+    for department, category, total, closed, open_count, average in summary.table():
+        hours = f"{average:.1f}" if average is not None else "-"
+        yield f"{department[:28]:<28} {category:<16} {total:>7} {closed:>8} {open_count:>7} {hours:>9}"
+
+
+def _write_pdf(handle, rows: Iterable[Sequence[Any]], params: ReportParameters) -> int:
+    summary = Summary()
+    for _ in _detail_rows(rows, summary):
+        pass
+    write_pdf(handle, _pdf_lines(params, summary), title="Laporan Akreditasi")
+    return summary.rows
+
+
+def build_report(session: Session, job_id: int, report_dir: str | Path) -> ReportJob:
+    """Build the artifact for ``job_id`` and record the outcome on the job."""
+    job = session.get(ReportJob, job_id)
+    if job is None or job.status == ReportStatus.DONE:
+        return job
+    job.status = ReportStatus.RUNNING
+    job.started_at = datetime.utcnow()
+    job.touch()
+    session.add(job)
+    session.commit()
+
+    directory = Path(report_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    params = ReportParameters.from_dict(job.parameters)
+    handle = tempfile.NamedTemporaryFile(dir=directory, prefix=".building-", delete=False)
+    try:
+        with handle:
+            rows = _incident_rows(session, params)
+            if job.format == "pdf":
+                row_count = _write_pdf(handle, rows, params)
+            else:
+                row_count = _write_xlsx(handle, rows)
+        name = f"{job.cache_key}.{job.format}"
+        os.replace(handle.name, directory / name)
+    except Exception as exc:
+        session.rollback()
+        Path(handle.name).unlink(missing_ok=True)
+        logger.exception("Report job %s failed", job_id, extra={"report_job_id": job_id})
+        job.status = ReportStatus.FAILED
+        job.error = f"{type(exc).__name__}: {exc}"[:1000]
+    else:
+        job.status = ReportStatus.DONE
+        job.artifact_path = name
+        job.size_bytes = (directory / name).stat().st_size
+        job.row_count = row_count
+        logger.info(
+            "Report job %s built %s with %d incidents",
+            job_id,
+            name,
+            row_count,
+            extra={"report_job_id": job_id, "row_count": row_count, "size_bytes": job.size_bytes},
+        )
+    job.finished_at = datetime.utcnow()
+    job.touch()
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+@lru_cache
+def _worker_engine(database_url: str):
+    return create_engine(database_url, pool_pre_ping=True)
+
+
+def _run_job(database_url: str, report_dir: str, job_id: int) -> str:
+    # Runs in a pool process: it has no engine of its own until the first job.
+    with Session(_worker_engine(database_url)) as session:
+        session.info[STATEMENT_TIMEOUT_KEY] = get_settings().report_statement_timeout_ms
+        job = build_report(session, job_id, report_dir)
+        return job.status.value if job is not None else ""
+
+
+class ReportRunner:
+    """Builds report jobs in a process pool so the API workers stay responsive."""
+
+    def __init__(self, database_url: str, report_dir: str, workers: int) -> None:
+        self.database_url = database_url
+        self.report_dir = report_dir
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def submit(self, job_id: int) -> Future:
+        if self._pool is None:
+            self._pool = spawn_pool(self.workers)
+        future = self._pool.submit(_run_job, self.database_url, self.report_dir, job_id)
+        future.add_done_callback(lambda done: self._log_crash(job_id, done))
+        return future
+
+    @staticmethod
+    def _log_crash(job_id: int, future: Future) -> None:
+        # build_report records its own failures; this only sees a dead worker process.
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Report worker crashed on job %s", job_id, exc_info=future.exception(), extra={"report_job_id": job_id})
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+@lru_cache
+def get_report_runner() -> ReportRunner:
+    settings = get_settings()
+    return ReportRunner(settings.database_url, settings.report_dir, settings.report_workers)
@@ -0,0 +1,87 @@
+"""Minimal text-only PDF writer.
+
+Enough for a printable accreditation summary: monospaced lines on A4 pages in
+Courier (one of the fonts every viewer ships, so nothing is embedded), written
+straight to a binary file with a hand-built cross-reference table.
+"""
+
+from __future__ import annotations
+
+from typing import IO, Iterable, List
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 40
+FONT_SIZE = 9
+LEADING = 12
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+
+
+def _escape(text: str) -> str:
+    # Courier is a WinAnsi font; characters outside Latin-1 become "?".
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(lines: List[str]) -> bytes:
+    body = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td"]
+    body.extend(f"({_escape(line)}) '" for line in lines)
+    body.append("ET")
+    return "\n".join(body).encode("latin-1")
+
+
+def write_pdf(target: IO[bytes], lines: Iterable[str], title: str = "") -> int:
+    """Write ``lines`` as a paginated PDF to ``target``; returns the page count."""
+    offsets: List[int] = []
+    position = 0
+
+    def emit(data: bytes) -> None:
+        nonlocal position
+        target.write(data)
+        position += len(data)
+
+    def emit_object(number: int, body: bytes) -> None:
+        offsets.append(position)
+        emit(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    # Objects 1-3 (catalog, page tree, font) are written last, once the page
+    # count is known; pages start at object 4 as (page, content) pairs.
+    page_ids: List[int] = []
+    page: List[str] = []
+    number = 4
+
+    def flush_page() -> None:
+        nonlocal number
+        stream = _page_stream(page)
+        emit_object(
+            number,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number + 1} 0 R >>".encode(),
+        )
+        emit_object(number + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        page_ids.append(number)
+        number += 2
+        page.clear()
+
+    for line in lines:
+        page.append(line)
+        if len(page) == LINES_PER_PAGE:
+            flush_page()
+    if page or not page_ids:
+        flush_page()
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    info = f" /Title ({_escape(title)})" if title else ""
+    emit_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    emit_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    emit_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+    emit_object(number, f"<<{info} /Producer (incident-reporting) >>".encode())
+
+    # The xref table is indexed by object number, not by write order.
+    by_number = dict(zip([*range(4, number), 1, 2, 3, number], offsets))
+    xref = position
+    entries = "".join(f"{by_number[n]:010d} 00000 n \n" for n in range(1, number + 1))
+    emit(f"xref\n0 {number + 1}\n0000000000 65535 f \n{entries}".encode())
+    emit(f"trailer\n<< /Size {number + 1} /Root 1 0 R /Info {number} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return len(page_ids)
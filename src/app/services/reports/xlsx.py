@@ -0,0 +1,133 @@
+"""Minimal streaming XLSX writer.
+
+Writes the OOXML parts straight into a zip archive, one row at a time, so a
+sheet with a million incidents never sits in memory and no spreadsheet
+library is needed. Cells are inline strings or numbers; the first row of each
+sheet is bold and frozen.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from datetime import date, datetime
+from typing import IO, Any, Iterable, List, Sequence
+from xml.sax.saxutils import escape
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}
+</Types>"""
+_SHEET_TYPE = '<Override PartName="/xl/worksheets/sheet{n}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+_SHEET_HEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>
+<sheetData>
+"""
+_SHEET_TAIL = "</sheetData>\n</worksheet>"
+
+
+def _column(index: int) -> str:
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def _cell(ref: str, value: Any, style: str) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        value = "Ya" if value else "Tidak"
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat(sep=" ", timespec="minutes") if isinstance(value, datetime) else value.isoformat()
+    return f'<c r="{ref}" t="inlineStr"{style}><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+class XlsxWriter:
+    def __init__(self, target: str | IO[bytes]) -> None:
+        self._zip = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED)
+        # (part number, title) in tab order; parts are numbered in write order.
+        self._sheets: List[tuple[int, str]] = []
+
+    def write_sheet(
+        self, title: str, header: Sequence[str], rows: Iterable[Sequence[Any]], position: int | None = None
+    ) -> int:
+        """Stream one sheet; returns the number of data rows written.
+
+        ``position`` places the tab before already written sheets, so a summary
+        computed while streaming the detail sheet can still open first.
+        """
+        number = len(self._sheets) + 1
+        entry = (number, title[:31])
+        self._sheets.insert(len(self._sheets) if position is None else position, entry)
+        count = 0
+        with self._zip.open(f"xl/worksheets/sheet{number}.xml", "w", force_zip64=True) as part:
+            part.write(_SHEET_HEAD.encode())
+            part.write(self._row(1, header, bold=True))
+            for count, row in enumerate(rows, start=1):
+                part.write(self._row(count + 1, row))
+            part.write(_SHEET_TAIL.encode())
+        return count
+
+    @staticmethod
+    def _row(number: int, values: Sequence[Any], bold: bool = False) -> bytes:
+        style = ' s="1"' if bold else ""
+        cells = "".join(_cell(f"{_column(index)}{number}", value, style) for index, value in enumerate(values))
+        return f'<row r="{number}">{cells}</row>\n'.encode()
+
+    def close(self) -> None:
+        sheets = "".join(
+            f'<sheet name="{escape(title, {chr(34): "&quot;"})}" sheetId="{n}" r:id="rId{n}"/>' for n, title in self._sheets
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{n}.xml"/>'
+            for n in range(1, len(self._sheets) + 1)
+        )
+        styles_id = len(self._sheets) + 1
+        self._zip.writestr(
+            "[Content_Types].xml",
+            _CONTENT_TYPES.format(sheets="\n".join(_SHEET_TYPE.format(n=n) for n in range(1, len(self._sheets) + 1))),
+        )
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f"<sheets>{sheets}</sheets></workbook>",
+        )
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{rels}<Relationship Id="rId{styles_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            "</Relationships>",
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+
+    def __enter__(self) -> "XlsxWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
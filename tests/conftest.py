@@ -1,41 +1,65 @@
+import base64
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+
 import pytest
+
+# Settings are read on import of the app; these test-only keys must be set first.
+os.environ.setdefault("PATIENT_ENCRYPTION_KEY", base64.b64encode(b"test-patient-encryption-key-32b!").decode())
+os.environ.setdefault("PATIENT_BLIND_INDEX_KEY", base64.b64encode(b"test-patient-blind-index-key-32b").decode())
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine, select
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
 
 from src.app.db import get_session
 from src.app.main import app
 from src.app.models.incident import Incident
-from src.app.models.role import Role
-from src.app.models.user import User
-from src.app.security.passwords import hash_password
+from src.app.services.incidents.duplicates import duplicate_index
+from tests.helpers import create_roles, create_user
 
 TEST_DB_URL = "sqlite:///:memory:"
 
+logger = logging.getLogger("tests.query_budget")
+
 
 def get_engine():
-    return create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+    return create_engine(TEST_DB_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+class QueryCounter:
+    """Records every SQL statement the test engine runs while active."""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
 
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
 
-def create_roles(session: Session) -> None:
-    roles = [
-        Role(name="perawat", description="Perawat"),
-        Role(name="pj", description="PJ"),
-        Role(name="mutu", description="Mutu"),
-        Role(name="admin", description="Admin"),
-    ]
-    session.add_all(roles)
-    session.commit()
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
 
+    @property
+    def count(self) -> int:
+        return len(self.statements)
 
-def create_user(session: Session, email: str, password: str, role_name: str) -> User:
-    role = session.exec(select(Role).where(Role.name == role_name)).one()
-    user = User(email=email, full_name=email.split("@")[0], hashed_password=hash_password(password), is_active=True)
-    user.roles.append(role)
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    session.refresh(user, attribute_names=["roles"])
-    return user
+    def repeated(self) -> dict[str, int]:
+        """Identical statements issued more than once, the usual N+1 signature."""
+        return {sql: n for sql, n in Counter(self.statements).items() if n > 1}
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements:"]
+        lines += [f"  {' '.join(sql.split())}" for sql in self.statements]
+        for sql, n in self.repeated().items():
+            lines.append(f"  possible N+1 ({n}x): {' '.join(sql.split())}")
+        return "\n".join(lines)
 
 
 @pytest.fixture(name="engine")
@@ -60,11 +84,38 @@ def client_fixture(session):
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    # Load the duplicate index up front, so no background build shares the test connection.
+    duplicate_index.clear()
+    duplicate_index.sync(session)
     with TestClient(app) as client:
         yield client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_counter(engine):
+    return QueryCounter(engine)
+
+
+@pytest.fixture
+def query_budget(engine):
+    """``with query_budget(3): client.get(...)`` fails if the block runs more than 3 statements.
+
+    Repeated identical statements are always logged at DEBUG; run with
+    ``--log-level=DEBUG`` to spot N+1 patterns that still fit the budget.
+    """
+
+    @contextmanager
+    def budget(max_queries: int):
+        with QueryCounter(engine) as counter:
+            yield counter
+        for sql, n in counter.repeated().items():
+            logger.debug("Statement ran %d times (possible N+1): %s", n, " ".join(sql.split()))
+        assert counter.count <= max_queries, f"query budget {max_queries} exceeded\n{counter.report()}"
+
+    return budget
+
+
 @pytest.fixture
 def perawat_user(session):
     return create_user(session, "perawat@example.com", "Password123", "perawat")
@@ -0,0 +1,36 @@
+"""Helpers shared by the test modules; fixtures live in ``conftest.py``."""
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from src.app.models.role import Role
+from src.app.models.user import User
+from src.app.security.passwords import hash_password
+
+
+def create_roles(session: Session) -> None:
+    roles = [
+        Role(name="perawat", description="Perawat"),
+        Role(name="pj", description="PJ"),
+        Role(name="mutu", description="Mutu"),
+        Role(name="admin", description="Admin"),
+    ]
+    session.add_all(roles)
+    session.commit()
+
+
+def auth_headers(client: TestClient, email: str, password: str) -> dict[str, str]:
+    response = client.post("/v1/auth/login", json={"email": email, "password": password})
+    token = response.json()["data"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_user(session: Session, email: str, password: str, role_name: str) -> User:
+    role = session.exec(select(Role).where(Role.name == role_name)).one()
+    user = User(email=email, full_name=email.split("@")[0], hashed_password=hash_password(password), is_active=True)
+    user.roles.append(role)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    session.refresh(user, attribute_names=["roles"])
+    return user
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app import db
+from src.app.admission import BULK, CRITICAL, STANDARD, AdmissionController, AdmissionMiddleware, Overloaded
+from src.app.observability.context import RequestContext, bind_request, reset_request
+
+
+def test_critical_waiters_are_admitted_before_bulk():
+    async def scenario():
+        controller = AdmissionController(2, critical_reserve=1, bulk_limit=1, queue_timeout_seconds=1.0)
+        bulk = await controller.acquire(BULK, "/v1/incidents")
+        standard = await controller.acquire(STANDARD, "/v1/incidents/{incident_id}")
+        order = []
+
+        async def wait(lane, route):
+            ticket = await controller.acquire(lane, route)
+            order.append(lane)
+            return ticket
+
+        queued_bulk = asyncio.create_task(wait(BULK, "/v1/incidents"))
+        await asyncio.sleep(0)
+        queued_critical = asyncio.create_task(wait(CRITICAL, "/v1/approvals/{incident_id}/pj"))
+        await asyncio.sleep(0)
+        assert controller.queued() == {CRITICAL: 1, STANDARD: 0, BULK: 1}
+
+        controller.release(standard)
+        await asyncio.sleep(0.01)
+        assert order == [CRITICAL]
+        controller.release(bulk)
+        await asyncio.sleep(0.01)
+        assert order == [CRITICAL, BULK]
+        await asyncio.gather(queued_bulk, queued_critical)
+
+    asyncio.run(scenario())
+
+
+def test_standard_lane_leaves_the_critical_reserve_and_queues_are_bounded():
+    async def scenario():
+        controller = AdmissionController(2, critical_reserve=1, queue_size=1, queue_timeout_seconds=0.05)
+        await controller.acquire(STANDARD, "/a")
+        with pytest.raises(Overloaded) as timed_out:
+            await controller.acquire(STANDARD, "/b")
+        assert timed_out.value.reason == "queue_timeout"
+        assert controller.queued()[STANDARD] == 0
+
+        waiting = asyncio.create_task(controller.acquire(STANDARD, "/b"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await controller.acquire(STANDARD, "/c")
+        assert full.value.reason == "queue_full"
+
+        # The reserved slot still takes a critical request.
+        await controller.acquire(CRITICAL, "/v1/approvals/{incident_id}/close")
+        with pytest.raises(Overloaded):
+            await waiting
+
+    asyncio.run(scenario())
+
+
+def test_route_limit_holds_back_only_that_route():
+    async def scenario():
+        controller = AdmissionController(4, queue_timeout_seconds=0.05)
+        await controller.acquire(BULK, "/v1/reports", limit=1)
+        with pytest.raises(Overloaded):
+            await controller.acquire(BULK, "/v1/reports", limit=1)
+        await controller.acquire(BULK, "/v1/incidents")
+
+    asyncio.run(scenario())
+
+
+def test_saturated_route_is_shed_with_retry_after():
+    app = FastAPI()
+
+    @app.post("/v1/reports")
+    async def create_report():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    controller = AdmissionController(4, queue_timeout_seconds=0.01)
+    app.add_middleware(AdmissionMiddleware, routes=app.router.routes, controller=controller, statement_timeout_ms=5000, retry_after_seconds=7)
+    with TestClient(app) as client:
+        assert client.post("/v1/reports").status_code == 200
+        for _ in range(2):  # the report route allows two at a time
+            asyncio.run(controller.acquire(BULK, "/v1/reports", limit=2))
+        response = client.post("/v1/reports")
+        assert client.get("/health").status_code == 200
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert response.json() == {
+        "error_code": "service_overloaded",
+        "message": "Server is busy, retry later",
+        "details": {"lane": BULK, "reason": "queue_timeout"},
+    }
+
+
+def test_session_statement_timeout_follows_the_request_context():
+    token = bind_request(RequestContext(statement_timeout_ms=30_000))
+    try:
+        sessions = db.get_session()
+        assert next(sessions).info[db.STATEMENT_TIMEOUT_KEY] == 30_000
+        sessions.close()
+    finally:
+        reset_request(token)
+    sessions = db.get_session()
+    assert next(sessions).info[db.STATEMENT_TIMEOUT_KEY] == db.settings.db_statement_timeout_ms
+    sessions.close()
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select as sa_select
+from sqlmodel import Session, select
+
+from src.app.models.archive import audit_logs_archive, incidents_archive
+from src.app.models.incident import AuditLog, Incident, IncidentCategory, IncidentStatus
+from src.app.services.archival import archive_closed, purge_drafts
+from tests.helpers import auth_headers
+
+NOW = datetime(2026, 10, 1, 12, 0)
+
+
+def add_incident(session: Session, reporter_id: int, status: IncidentStatus, updated_at: datetime, **fields) -> int:
+    incident = Incident(
+        reporter_id=reporter_id,
+        occurred_at=updated_at - timedelta(days=3),
+        free_text_description=fields.pop("free_text_description", "Pasien terjatuh di kamar mandi"),
+        status=status,
+        updated_at=updated_at,
+        **fields,
+    )
+    session.add(incident)
+    session.commit()
+    session.add(AuditLog(incident_id=incident.id, actor_id=reporter_id, to_status=status, created_at=updated_at))
+    session.commit()
+    return incident.id
+
+
+def test_old_closed_incidents_move_to_archive_and_stay_readable(client: TestClient, session, engine, perawat_user, mutu_user):
+    old = NOW - timedelta(days=800)
+    archived_id = add_incident(
+        session, perawat_user.id, IncidentStatus.CLOSED, old, final_category=IncidentCategory.KTD, attachments=["a.jpg"]
+    )
+    recent_id = add_incident(session, perawat_user.id, IncidentStatus.CLOSED, NOW - timedelta(days=10))
+    in_review_id = add_incident(session, perawat_user.id, IncidentStatus.PJ_REVIEWED, old)
+
+    result = archive_closed(lambda: Session(engine), timedelta(days=730), batch_size=1, now=NOW)
+
+    assert (result.archived, result.audit_logs) == (1, 1)
+    session.expire_all()
+    assert session.get(Incident, archived_id) is None
+    assert session.get(Incident, recent_id) is not None
+    assert session.get(Incident, in_review_id) is not None
+    assert session.exec(select(AuditLog).where(AuditLog.incident_id == archived_id)).all() == []
+    assert session.execute(sa_select(func.count()).select_from(audit_logs_archive)).scalar_one() == 1
+
+    response = client.get(f"/v1/incidents/{archived_id}", headers=auth_headers(client, mutu_user.email, "Password123"))
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["final_category"] == "KTD"
+    assert data["attachments"] == ["a.jpg"]
+    assert data["archived_at"] == NOW.isoformat()
+
+    assert archive_closed(lambda: Session(engine), timedelta(days=730), now=NOW).archived == 0
+
+
+def test_referenced_duplicate_target_is_kept(session, engine, perawat_user):
+    old = NOW - timedelta(days=800)
+    target_id = add_incident(session, perawat_user.id, IncidentStatus.CLOSED, old)
+    add_incident(session, perawat_user.id, IncidentStatus.SUBMITTED, old, suspected_duplicate_of=target_id)
+
+    result = archive_closed(lambda: Session(engine), timedelta(days=730), now=NOW)
+
+    assert result.archived == 0
+    session.expire_all()
+    assert session.get(Incident, target_id) is not None
+
+
+def test_chain_behind_a_kept_incident_is_kept(session, engine, perawat_user):
+    old = NOW - timedelta(days=800)
+    first = add_incident(session, perawat_user.id, IncidentStatus.CLOSED, old)
+    second = add_incident(session, perawat_user.id, IncidentStatus.CLOSED, old, suspected_duplicate_of=first)
+    add_incident(session, perawat_user.id, IncidentStatus.SUBMITTED, old, suspected_duplicate_of=second)
+
+    assert archive_closed(lambda: Session(engine), timedelta(days=730), now=NOW).archived == 0
+    session.expire_all()
+    assert session.get(Incident, first) is not None
+    assert session.get(Incident, second) is not None
+
+
+def test_abandoned_drafts_are_purged(session, engine, perawat_user):
+    stale_id = add_incident(session, perawat_user.id, IncidentStatus.DRAFT, NOW - timedelta(days=120))
+    fresh_id = add_incident(session, perawat_user.id, IncidentStatus.DRAFT, NOW - timedelta(days=5))
+
+    dry = purge_drafts(lambda: Session(engine), timedelta(days=90), now=NOW, dry_run=True)
+    session.expire_all()
+    assert dry.purged_drafts == 1
+    assert session.get(Incident, stale_id) is not None
+
+    result = purge_drafts(lambda: Session(engine), timedelta(days=90), now=NOW)
+    session.expire_all()
+    assert result.purged_drafts == 1
+    assert session.get(Incident, stale_id) is None
+    assert session.get(Incident, fresh_id) is not None
+    assert session.execute(sa_select(func.count()).select_from(incidents_archive)).scalar_one() == 0
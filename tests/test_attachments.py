@@ -0,0 +1,149 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from src.app.main import app
+from src.app.models.attachment import AttachmentBlob
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.routers.attachments import parse_range
+from src.app.services.attachments.storage import LocalStorage, get_storage
+from tests.helpers import auth_headers
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalStorage(tmp_path / "attachments", max_bytes=1024 * 1024)
+    app.dependency_overrides[get_storage] = lambda: storage
+    yield storage
+    app.dependency_overrides.pop(get_storage, None)
+
+
+def create_draft(client: TestClient, headers: dict[str, str]) -> int:
+    response = client.post("/v1/incidents", json={"free_text_description": "Pasien terjatuh dari kursi roda"}, headers=headers)
+    return response.json()["data"]["id"]
+
+
+def chunked(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_upload_is_content_addressed_and_deduplicated(client: TestClient, perawat_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    first, second = create_draft(client, headers), create_draft(client, headers)
+    photo = bytes(range(256)) * 40
+    digest = hashlib.sha256(photo).hexdigest()
+
+    uploaded = client.post(
+        f"/v1/incidents/{first}/attachments",
+        content=chunked(photo),
+        headers={**headers, "Content-Type": "image/jpeg", "X-Content-SHA256": digest},
+    )
+    assert uploaded.status_code == 201
+    assert uploaded.json()["data"] == {**uploaded.json()["data"], "sha256": digest, "size_bytes": len(photo), "deduplicated": False}
+
+    again = client.post(f"/v1/incidents/{second}/attachments", content=photo, headers={**headers, "Content-Type": "image/jpeg"})
+    assert again.json()["data"]["deduplicated"] is True
+    stored = [path for path in storage.root.rglob("*") if path.is_file()]
+    assert [path.name for path in stored] == [digest]
+
+    incident = client.get(f"/v1/incidents/{second}", headers=headers).json()["data"]
+    assert incident["attachments"] == [digest]
+    listed = client.get(f"/v1/incidents/{second}/attachments", headers=headers).json()["data"]
+    assert [item["sha256"] for item in listed] == [digest]
+
+
+def test_download_supports_ranges(client: TestClient, perawat_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = create_draft(client, headers)
+    body = b"0123456789" * 10
+    digest = client.post(f"/v1/incidents/{incident_id}/attachments", content=body, headers=headers).json()["data"]["sha256"]
+    url = f"/v1/incidents/{incident_id}/attachments/{digest}"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.content == body
+    assert full.headers["accept-ranges"] == "bytes"
+
+    partial = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == body[10:20]
+    assert partial.headers["content-range"] == "bytes 10-19/100"
+
+    tail = client.get(url, headers={**headers, "Range": "bytes=-5"})
+    assert tail.content == body[-5:]
+
+    unsatisfiable = client.get(url, headers={**headers, "Range": "bytes=500-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */100"
+
+
+def test_upload_rejects_oversized_and_mismatched_bodies(client: TestClient, perawat_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = create_draft(client, headers)
+    url = f"/v1/incidents/{incident_id}/attachments"
+
+    too_large = client.post(url, content=chunked(b"x" * (storage.max_bytes + 1), 64 * 1024), headers=headers)
+    assert too_large.status_code == 413
+    mismatch = client.post(url, content=b"photo", headers={**headers, "X-Content-SHA256": "0" * 64})
+    assert mismatch.status_code == 400
+    assert not [path for path in storage.root.rglob("*") if path.is_file()]
+
+
+def test_attachments_follow_incident_access_rules(client: TestClient, perawat_user, pj_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    pj_headers = auth_headers(client, pj_user.email, "Password123")
+    incident_id = create_draft(client, headers)
+    digest = client.post(f"/v1/incidents/{incident_id}/attachments", content=b"scan", headers=headers).json()["data"]["sha256"]
+
+    assert client.post(f"/v1/incidents/{incident_id}/attachments", content=b"scan", headers=pj_headers).status_code == 403
+    assert client.get(f"/v1/incidents/{incident_id}/attachments/{digest}", headers=pj_headers).content == b"scan"
+    assert client.get(f"/v1/incidents/{incident_id}/attachments/{'f' * 64}", headers=headers).status_code == 404
+
+
+def test_upload_to_a_draft_submitted_meanwhile_leaves_nothing_behind(client: TestClient, session, perawat_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = create_draft(client, headers)
+    data = b"late scan" * 200
+
+    def submitted_while_uploading():
+        yield data[:900]
+        incident = session.get(Incident, incident_id)
+        incident.status = IncidentStatus.SUBMITTED
+        session.add(incident)
+        session.commit()
+        yield data[900:]
+
+    response = client.post(f"/v1/incidents/{incident_id}/attachments", content=submitted_while_uploading(), headers=headers)
+    assert response.status_code == 409
+    assert session.exec(select(AttachmentBlob)).all() == []
+    assert not storage.exists(hashlib.sha256(data).hexdigest())
+    assert list((storage.root / "staging").iterdir()) == []
+
+
+def test_active_content_is_downloaded_as_opaque_bytes(client: TestClient, perawat_user, storage):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = create_draft(client, headers)
+    url = f"/v1/incidents/{incident_id}/attachments"
+
+    page = client.post(url, content=b"<script>alert(1)</script>", headers={**headers, "Content-Type": "text/html"}).json()["data"]
+    assert page["content_type"] == "application/octet-stream"
+    scan = client.post(url, content=b"%PDF-1.4", headers={**headers, "Content-Type": "Application/PDF; charset=binary"}).json()["data"]
+    assert scan["content_type"] == "application/pdf"
+
+    download = client.get(f"{url}/{page['sha256']}", headers=headers)
+    assert download.headers["content-type"] == "application/octet-stream"
+    assert download.headers["content-disposition"] == f'attachment; filename="{page["sha256"]}"'
+    assert download.headers["x-content-type-options"] == "nosniff"
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-0", 100) == (0, 0)
+    assert parse_range("bytes=90-200", 100) == (90, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=5-1", 100)
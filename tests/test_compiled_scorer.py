@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+from sklearn.utils import murmurhash3_32 as sklearn_murmurhash3_32
+
+from src.app.services.classifier.compiled import CompiledScorer, compile_pipeline, export_compiled, murmurhash3_32, verify_compiled
+from src.app.services.ml import IncidentClassifier
+
+TRAIN = [
+    ("Pasien jatuh dari tempat tidur dan mengalami memar", "KTD"),
+    ("Pasien terjatuh di kamar mandi, luka robek di dahi", "KTD"),
+    ("Salah pemberian obat namun tidak ada efek pada pasien", "KTC"),
+    ("Infus terlepas tanpa cedera pada pasien", "KTC"),
+    ("Perawat hampir memberikan obat ke pasien yang salah", "KNC"),
+    ("Salah label darah terdeteksi sebelum transfusi", "KNC"),
+    ("Lantai licin di koridor berpotensi menyebabkan cedera serius", "KPCS"),
+    ("Kabel listrik terkelupas di dekat tempat tidur pasien", "KPCS"),
+    ("Pasien meninggal tak terduga setelah operasi", "Sentinel"),
+    ("Operasi pada sisi tubuh yang salah", "Sentinel"),
+]
+CORPUS = [
+    "Pasien jatuh saat ke toilet, tidak ada luka",
+    "Obat tertukar, terdeteksi apoteker sebelum diberikan",
+    "Kabel monitor terkelupas",
+    "Café résumé naïve — ejaan aneh ÀÉÎ",
+    "",
+    "operasi salah sisi pasien meninggal",
+]
+
+
+def fit(*steps):
+    texts, labels = zip(*TRAIN)
+    return Pipeline([(f"step{i}", step) for i, step in enumerate(steps)]).fit(list(texts), list(labels))
+
+
+@pytest.mark.parametrize(
+    "pipeline",
+    [
+        fit(TfidfVectorizer(), LogisticRegression(max_iter=1000)),
+        fit(TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, strip_accents="unicode"), LogisticRegression(solver="liblinear")),
+        fit(TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4)), LogisticRegression(max_iter=1000)),
+        fit(CountVectorizer(binary=True, stop_words=["dan", "di"]), SGDClassifier(loss="log_loss", random_state=0)),
+        fit(HashingVectorizer(n_features=2**10), TfidfTransformer(), LogisticRegression(max_iter=1000)),
+        fit(CountVectorizer(analyzer="char", ngram_range=(1, 3), strip_accents="ascii"), LinearSVC(dual="auto")),
+        fit(TfidfVectorizer(), RidgeClassifier()),
+    ],
+)
+def test_compiled_scorer_matches_sklearn(pipeline, tmp_path):
+    scorer = compile_pipeline(pipeline, model_version="test")
+    report = verify_compiled(pipeline, scorer, CORPUS + [text for text, _ in TRAIN])
+    assert report["ok"], report
+
+    reloaded = CompiledScorer.load(export_compiled(scorer, tmp_path / "compiled"))
+    assert reloaded.predict(CORPUS).tolist() == scorer.predict(CORPUS).tolist()
+    if hasattr(pipeline, "predict_proba"):
+        np.testing.assert_allclose(reloaded.predict_proba(CORPUS), pipeline.predict_proba(CORPUS), atol=1e-12)
+
+
+def test_murmurhash_matches_sklearn():
+    for token in ["", "a", "ab", "abc", "abcd", "jatuh", "cedera serius", "naïve", "ééé"]:
+        assert murmurhash3_32(token) == sklearn_murmurhash3_32(token, seed=0)
+
+
+def test_incident_classifier_loads_compiled_artifact(tmp_path):
+    pipeline = fit(TfidfVectorizer(), LogisticRegression(max_iter=1000))
+    export_compiled(compile_pipeline(pipeline, model_version="inc-compiled-1"), tmp_path / "model")
+
+    classifier = IncidentClassifier(tmp_path / "model")
+    prediction = classifier.predict("Pasien jatuh dari tempat tidur")
+    assert prediction["model_version"] == "inc-compiled-1"
+    assert prediction["category"].value == pipeline.predict(["Pasien jatuh dari tempat tidur"])[0]
+    assert prediction["confidence"] == pytest.approx(pipeline.predict_proba(["Pasien jatuh dari tempat tidur"]).max())
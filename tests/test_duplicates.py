@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.models.location import Location
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.app.models.incident import Incident
+from src.app.services.incidents.duplicates import (
+    DuplicateIndex,
+    check_duplicate,
+    duplicate_index,
+    index_on_commit,
+    signature,
+    similarity,
+)
+from tests.helpers import auth_headers, create_roles, create_user
+
+
+@pytest.fixture(autouse=True)
+def clear_index(session):
+    duplicate_index.clear()
+    duplicate_index.sync(session)
+    yield
+    duplicate_index.clear()
+
+
+@pytest.fixture
+def ward(session) -> Location:
+    location = Location(name="Bangsal Melati")
+    session.add(location)
+    session.commit()
+    session.refresh(location)
+    return location
+
+
+def report(client: TestClient, headers: dict[str, str], text: str, **fields) -> dict:
+    body = {"free_text_description": text, "occurred_at": "2026-10-18T22:00:00", **fields}
+    incident_id = client.post("/v1/incidents", json=body, headers=headers).json()["data"]["id"]
+    return client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=headers).json()["data"]
+
+
+FALL = "Pasien Tn. A terjatuh dari tempat tidur saat hendak ke kamar mandi pada malam hari, pagar tempat tidur tidak terpasang."
+FALL_RETOLD = "Pasien Tn A terjatuh dari tempat tidur ketika hendak ke kamar mandi malam hari, pagar tempat tidur tidak terpasang"
+MEDICATION = "Perawat memberikan obat antibiotik kepada pasien yang salah karena gelang identitas tertukar di IGD."
+
+
+def test_signatures_estimate_similarity():
+    assert similarity(signature(FALL), signature(FALL_RETOLD)) >= 0.6
+    assert similarity(signature(FALL), signature(MEDICATION)) < 0.2
+
+
+def test_second_report_of_same_event_is_flagged(client: TestClient, session, perawat_user, ward):
+    colleague = create_user(session, "perawat2@example.com", "Password123", "perawat")
+    first = report(client, auth_headers(client, perawat_user.email, "Password123"), FALL, location_id=ward.id)
+    second = report(
+        client,
+        auth_headers(client, colleague.email, "Password123"),
+        FALL_RETOLD,
+        location_id=ward.id,
+        occurred_at="2026-10-18T23:30:00",
+    )
+    assert first["suspected_duplicate_of"] is None
+    assert second["suspected_duplicate_of"] == first["id"]
+
+    other = report(client, auth_headers(client, colleague.email, "Password123"), MEDICATION, location_id=ward.id)
+    assert other["suspected_duplicate_of"] is None
+
+
+def test_scope_excludes_other_places_times_and_patients(client: TestClient, session, perawat_user, ward):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    first = report(client, headers, FALL, location_id=ward.id, patient_identifier="RM-001")
+    assert report(client, headers, FALL_RETOLD, location_id=ward.id, patient_identifier="RM-001")["suspected_duplicate_of"] == first["id"]
+    assert report(client, headers, FALL_RETOLD, patient_identifier="RM-001")["suspected_duplicate_of"] is None
+    assert report(client, headers, FALL_RETOLD, location_id=ward.id, occurred_at="2026-10-20T08:00:00")["suspected_duplicate_of"] is None
+    assert report(client, headers, FALL_RETOLD, location_id=ward.id, patient_identifier="RM-002")["suspected_duplicate_of"] is None
+
+
+class Row:
+    def __init__(self, incident_id: int, text: str, status: str = "SUBMITTED", occurred_at: datetime | None = None) -> None:
+        self.id = incident_id
+        self.free_text_description = text
+        self.location_id = 1
+        self.patient_blind_index = None
+        self.occurred_at = occurred_at or datetime(2026, 10, 18, 22)
+        self.status = status
+
+
+def test_index_ignores_drafts_and_reindexes_edits():
+    index = DuplicateIndex(window_hours=12, threshold=0.6)
+    index.add(Row(1, FALL, status="DRAFT"))
+    assert index.find(Row(2, FALL_RETOLD)) is None
+
+    index.add(Row(1, FALL))
+    assert index.find(Row(2, FALL_RETOLD)).incident_id == 1
+
+    index.add(Row(1, MEDICATION))
+    assert index.find(Row(2, FALL_RETOLD)) is None
+
+    index.evict(datetime(2026, 10, 18, 22) + timedelta(days=31))
+    assert len(index) == 0
+
+
+def test_drafts_enter_the_index_only_when_committed(session, perawat_user):
+    rolled_back = Incident(reporter_id=perawat_user.id, free_text_description=FALL, occurred_at=datetime(2026, 10, 18, 22))
+    session.add(rolled_back)
+    session.flush()
+    index_on_commit(session, rolled_back)
+    session.rollback()
+    assert len(duplicate_index) == 0
+
+    committed = Incident(reporter_id=perawat_user.id, free_text_description=FALL, occurred_at=datetime(2026, 10, 18, 22))
+    session.add(committed)
+    session.flush()
+    index_on_commit(session, committed)
+    assert len(duplicate_index) == 0
+    session.commit()
+    assert len(duplicate_index) == 1
+
+
+def test_first_lookup_builds_the_index_in_the_background(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'duplicates.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        create_roles(session)
+        reporter = create_user(session, "perawat@example.com", "Password123", "perawat")
+        submitted = Incident(reporter_id=reporter.id, free_text_description=FALL, status="SUBMITTED", occurred_at=datetime.utcnow())
+        session.add(submitted)
+        session.commit()
+        probe = Incident(id=submitted.id + 1, reporter_id=reporter.id, free_text_description=FALL_RETOLD, occurred_at=submitted.occurred_at)
+
+        duplicate_index.clear()
+        assert check_duplicate(session, probe) is None  # not loaded yet: unchecked, not blocked
+        duplicate_index.build_in_background(lambda: Session(engine)).join(timeout=10)
+        assert duplicate_index.ready
+        assert check_duplicate(session, probe).incident_id == submitted.id
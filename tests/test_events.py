@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from src.app.config import get_settings
+from src.app.models.incident import AuditLog, IncidentStatus
+from src.app.services.incidents.events import (
+    AuditLogPoller,
+    Broadcaster,
+    EventScope,
+    IncidentEvent,
+    broadcaster,
+    stream_events,
+)
+from tests.helpers import auth_headers
+
+
+@pytest.fixture(autouse=True)
+def fresh_broadcaster():
+    # Every test database starts its audit log ids at 1 again.
+    broadcaster.clear()
+    yield
+    broadcaster.clear()
+
+
+def make_event(event_id: int, reporter_id: int = 1, department_id: int | None = None) -> IncidentEvent:
+    return IncidentEvent(
+        id=event_id,
+        incident_id=event_id,
+        reporter_id=reporter_id,
+        department_id=department_id,
+        from_status="DRAFT",
+        to_status="SUBMITTED",
+        actor_id=reporter_id,
+        occurred_at="2024-01-01T00:00:00",
+    )
+
+
+def submit_draft(client: TestClient, headers: dict[str, str]) -> int:
+    incident_id = client.post(
+        "/v1/incidents", json={"free_text_description": "Pasien terjatuh dari kursi roda"}, headers=headers
+    ).json()["data"]["id"]
+    client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=headers)
+    return incident_id
+
+
+def parse_frames(body: str) -> list[dict]:
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "data" in fields:
+            frames.append({"id": int(fields["id"]), **json.loads(fields["data"])})
+    return frames
+
+
+def test_transitions_are_published_after_commit(client: TestClient, session: Session, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = submit_draft(client, headers)
+
+    log = session.exec(select(AuditLog).where(AuditLog.incident_id == incident_id)).one()
+    assert broadcaster.last_event_id == log.id
+    [published] = broadcaster.replay(0)
+    assert (published.incident_id, published.to_status) == (incident_id, IncidentStatus.SUBMITTED.value)
+
+
+def test_rolled_back_transitions_are_not_published(session: Session, perawat_user):
+    from src.app.models.incident import Incident
+    from src.app.services.incidents.service import create_audit_log
+
+    incident = Incident(reporter_id=perawat_user.id, free_text_description="Pasien terjatuh dari kursi roda")
+    session.add(incident)
+    session.flush()
+    create_audit_log(session, incident, perawat_user, IncidentStatus.DRAFT, IncidentStatus.SUBMITTED)
+    session.flush()
+    session.rollback()
+    assert broadcaster.last_event_id is None
+
+
+def test_stream_replays_backlog_then_delivers_live_events_in_scope():
+    async def run() -> list[str]:
+        hub = Broadcaster(buffer_size=10, max_queue=10)
+        for event_id in (1, 2):
+            hub.publish(make_event(event_id, reporter_id=7))
+        subscription = hub.subscribe(EventScope(reporter_id=7))
+        stream = stream_events(subscription, hub.replay(1), heartbeat_seconds=0.05)
+        frames = [await stream.__anext__(), await stream.__anext__()]
+        publisher = threading.Thread(target=lambda: [hub.publish(make_event(3, reporter_id=8)), hub.publish(make_event(4, reporter_id=7))])
+        publisher.start()
+        publisher.join()
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+        assert hub.subscriber_count == 0
+        return frames
+
+    retry, replayed, live, heartbeat = asyncio.run(run())
+    assert retry.startswith("retry:")
+    assert [frame["id"] for frame in parse_frames(replayed + live)] == [2, 4]
+    assert heartbeat == ": keep-alive\n\n"
+
+
+def test_slow_subscriber_is_disconnected_instead_of_buffering():
+    async def run() -> list[str]:
+        hub = Broadcaster(buffer_size=100, max_queue=2)
+        subscription = hub.subscribe(EventScope())
+        for event_id in range(1, 6):
+            hub.publish(make_event(event_id))
+        await asyncio.sleep(0)
+        frames = [frame async for frame in stream_events(subscription, [], heartbeat_seconds=1)]
+        assert hub.dropped_subscribers == 1
+        assert [item.id for item in hub.replay(2)] == [3, 4, 5]
+        return frames
+
+    frames = asyncio.run(run())
+    assert len(frames) == 1  # only the retry hint; the client resumes from its Last-Event-ID
+
+
+def test_poller_publishes_rows_committed_elsewhere(client: TestClient, engine, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    hub = Broadcaster()
+    poller = AuditLogPoller(lambda: Session(engine), hub, interval_seconds=60)
+    assert poller.poll_once() == 0
+    first, second = submit_draft(client, headers), submit_draft(client, headers)
+    assert poller.poll_once() == 2
+    assert poller.poll_once() == 0
+    assert [item.incident_id for item in hub.replay(0)] == [first, second]
+
+
+def test_endpoint_resumes_from_last_event_id(client: TestClient, perawat_user, pj_user, monkeypatch):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    pj_headers = auth_headers(client, pj_user.email, "Password123")
+    first, second = submit_draft(client, headers), submit_draft(client, headers)
+    # An empty buffer forces a database replay; a one-row page ends the stream
+    # after the backlog, the way a client that fell far behind catches up.
+    broadcaster.clear()
+    monkeypatch.setattr(get_settings(), "incident_events_buffer_size", 1)
+
+    response = client.get("/v1/events/incidents", headers={**pj_headers, "Last-Event-ID": "1"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    [frame] = parse_frames(response.text)
+    assert (frame["id"], frame["incident_id"]) == (2, second)
+    assert first != second
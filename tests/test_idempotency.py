@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from src.app.models.idempotency import IdempotencyKey
+from src.app.models.incident import AuditLog, Incident
+from src.app.routers import incidents as incidents_router
+from src.app.services import idempotency
+from src.app.services.idempotency import IdempotentReplay, claim, purge_expired
+from tests.helpers import auth_headers, create_roles, create_user
+
+
+def test_retried_create_and_submit_run_once(client: TestClient, session, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    body = {"free_text_description": "Pasien terjatuh di kamar mandi", "patient_identifier": "RM-000123"}
+
+    first = client.post("/v1/incidents", json=body, headers={**headers, "Idempotency-Key": "create-1"})
+    retry = client.post("/v1/incidents", json=body, headers={**headers, "Idempotency-Key": "create-1"})
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert session.exec(select(func.count()).select_from(Incident)).one() == 1
+
+    stored = session.exec(select(IdempotencyKey)).one()
+    assert "RM-000123" in stored.response_body
+    assert "RM-000123" not in session.connection().exec_driver_sql("SELECT response_body FROM idempotency_keys").scalar_one()
+
+    incident_id = first.json()["data"]["id"]
+    submit_headers = {**headers, "Idempotency-Key": "submit-1"}
+    submitted = client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=submit_headers)
+    replayed = client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=submit_headers)
+    assert submitted.status_code == replayed.status_code == 200
+    assert replayed.json()["data"]["status"] == "SUBMITTED"
+    assert session.exec(select(func.count()).select_from(AuditLog).where(AuditLog.incident_id == incident_id)).one() == 1
+
+    # Without the key a second submit is an ordinary invalid transition.
+    assert client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=headers).status_code == 409
+
+
+def test_key_reused_for_another_request_is_rejected(client: TestClient, perawat_user):
+    headers = {**auth_headers(client, perawat_user.email, "Password123"), "Idempotency-Key": "create-2"}
+    client.post("/v1/incidents", json={"free_text_description": "Pasien terjatuh di kamar mandi"}, headers=headers)
+    response = client.post("/v1/incidents", json={"free_text_description": "Obat diberikan ke pasien yang salah"}, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"]["error_code"] == "idempotency_key_reused"
+
+
+def test_failed_request_releases_its_key(client: TestClient, session, perawat_user, pj_user):
+    perawat = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = client.post("/v1/incidents", json={"free_text_description": "Pasien terjatuh di kamar mandi"}, headers=perawat).json()["data"]["id"]
+    pj = {**auth_headers(client, pj_user.email, "Password123"), "Idempotency-Key": "review-1"}
+
+    early = client.post(f"/v1/approvals/{incident_id}/pj", json={"category": "KTD"}, headers=pj)
+    assert early.status_code == 409
+    assert session.exec(select(IdempotencyKey)).all() == []
+
+    client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=perawat)
+    assert client.post(f"/v1/approvals/{incident_id}/pj", json={"category": "KTD"}, headers=pj).status_code == 200
+
+
+def test_response_is_stored_with_the_work_it_describes(client: TestClient, session, perawat_user, monkeypatch):
+    headers = {**auth_headers(client, perawat_user.email, "Password123"), "Idempotency-Key": "create-3"}
+    body = {"free_text_description": "Pasien terjatuh di kamar mandi"}
+
+    def fail(session, incident):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(incidents_router, "_index_for_duplicates", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/v1/incidents", json=body, headers=headers)
+    assert session.exec(select(func.count()).select_from(Incident)).one() == 0
+    assert session.exec(select(IdempotencyKey)).all() == []
+
+    monkeypatch.undo()
+    created = client.post("/v1/incidents", json=body, headers=headers)
+    assert created.status_code == 201
+    stored = session.exec(select(IdempotencyKey)).one()
+    assert stored.response_status == 201
+    assert session.exec(select(func.count()).select_from(Incident)).one() == 1
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        create_roles(session)
+        user_id = create_user(session, "perawat@example.com", "Password123", "perawat").id
+    return engine, user_id
+
+
+def test_concurrent_duplicate_waits_for_the_first(file_engine):
+    engine, user_id = file_engine
+    with Session(engine) as first:
+        record = claim(first, user_id, "key-1", "fp")
+
+        def finish() -> None:
+            time.sleep(0.2)
+            record.response_status = 201
+            record.response_body = '{"data": {"id": 7}}'
+            first.add(record)
+            first.commit()
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        with Session(engine) as second, pytest.raises(IdempotentReplay) as replay:
+            claim(second, user_id, "key-1", "fp")
+        worker.join()
+    assert replay.value.status_code == 201
+    assert replay.value.body == {"data": {"id": 7}}
+
+
+def test_wait_is_bounded_and_abandoned_claims_are_taken_over(file_engine, monkeypatch):
+    engine, user_id = file_engine
+    monkeypatch.setattr(idempotency.get_settings(), "idempotency_wait_seconds", 0.1)
+    with Session(engine) as session:
+        claim(session, user_id, "key-2", "fp")
+    with Session(engine) as session, pytest.raises(HTTPException) as busy:
+        claim(session, user_id, "key-2", "fp")
+    assert busy.value.status_code == 409
+
+    monkeypatch.setattr(idempotency.get_settings(), "idempotency_lock_seconds", 0.0)
+    with Session(engine) as session:
+        taken = claim(session, user_id, "key-2", "fp")
+        assert taken.response_status is None
+
+
+def test_expired_keys_are_purged(file_engine):
+    engine, user_id = file_engine
+    with Session(engine) as session:
+        claim(session, user_id, "old", "fp")
+        claim(session, user_id, "new", "fp")
+    later = datetime.utcnow() + timedelta(hours=25)
+    with Session(engine) as session:
+        session.exec(select(IdempotencyKey).where(IdempotencyKey.key == "new")).one().expires_at = later + timedelta(hours=1)
+        session.commit()
+    assert purge_expired(lambda: Session(engine), now=later) == 1
+    with Session(engine) as session:
+        assert [row.key for row in session.exec(select(IdempotencyKey)).all()] == ["new"]
@@ -1,12 +1,7 @@
 from fastapi.testclient import TestClient
 
 from src.app.models.incident import IncidentStatus
-
-
-def auth_headers(client: TestClient, email: str, password: str) -> dict[str, str]:
-    response = client.post("/v1/auth/login", json={"email": email, "password": password})
-    token = response.json()["data"]["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+from tests.helpers import auth_headers
 
 
 def test_perawat_submit_triggers_prediction(client: TestClient, session, perawat_user):
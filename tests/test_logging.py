@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from src.app.observability.context import RequestContext, bind_request, reset_request
+from src.app.observability.logs import DebugSamplingFilter, configure_logging, shutdown_logging
+from tests.helpers import auth_headers
+
+
+def read_lines(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_request_id_is_generated_or_propagated(client: TestClient):
+    generated = client.get("/health")
+    assert len(generated.headers["x-request-id"]) == 32
+
+    propagated = client.get("/health", headers={"X-Request-ID": "edge-1234"})
+    assert propagated.headers["x-request-id"] == "edge-1234"
+
+    rejected = client.get("/health", headers={"X-Request-ID": "bad id\nwith newline"})
+    assert rejected.headers["x-request-id"] != "bad id\nwith newline"
+
+
+def test_json_logs_carry_request_context_through_the_queue():
+    stream = io.StringIO()
+    listener = configure_logging("INFO", "json", 1.0, stream=stream)
+    token = bind_request(RequestContext(request_id="req-1", user_id=7, method="POST", route="/v1/incidents"))
+    try:
+        logging.getLogger("src.app.test").info("Incident %s submitted", 42, extra={"incident_id": 42})
+    finally:
+        reset_request(token)
+        shutdown_logging(listener)
+    [line] = [entry for entry in read_lines(stream) if entry["logger"] == "src.app.test"]
+    assert line["message"] == "Incident 42 submitted"
+    assert line["request_id"] == "req-1"
+    assert line["user_id"] == 7
+    assert line["route"] == "/v1/incidents"
+    assert line["incident_id"] == 42
+
+
+def test_submit_logs_share_request_id_with_access_line(client: TestClient, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = client.post(
+        "/v1/incidents", json={"free_text_description": "Pasien terjatuh dari kursi roda"}, headers=headers
+    ).json()["data"]["id"]
+
+    stream = io.StringIO()
+    listener = configure_logging("INFO", "json", 1.0, stream=stream)
+    try:
+        response = client.post(
+            f"/v1/incidents/{incident_id}/submit",
+            json={"confirm_submit": True},
+            headers={**headers, "X-Request-ID": "submit-1"},
+        )
+    finally:
+        shutdown_logging(listener)
+    assert response.status_code == 200
+    lines = [entry for entry in read_lines(stream) if entry.get("request_id") == "submit-1"]
+    loggers = {entry["logger"] for entry in lines}
+    assert {"src.app.services.incidents.service", "src.app.access"} <= loggers
+    access = next(entry for entry in lines if entry["logger"] == "src.app.access")
+    assert access["route"] == "/v1/incidents/{incident_id}/submit"
+    assert access["user_id"] == perawat_user.id
+    assert access["status"] == 200
+    assert "auth" in access["timings_ms"]
+
+
+def test_debug_sampling_is_decided_per_request():
+    sampler = DebugSamplingFilter(0.5)
+    kept = []
+    for index in range(200):
+        record = logging.LogRecord("x", logging.DEBUG, __file__, 1, "debug", None, None)
+        record.request_id = f"req-{index}"
+        decisions = {sampler.filter(record) for _ in range(3)}
+        assert len(decisions) == 1
+        kept.append(decisions.pop())
+    assert 40 < sum(kept) < 160
+
+    warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "warn", None, None)
+    assert DebugSamplingFilter(0.0).filter(warning)
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.observability.metrics import HTTP_REQUESTS, INCIDENT_TRANSITIONS, Histogram
+from src.app.services.incidents.service import create_audit_log
+from tests.helpers import auth_headers
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    lines = histogram.render()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint_reports_route_templates(client: TestClient, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = client.post(
+        "/v1/incidents", json={"free_text_description": "Pasien terjatuh"}, headers=headers
+    ).json()["data"]["id"]
+    before = HTTP_REQUESTS.value("GET", "/v1/incidents/{incident_id}", "200")
+    submitted = INCIDENT_TRANSITIONS.value("DRAFT", "SUBMITTED")
+
+    client.get(f"/v1/incidents/{incident_id}", headers=headers)
+    client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=headers)
+
+    assert HTTP_REQUESTS.value("GET", "/v1/incidents/{incident_id}", "200") == before + 1
+    assert INCIDENT_TRANSITIONS.value("DRAFT", "SUBMITTED") == submitted + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/v1/incidents/{incident_id}",le="+Inf"}' in body
+    assert "model_inference_duration_seconds_count" in body
+    assert "prediction_cache_misses_total" in body
+    assert "http_requests_in_progress" in body
+
+
+def test_transitions_are_counted_only_when_committed(session, perawat_user):
+    incident = Incident(reporter_id=perawat_user.id, free_text_description="Pasien terjatuh di kamar mandi")
+    session.add(incident)
+    session.commit()
+    before = INCIDENT_TRANSITIONS.value("DRAFT", "SUBMITTED")
+
+    create_audit_log(session, incident, perawat_user, IncidentStatus.DRAFT, IncidentStatus.SUBMITTED)
+    session.rollback()
+    assert INCIDENT_TRANSITIONS.value("DRAFT", "SUBMITTED") == before
+
+    create_audit_log(session, incident, perawat_user, IncidentStatus.DRAFT, IncidentStatus.SUBMITTED)
+    session.commit()
+    assert INCIDENT_TRANSITIONS.value("DRAFT", "SUBMITTED") == before + 1
@@ -0,0 +1,110 @@
+import os
+
+import joblib
+from fastapi.testclient import TestClient
+from sklearn.dummy import DummyClassifier
+
+from src.app.models.incident import IncidentCategory
+from src.app.services.classifier.evaluation import ClassificationReport
+from src.app.services.classifier.rules import RulesEngine
+from src.app.services.ml import IncidentClassifier, ModelManager
+
+
+def dump_constant_model(path, category: str, version: str) -> None:
+    model = DummyClassifier(strategy="constant", constant=category)
+    model.fit([[0], [1]], [category, "KTC"])
+    model.version = version
+    # Replace via rename like a deploy would: the live model memory-maps the old inode.
+    staging = path.with_suffix(".tmp")
+    joblib.dump(model, staging)
+    os.replace(staging, path)
+
+
+def test_missing_artifact_uses_fallback(tmp_path):
+    manager = ModelManager(tmp_path / "absent.pkl")
+    prediction = manager.predict("Pasien jatuh di kamar mandi")
+    assert prediction["category"] == IncidentCategory.KTD
+    assert prediction["model_version"] == manager.model_version
+
+
+def test_reload_swaps_model_when_artifact_changes(tmp_path):
+    path = tmp_path / "model.pkl"
+    dump_constant_model(path, "KTD", "v1")
+    manager = ModelManager(path)
+    old = manager.load()
+    assert manager.reload_if_changed() is False
+
+    dump_constant_model(path, "KNC", "v2")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert manager.reload_if_changed() is True
+
+    assert manager.model_version == "v2"
+    assert manager.predict("apa saja")["category"] == IncidentCategory.KNC
+    # A caller still holding the previous instance keeps using it undisturbed.
+    assert old.predict("apa saja")["category"] == IncidentCategory.KTD
+
+
+def test_health_reports_model_version(client: TestClient):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["model_version"] is not None
+
+
+def test_prediction_cache_hits_on_normalized_text_and_resets_on_reload(tmp_path):
+    path = tmp_path / "model.pkl"
+    dump_constant_model(path, "KTD", "v1")
+    manager = ModelManager(path, cache_size=8)
+    manager.load()
+
+    manager.predict("Pasien  jatuh di kamar mandi")
+    manager.predict("pasien jatuh di KAMAR mandi ")
+    assert manager.cache.stats()["hits"] == 1
+
+    dump_constant_model(path, "KNC", "v2")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    manager.reload_if_changed()
+    assert manager.cache.stats()["size"] == 0
+    assert manager.predict("pasien jatuh di kamar mandi")["category"] == IncidentCategory.KNC
+
+
+def test_predict_batch_matches_single_predictions(tmp_path):
+    path = tmp_path / "model.pkl"
+    dump_constant_model(path, "KTD", "v1")
+    texts = ["Pasien jatuh", "Salah obat", "Lainnya"]
+    for classifier in (IncidentClassifier(path), IncidentClassifier(tmp_path / "absent.pkl")):
+        assert classifier.predict_batch(texts) == [classifier.predict(text) for text in texts]
+
+
+def test_classification_report_precision_recall_and_calibration():
+    report = ClassificationReport(bins=2)
+    report.add("KTD", "KTD", 0.9)
+    report.add("KTD", "KNC", 0.8)
+    report.add("KNC", "KNC", 0.3)
+    summary = report.summary()
+    assert summary["per_category"]["KTD"]["precision"] == 1.0
+    assert summary["per_category"]["KTD"]["recall"] == 0.5
+    assert summary["per_category"]["KNC"]["precision"] == 0.5
+    assert summary["confusion"]["KTD"] == {"KTD": 1, "KNC": 1}
+    high, low = sorted(summary["calibration"]["bins"], key=lambda b: -b["range"][0])
+    assert high["count"] == 2 and high["accuracy"] == 0.5
+    assert low["count"] == 1 and low["accuracy"] == 1.0
+
+
+def test_rules_engine_matches_whole_words_and_weights_categories():
+    engine = RulesEngine.from_table(
+        {
+            "default": {"category": "KTC", "confidence": 0.5},
+            "rules": [
+                {"category": "KTD", "weight": 1.5, "phrases": ["jatuh"]},
+                {"category": "KNC", "weight": 1.2, "phrases": ["obat", "salah  obat", "near miss"]},
+            ],
+        }
+    )
+    assert engine.score("Media sosial dan remedi")["category"] == IncidentCategory.KTC
+    assert engine.score("Pengobatan rutin")["category"] == IncidentCategory.KTC
+    assert engine.score("Pasien JATUH")["confidence"] == 0.6
+    assert engine.score("near\nmiss saat salah obat")["category"] == IncidentCategory.KNC
+    assert engine.score("jatuh setelah obat")["category"] == IncidentCategory.KTD
+    assert [p["category"] for p in engine.score_batch(["jatuh", "obat"])] == [IncidentCategory.KTD, IncidentCategory.KNC]
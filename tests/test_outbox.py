@@ -0,0 +1,97 @@
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from src.app.models.outbox import OutboxMessage
+from src.app.services.outbox import INCIDENT_STATUS_CHANGED, Dispatcher, FileSink, WebhookSink, enqueue
+from tests.helpers import auth_headers
+
+
+class FailingSink:
+    name = "failing"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, messages):
+        self.calls += 1
+        raise ConnectionError("downstream unavailable")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = datetime.utcnow()
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def test_submit_writes_outbox_message_in_same_transaction(client: TestClient, session: Session, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = client.post(
+        "/v1/incidents", json={"free_text_description": "Pasien terjatuh dari kursi roda"}, headers=headers
+    ).json()["data"]["id"]
+    assert session.exec(select(OutboxMessage)).all() == []
+
+    client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=headers)
+    [message] = session.exec(select(OutboxMessage)).all()
+    assert message.topic == INCIDENT_STATUS_CHANGED
+    assert message.aggregate_id == incident_id
+    assert message.payload["from_status"] == "DRAFT"
+    assert message.payload["to_status"] == "SUBMITTED"
+    assert message.dispatched_at is None
+
+
+def test_file_sink_delivers_in_batches(engine, session: Session, tmp_path):
+    for index in range(5):
+        enqueue(session, INCIDENT_STATUS_CHANGED, index, {"n": index})
+    session.commit()
+    path = tmp_path / "outbox.jsonl"
+    dispatcher = Dispatcher(lambda: Session(engine), FileSink(path), batch_size=2)
+
+    result = dispatcher.drain()
+    assert result.delivered == 5
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["payload"]["n"] for line in lines] == [0, 1, 2, 3, 4]
+    assert dispatcher.drain().delivered == 0
+    assert dispatcher.backlog()["pending"] == 0
+
+
+def test_failed_batches_back_off_then_become_dead_letters(engine, session: Session):
+    enqueue(session, INCIDENT_STATUS_CHANGED, 1, {})
+    session.commit()
+    clock, sink = Clock(), FailingSink()
+    dispatcher = Dispatcher(
+        lambda: Session(engine), sink, max_attempts=2, base_backoff_seconds=10, max_backoff_seconds=60, clock=clock
+    )
+
+    assert dispatcher.dispatch_batch().failed == 1
+    assert dispatcher.dispatch_batch().claimed == 0  # not due yet
+    clock.now += timedelta(seconds=10)
+    assert dispatcher.dispatch_batch().failed == 1
+    clock.now += timedelta(hours=1)
+    assert dispatcher.dispatch_batch().claimed == 0
+    assert sink.calls == 2
+    assert dispatcher.backlog() == {"pending": 0, "dead": 1, "oldest_pending_age_seconds": 0.0}
+    message = Session(engine).exec(select(OutboxMessage)).one()
+    assert message.attempts == 2
+    assert message.last_error == "ConnectionError: downstream unavailable"
+
+
+def test_webhook_sink_posts_batches_and_fails_on_error_status():
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(json.loads(request.content))
+        return httpx.Response(202 if len(received) == 1 else 503)
+
+    sink = WebhookSink("https://quality.example/hooks")
+    sink.client = httpx.Client(transport=httpx.MockTransport(handler))
+    sink.send([{"id": 1}, {"id": 2}])
+    assert received == [{"messages": [{"id": 1}, {"id": 2}]}]
+    with pytest.raises(httpx.HTTPStatusError):
+        sink.send([{"id": 3}])
@@ -0,0 +1,119 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.observability.logs import configure_logging, shutdown_logging
+from src.app.security import patient_ids
+from src.app.security.patient_ids import blind_index, check_keys, decrypt
+from src.app.services.archival import archive_closed
+from tests.helpers import auth_headers
+
+
+def report(client: TestClient, headers: dict, patient: str | None, occurred_at: str) -> int:
+    payload = {"free_text_description": "Pasien terjatuh di kamar mandi", "patient_identifier": patient, "occurred_at": occurred_at}
+    response = client.post("/v1/incidents", json=payload, headers=headers)
+    assert response.status_code == 201
+    return response.json()["data"]["id"]
+
+
+def test_patient_identifier_is_stored_encrypted(client: TestClient, session, perawat_user):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = report(client, headers, "RM-000123", "2026-10-01T08:00:00")
+
+    stored, index = session.execute(
+        text("SELECT patient_identifier, patient_blind_index FROM incidents WHERE id = :id"), {"id": incident_id}
+    ).one()
+    assert "RM-000123" not in stored
+    assert decrypt(stored) == "RM-000123"
+    assert index == blind_index("rm-000123 ")
+
+    detail = client.get(f"/v1/incidents/{incident_id}", headers=headers).json()["data"]
+    assert detail["patient_identifier"] == "RM-000123"
+
+    client.put(f"/v1/incidents/{incident_id}", json={"free_text_description": "Pasien terjatuh di koridor", "patient_identifier": "RM-000999"}, headers=headers)
+    session.expire_all()
+    assert session.get(Incident, incident_id).patient_blind_index == blind_index("RM-000999")
+
+    blank = report(client, headers, "  ", "2026-10-01T09:00:00")
+    assert session.execute(text("SELECT patient_identifier, patient_blind_index FROM incidents WHERE id = :id"), {"id": blank}).one() == (None, None)
+
+
+def test_patient_timeline_newest_first_including_archive(client: TestClient, session, engine, perawat_user, pj_user):
+    perawat = auth_headers(client, perawat_user.email, "Password123")
+    first = report(client, perawat, "RM-000123", "2026-08-01T08:00:00")
+    second = report(client, perawat, "rm-000123", "2026-09-01T08:00:00")
+    report(client, perawat, "RM-000456", "2026-09-15T08:00:00")
+    report(client, perawat, None, "2026-09-20T08:00:00")
+
+    old = Incident(
+        reporter_id=perawat_user.id,
+        patient_identifier="RM-000123",
+        occurred_at=datetime(2023, 5, 1, 8),
+        free_text_description="Salah pemberian obat",
+        status=IncidentStatus.CLOSED,
+        updated_at=datetime(2023, 5, 10),
+    )
+    session.add(old)
+    session.commit()
+    archived_id = old.id
+    assert archive_closed(lambda: Session(engine), timedelta(days=730), now=datetime(2026, 10, 1)).archived == 1
+
+    pj = auth_headers(client, pj_user.email, "Password123")
+    timeline = client.get("/v1/patients/RM-000123/incidents", headers=pj).json()["data"]
+    assert timeline["total"] == 3
+    assert [item["id"] for item in timeline["items"]] == [second, first, archived_id]
+    assert timeline["items"][2]["archived_at"] is not None
+    assert timeline["items"][2]["patient_identifier"] == "RM-000123"
+
+    page = client.get("/v1/patients/RM-000123/incidents?page=2&per_page=2", headers=pj).json()["data"]
+    assert [item["id"] for item in page["items"]] == [archived_id]
+
+    assert client.get("/v1/patients/RM-999999/incidents", headers=pj).json()["data"]["total"] == 0
+
+
+def test_blank_identifier_matches_nothing(client: TestClient, perawat_user, pj_user):
+    perawat = auth_headers(client, perawat_user.email, "Password123")
+    report(client, perawat, None, "2026-09-20T08:00:00")
+    report(client, perawat, "  ", "2026-09-21T08:00:00")
+
+    response = client.get("/v1/patients/%20/incidents", headers=auth_headers(client, pj_user.email, "Password123"))
+    assert response.status_code == 422
+    assert response.json()["detail"]["error_code"] == "invalid_identifier"
+
+
+def test_patient_timeline_is_for_reviewers_and_not_logged(client: TestClient, perawat_user, mutu_user):
+    assert client.get("/v1/patients/RM-000123/incidents", headers=auth_headers(client, perawat_user.email, "Password123")).status_code == 403
+
+    headers = auth_headers(client, mutu_user.email, "Password123")
+    stream = io.StringIO()
+    listener = configure_logging("INFO", "json", 1.0, stream=stream)
+    try:
+        response = client.get("/v1/patients/RM-000123/incidents", headers={**headers, "X-Request-ID": "timeline-1"})
+    finally:
+        shutdown_logging(listener)
+    assert response.status_code == 200
+    [access] = [
+        entry
+        for entry in map(json.loads, stream.getvalue().splitlines())
+        if entry["logger"] == "src.app.access" and entry.get("request_id") == "timeline-1"
+    ]
+    assert access["path"] == "/v1/patients/{identifier}/incidents"
+    assert "RM-000123" not in json.dumps(access)
+
+
+def test_missing_keys_fail_startup(monkeypatch):
+    monkeypatch.setattr(patient_ids.get_settings(), "patient_encryption_key", None)
+    patient_ids._cipher.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="PATIENT_ENCRYPTION_KEY is not set"):
+            check_keys()
+    finally:
+        monkeypatch.undo()
+        patient_ids._cipher.cache_clear()
+    check_keys()
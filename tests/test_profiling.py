@@ -0,0 +1,77 @@
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.observability.context import phase
+from src.app.observability.metrics import MetricsMiddleware
+from src.app.observability.profiling import ProfileStore, ProfilingMiddleware, profile_store
+from src.app.observability.timing import TimedRoute
+from tests.helpers import auth_headers
+
+
+def build_app(store: ProfileStore) -> FastAPI:
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/work")
+    def work() -> dict:
+        with phase("auth"):
+            time.sleep(0.01)
+        with phase("ml"):
+            busy_until = time.perf_counter() + 0.05
+            while time.perf_counter() < busy_until:
+                pass
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=store,
+        authorize=lambda headers: "1" if headers.get("authorization") == "Bearer admin" else None,
+        interval_seconds=0.001,
+    )
+    app.add_middleware(MetricsMiddleware, server_timing=True)
+    return app
+
+
+def test_server_timing_header_breaks_down_phases(tmp_path):
+    client = TestClient(build_app(ProfileStore(tmp_path, 10)))
+    response = client.get("/work")
+    assert response.status_code == 200
+    entries = {part.split(";")[0]: part for part in response.headers["server-timing"].split(", ")}
+    assert set(entries) >= {"auth", "db", "ml", "endpoint", "serialize", "total"}
+    ml_ms = float(entries["ml"].split("dur=")[1])
+    assert ml_ms >= 50
+    assert float(entries["total"].split("dur=")[1]) >= ml_ms
+
+
+def test_profile_header_requires_authorization(tmp_path):
+    store = ProfileStore(tmp_path, 10)
+    client = TestClient(build_app(store))
+
+    anonymous = client.get("/work", headers={"X-Profile": "1"})
+    assert "x-profile-id" not in anonymous.headers
+    assert store.list() == []
+
+    profiled = client.get("/work", headers={"X-Profile": "1", "Authorization": "Bearer admin"})
+    profile = store.load(profiled.headers["x-profile-id"])
+    assert profile["route"] == "/work"
+    assert profile["samples"] > 0
+    assert "work (" in profile["collapsed"]
+
+
+def test_admin_downloads_stored_profile(client: TestClient, admin_user, perawat_user, tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+    profile_id = "a" * 32
+    profile_store.save(profile_id, {"path": "/v1/incidents"}, "main (app.py:1);work (app.py:9) 3\n")
+
+    admin = auth_headers(client, admin_user.email, "Password123")
+    response = client.get(f"/v1/admin/profiles/{profile_id}", headers=admin)
+    assert response.status_code == 200
+    assert response.text == "main (app.py:1);work (app.py:9) 3\n"
+    assert client.get("/v1/admin/profiles", headers=admin).json()["data"][0]["id"] == profile_id
+    assert client.get("/v1/admin/profiles/../../etc", headers=admin).status_code == 404
+
+    perawat = auth_headers(client, perawat_user.email, "Password123")
+    assert client.get(f"/v1/admin/profiles/{profile_id}", headers=perawat).status_code == 403
@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from src.app.models.user import User
+from src.app.security.passwords import verify_password
+from src.app.services import provisioning
+from src.app.services.provisioning import hash_passwords, parse_csv, provision_users
+from tests.helpers import auth_headers
+
+
+STAFF_CSV = """email,full_name,password,roles
+nurse1@example.com,Siti Aminah,Welcome123!,perawat
+Nurse2@example.com,Budi Santoso,Welcome123!,perawat;pj
+nurse1@example.com,Siti Again,Welcome123!,perawat
+not-an-email,Nobody,Welcome123!,perawat
+nurse3@example.com,Dewi Lestari,short,perawat
+nurse4@example.com,Agus Salim,Welcome123!,surgeon
+admin@example.com,Admin Again,Welcome123!,admin
+"""
+
+
+def post_csv(client: TestClient, headers: dict[str, str], body: str, **params):
+    return client.post("/v1/admin/users/bulk", content=body, params=params, headers={**headers, "Content-Type": "text/csv"})
+
+
+def test_bulk_provisioning_reports_each_row_and_is_idempotent(client: TestClient, session: Session, admin_user):
+    headers = auth_headers(client, admin_user.email, "Password123")
+
+    response = post_csv(client, headers, STAFF_CSV)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"] == {"created": 2, "duplicate": 1, "invalid": 3, "exists": 1}
+    assert [(row["row"], row["status"]) for row in data["rows"]] == [
+        (2, "created"), (3, "created"), (4, "duplicate"), (5, "invalid"), (6, "invalid"), (7, "invalid"), (8, "exists"),
+    ]
+
+    budi = session.exec(select(User).where(User.email == "nurse2@example.com")).one()
+    assert sorted(role.name for role in budi.roles) == ["perawat", "pj"]
+    assert client.post("/v1/auth/login", json={"email": "nurse1@example.com", "password": "Welcome123!"}).status_code == 200
+
+    again = post_csv(client, headers, STAFF_CSV).json()["data"]
+    assert again["summary"] == {"exists": 3, "duplicate": 1, "invalid": 3}
+
+
+def test_dry_run_and_malformed_files(client: TestClient, session: Session, admin_user):
+    headers = auth_headers(client, admin_user.email, "Password123")
+
+    dry = post_csv(client, headers, STAFF_CSV, dry_run=True).json()["data"]
+    assert dry["summary"]["valid"] == 2
+    assert session.exec(select(User).where(User.email == "nurse1@example.com")).first() is None
+
+    missing = post_csv(client, headers, "email,full_name\nx@example.com,X\n")
+    assert missing.status_code == 400
+
+
+def test_rows_wider_than_the_header_are_invalid(session: Session):
+    rows = parse_csv("email,full_name,password\na@b.co,A B,password1,extra\nc@d.co,C D,password1,,\n")
+    outcomes = provision_users(session, rows, workers=1)
+    assert [(outcome.email, outcome.status) for outcome in outcomes] == [("a@b.co", "invalid"), ("c@d.co", "created")]
+    assert outcomes[0].message == "Row has more fields than the header"
+
+
+def test_repeated_insert_conflicts_are_reported_as_existing(session: Session, monkeypatch):
+    def conflict(*args):
+        raise IntegrityError("INSERT INTO users", {}, Exception("Duplicate entry"))
+
+    monkeypatch.setattr(provisioning, "_insert_batch", conflict)
+    outcomes = provision_users(session, parse_csv("email,full_name,password\na@b.co,A B,password1\n"), workers=1)
+    assert [(outcome.email, outcome.status) for outcome in outcomes] == [("a@b.co", "exists")]
+
+
+def test_pool_hashes_verify():
+    passwords = [f"Password{index}!" for index in range(8)]
+    hashes = hash_passwords(passwords, workers=2)
+    assert all(verify_password(password, hashed) for password, hashed in zip(passwords, hashes))
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from src.app.models.incident import Incident, IncidentStatus
+from src.app.observability.context import current_request
+from src.app.observability.metrics import MetricsMiddleware
+from tests.helpers import auth_headers
+
+
+def seed_incidents(session, reporter, count: int) -> None:
+    session.add_all(
+        Incident(reporter_id=reporter.id, free_text_description=f"Pasien jatuh di ruang {i}", status=IncidentStatus.SUBMITTED)
+        for i in range(count)
+    )
+    session.commit()
+    # Expire cached state so lazy loads would really hit the database.
+    session.expire_all()
+
+
+@pytest.mark.parametrize("per_page", [5, 50])
+def test_list_incidents_query_budget_is_independent_of_page_size(client: TestClient, session, perawat_user, query_budget, per_page):
+    seed_incidents(session, perawat_user, 60)
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    # Authenticated user with roles, count, page.
+    with query_budget(3):
+        response = client.get(f"/v1/incidents?per_page={per_page}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["data"]["items"]) == per_page
+
+
+def test_get_incident_query_budget(client: TestClient, session, perawat_user, query_budget):
+    seed_incidents(session, perawat_user, 1)
+    incident_id = session.exec(select(Incident.id)).first()
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    # Authenticated user with roles, incident, audit logs.
+    with query_budget(3):
+        assert client.get(f"/v1/incidents/{incident_id}", headers=headers).status_code == 200
+
+
+def test_query_counter_flags_lazy_loads_in_a_loop(session, perawat_user, query_counter):
+    seed_incidents(session, perawat_user, 5)
+    with query_counter as counter:
+        for incident in session.exec(select(Incident)).all():
+            session.expunge(incident.reporter)
+            session.refresh(incident)
+            incident.reporter
+    assert counter.repeated()
+    assert "possible N+1" in counter.report()
+
+
+def test_middleware_logs_repeated_statements(caplog):
+    async def app(scope, receive, send):
+        request = current_request()
+        for _ in range(3):
+            request.statements["SELECT 1"] += 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, log_repeated_statements=True)
+    with caplog.at_level(logging.WARNING, logger="src.app.observability.metrics"):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/x"}, None, send))
+    assert "Possible N+1" in caplog.text
@@ -1,10 +1,5 @@
 from fastapi.testclient import TestClient
-
-
-def auth_headers(client: TestClient, email: str, password: str) -> dict[str, str]:
-    response = client.post("/v1/auth/login", json={"email": email, "password": password})
-    token = response.json()["data"]["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+from tests.helpers import auth_headers
 
 
 def test_perawat_cannot_access_admin(client: TestClient, session, perawat_user):
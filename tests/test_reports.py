@@ -0,0 +1,156 @@
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.app.main import app
+from src.app.models.department import Department
+from src.app.models.incident import AuditLog, Incident, IncidentCategory, IncidentStatus
+from src.app.models.report import ReportJob
+from src.app.routers import reports
+from src.app.services.reports.jobs import ReportRunner, build_report, get_report_runner
+from tests.helpers import auth_headers, create_roles, create_user
+
+
+class RecordingRunner:
+    def __init__(self) -> None:
+        self.submitted: list[int] = []
+
+    def submit(self, job_id: int) -> None:
+        self.submitted.append(job_id)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    runner = RecordingRunner()
+    monkeypatch.setattr(reports.settings, "report_dir", str(tmp_path))
+    app.dependency_overrides[get_report_runner] = lambda: runner
+    yield runner
+    app.dependency_overrides.pop(get_report_runner, None)
+
+
+def seed_incidents(session: Session, reporter_id: int) -> Department:
+    department = Department(name="IGD")
+    session.add(department)
+    session.commit()
+    occurred = datetime(2026, 7, 10, 8, 0)
+    for index, category in enumerate([IncidentCategory.KTD, IncidentCategory.KTD, IncidentCategory.KNC]):
+        incident = Incident(
+            reporter_id=reporter_id,
+            department_id=department.id,
+            occurred_at=occurred,
+            free_text_description=f"Pasien terjatuh di koridor {index}",
+            status=IncidentStatus.CLOSED,
+            final_category=category,
+        )
+        session.add(incident)
+        session.commit()
+        session.add(AuditLog(incident_id=incident.id, actor_id=reporter_id, to_status=IncidentStatus.SUBMITTED, created_at=occurred))
+        session.add(
+            AuditLog(
+                incident_id=incident.id,
+                actor_id=reporter_id,
+                from_status=IncidentStatus.MUTU_REVIEWED,
+                to_status=IncidentStatus.CLOSED,
+                created_at=occurred + timedelta(hours=10),
+            )
+        )
+    session.add(Incident(reporter_id=reporter_id, occurred_at=occurred, free_text_description="Masih draft, tidak dilaporkan"))
+    session.commit()
+    return department
+
+
+def test_report_is_built_cached_and_downloadable(client: TestClient, session, mutu_user, runner, tmp_path):
+    seed_incidents(session, mutu_user.id)
+    headers = auth_headers(client, mutu_user.email, "Password123")
+    body = {"format": "xlsx", "date_from": "2026-07-01", "date_to": "2026-09-30"}
+
+    queued = client.post("/v1/reports", json=body, headers=headers)
+    assert queued.status_code == 202
+    job_id = queued.json()["data"]["id"]
+    assert queued.json()["data"]["status"] == "PENDING"
+    assert runner.submitted == [job_id]
+
+    not_ready = client.get(f"/v1/reports/{job_id}/download", headers=headers)
+    assert not_ready.status_code == 409
+
+    build_report(session, job_id, tmp_path)
+    status = client.get(f"/v1/reports/{job_id}", headers=headers).json()["data"]
+    assert status["status"] == "DONE"
+    assert status["row_count"] == 3
+
+    download = client.get(f"/v1/reports/{job_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert "laporan-akreditasi-2026-07-01-2026-09-30.xlsx" in download.headers["content-disposition"]
+    workbook = zipfile.ZipFile(io.BytesIO(download.content))
+    assert workbook.testzip() is None
+    assert '<sheet name="Ringkasan" sheetId="2"' in workbook.read("xl/workbook.xml").decode()
+    summary = workbook.read("xl/worksheets/sheet2.xml").decode()
+    assert "<t xml:space=\"preserve\">KTD</t></is></c><c r=\"C3\"><v>2</v>" in summary
+    assert "<v>10.0</v>" in summary
+
+    reused = client.post("/v1/reports", json=body, headers=headers)
+    assert reused.status_code == 200
+    assert reused.json()["message"] == "Report reused"
+    assert reused.json()["data"]["id"] == job_id
+    assert runner.submitted == [job_id]
+
+
+def test_changed_data_gets_a_new_report(client: TestClient, session, mutu_user, runner, tmp_path):
+    seed_incidents(session, mutu_user.id)
+    headers = auth_headers(client, mutu_user.email, "Password123")
+    body = {"format": "pdf", "date_from": "2026-07-01", "date_to": "2026-07-31"}
+    first = client.post("/v1/reports", json=body, headers=headers).json()["data"]["id"]
+    build_report(session, first, tmp_path)
+
+    incident = session.get(Incident, 1)
+    incident.harm_indicator = "cedera ringan"
+    incident.touch()
+    session.add(incident)
+    session.commit()
+
+    second = client.post("/v1/reports", json=body, headers=headers)
+    assert second.status_code == 202
+    assert second.json()["data"]["id"] != first
+    build_report(session, second.json()["data"]["id"], tmp_path)
+    pdf = client.get(f"/v1/reports/{second.json()['data']['id']}/download", headers=headers)
+    assert pdf.headers["content-type"] == "application/pdf"
+    assert pdf.content.startswith(b"%PDF-1.4") and pdf.content.rstrip().endswith(b"%%EOF")
+    assert b"(IGD                          KTD                    2" in pdf.content
+
+
+def test_reports_require_reviewer_roles(client: TestClient, perawat_user, runner):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    response = client.post("/v1/reports", json={"date_from": "2026-07-01", "date_to": "2026-07-31"}, headers=headers)
+    assert response.status_code == 403
+    assert runner.submitted == []
+
+
+def test_process_pool_runner_builds_report(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'reports.db'}"
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        create_roles(session)
+        user = create_user(session, "mutu@example.com", "Password123", "mutu")
+        seed_incidents(session, user.id)
+        job = ReportJob(
+            cache_key="0" * 64,
+            format="xlsx",
+            parameters={"date_from": "2026-07-01", "date_to": "2026-07-31", "department_id": None},
+            watermark="test",
+            requested_by_id=user.id,
+        )
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    runner = ReportRunner(database_url, str(tmp_path / "out"), workers=1)
+    try:
+        assert runner.submit(job_id).result(timeout=120) == "DONE"
+    finally:
+        runner.shutdown()
+    assert (tmp_path / "out" / f"{'0' * 64}.xlsx").is_file()
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from src.app.models.incident import Incident
+from src.app.services.incidents import similar
+from src.app.services.incidents.similar import SimilarityIndex
+from tests.helpers import auth_headers
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch, session):
+    index = SimilarityIndex(tmp_path / "similar.npz", snapshot_every=1)
+    monkeypatch.setattr(similar, "similar_index", index)
+    # Loaded up front, so no background build shares the test connection.
+    index.sync(session)
+    return index
+
+
+def close_incident(client: TestClient, text: str, perawat: dict, pj: dict, mutu: dict, category: str = "KTD") -> int:
+    incident_id = client.post("/v1/incidents", json={"free_text_description": text}, headers=perawat).json()["data"]["id"]
+    client.post(f"/v1/incidents/{incident_id}/submit", json={"confirm_submit": True}, headers=perawat)
+    client.post(f"/v1/approvals/{incident_id}/pj", json={"category": category}, headers=pj)
+    client.post(f"/v1/approvals/{incident_id}/mutu", json={"category": category}, headers=mutu)
+    assert client.post(f"/v1/approvals/{incident_id}/close", headers=mutu).status_code == 200
+    return incident_id
+
+
+def test_similar_incidents_ranked_and_updated_on_close(client: TestClient, perawat_user, pj_user, mutu_user, index):
+    perawat = auth_headers(client, perawat_user.email, "Password123")
+    pj = auth_headers(client, pj_user.email, "Password123")
+    mutu = auth_headers(client, mutu_user.email, "Password123")
+    fall = close_incident(client, "Pasien jatuh dari tempat tidur karena pagar tempat tidur tidak terpasang", perawat, pj, mutu)
+    close_incident(client, "Obat antibiotik diberikan ke pasien yang salah di IGD", perawat, pj, mutu, category="KNC")
+
+    current = client.post(
+        "/v1/incidents", json={"free_text_description": "Pasien lansia jatuh dari tempat tidur saat malam"}, headers=perawat
+    ).json()["data"]["id"]
+    response = client.get(f"/v1/incidents/{current}/similar?limit=5", headers=mutu)
+    assert response.status_code == 200
+    items = response.json()["data"]
+    assert items[0]["id"] == fall
+    assert items[0]["final_category"] == "KTD"
+    assert all(item["id"] != current for item in items)
+    assert len(index) == 2
+
+    # Closed after the index was loaded: added by the commit hook, no rebuild needed.
+    another_fall = close_incident(client, "Pasien lansia jatuh dari tempat tidur saat malam hari", perawat, pj, mutu)
+    assert len(index) == 3
+    items = client.get(f"/v1/incidents/{current}/similar", headers=mutu).json()["data"]
+    assert items[0]["id"] == another_fall
+
+
+def test_snapshot_restores_index_without_rebuilding(tmp_path):
+    index = SimilarityIndex(tmp_path / "similar.npz")
+    index.add_many([(1, "Pasien jatuh di kamar mandi"), (2, "Salah pemberian obat insulin"), (3, "Infus macet di bangsal")])
+    index.synced_at = datetime(2026, 10, 1)
+    index.save()
+
+    restored = SimilarityIndex(tmp_path / "similar.npz")
+    assert restored.load()
+    assert len(restored) == 3
+    assert restored.synced_at == index.synced_at
+    assert restored.search("pasien jatuh", k=1) == index.search("pasien jatuh", k=1)
+    assert restored.search("pasien jatuh", k=1)[0].incident_id == 1
+
+
+def test_similar_requires_reviewer_role(client: TestClient, perawat_user, index):
+    headers = auth_headers(client, perawat_user.email, "Password123")
+    incident_id = client.post("/v1/incidents", json={"free_text_description": "Pasien jatuh di koridor"}, headers=headers).json()["data"]["id"]
+    assert client.get(f"/v1/incidents/{incident_id}/similar", headers=headers).status_code == 403
+
+
+def test_similar_answers_503_until_the_index_is_loaded(client: TestClient, session, pj_user, tmp_path, monkeypatch):
+    index = SimilarityIndex(tmp_path / "similar.npz")
+    monkeypatch.setattr(similar, "similar_index", index)
+    headers = auth_headers(client, pj_user.email, "Password123")
+    incident = Incident(reporter_id=pj_user.id, free_text_description="Pasien jatuh di koridor")
+    session.add(incident)
+    session.commit()
+    incident_id = incident.id
+
+    response = client.get(f"/v1/incidents/{incident_id}/similar", headers=headers)
+    assert response.status_code == 503
+    assert response.json()["detail"]["error_code"] == "similar_index_loading"
+    assert response.headers["Retry-After"] == "5"
+
+    index.build_in_background(lambda: Session(session.get_bind())).join(timeout=10)
+    assert index.loaded
+    assert client.get(f"/v1/incidents/{incident_id}/similar", headers=headers).status_code == 200
+
+
+def test_sync_leaves_the_snapshot_to_a_background_thread(session, tmp_path, monkeypatch):
+    index = SimilarityIndex(tmp_path / "similar.npz", snapshot_every=1)
+    saves = []
+    monkeypatch.setattr(index, "save_in_background", lambda: saves.append(True))
+    monkeypatch.setattr(index, "save", lambda: pytest.fail("saved on the calling thread"))
+    index.sync(session)
+    index.add(1, "Pasien jatuh di kamar mandi")
+    index.sync(session)
+    assert saves == [True]
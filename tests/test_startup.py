@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Measured at ~1s cold on the dev container; the budget leaves room for slow CI
+# while still catching an eager import of the ML stack or a heavy new dependency.
+IMPORT_BUDGET_SECONDS = 3.0
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["joblib", "numpy", "scipy", "sklearn", "src.app.services.classifier.compiled"]
+
+SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import src.app.main
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_app_in_fresh_interpreter() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    result = subprocess.run([sys.executable, "-c", SNIPPET], capture_output=True, text=True, env=env, cwd=REPO_ROOT, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_does_not_load_ml_stack_and_fits_budget():
+    # Best of two, so a cold page cache on the first run does not fail the build.
+    runs = [import_app_in_fresh_interpreter() for _ in range(2)]
+    assert [name for name in HEAVY_MODULES if name in runs[0]["modules"]] == []
+    fastest = min(run["seconds"] for run in runs)
+    assert fastest < IMPORT_BUDGET_SECONDS, f"importing src.app.main took {fastest:.2f}s"
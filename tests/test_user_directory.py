@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from src.app.models.role import Role
+from src.app.models.user import User
+from tests.helpers import auth_headers
+
+
+def add_staff(session: Session) -> None:
+    perawat = session.exec(select(Role).where(Role.name == "perawat")).one()
+    names = ["Siti Aminah", "Siti Rahma", "Budi Santoso", "Sitompul Hasan", "Dewi_Lestari", "Agus Salim"]
+    for index, name in enumerate(names):
+        user = User(
+            email=f"{name.split()[0].lower()}{index}@example.com",
+            full_name=name,
+            hashed_password="x",
+            is_active=index != 1,
+        )
+        user.roles.append(perawat)
+        session.add(user)
+    session.commit()
+
+
+def fetch_all(client: TestClient, headers: dict[str, str], **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/v1/admin/users", params=query, headers=headers).json()["data"]
+        pages.append(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_every_user_once(client: TestClient, session: Session, admin_user):
+    add_staff(session)
+    headers = auth_headers(client, admin_user.email, "Password123")
+
+    pages = fetch_all(client, headers, limit=3)
+    ids = [item["id"] for page in pages for item in page]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert ids == sorted(ids) and len(set(ids)) == 7
+    assert pages[0][0]["roles"][0]["name"] == "admin"
+
+    by_name = [item["full_name"] for page in fetch_all(client, headers, limit=2, sort="full_name") for item in page]
+    assert by_name == sorted(by_name)
+
+
+def test_prefix_search_filters_and_compact_projection(client: TestClient, session: Session, admin_user):
+    add_staff(session)
+    headers = auth_headers(client, admin_user.email, "Password123")
+
+    data = client.get("/v1/admin/users", params={"q": "Siti"}, headers=headers).json()["data"]
+    assert [item["full_name"] for item in data["items"]] == ["Siti Aminah", "Siti Rahma"]
+
+    active = client.get("/v1/admin/users", params={"q": "siti", "is_active": True, "fields": "compact"}, headers=headers)
+    assert active.json()["data"]["items"] == [{"id": active.json()["data"]["items"][0]["id"], "email": "siti0@example.com", "full_name": "Siti Aminah"}]
+
+    # LIKE wildcards in the query are literal characters.
+    assert client.get("/v1/admin/users", params={"q": "Dewi_"}, headers=headers).json()["data"]["items"][0]["full_name"] == "Dewi_Lestari"
+    assert client.get("/v1/admin/users", params={"q": "S%"}, headers=headers).json()["data"]["items"] == []
+
+    admins = client.get("/v1/admin/users", params={"role": "admin"}, headers=headers).json()["data"]["items"]
+    assert [item["email"] for item in admins] == [admin_user.email]
+
+
+def test_listing_cost_does_not_grow_with_page_depth(client: TestClient, session: Session, admin_user, query_budget):
+    add_staff(session)
+    headers = auth_headers(client, admin_user.email, "Password123")
+    cursor = client.get("/v1/admin/users", params={"limit": 2}, headers=headers).json()["data"]["next_cursor"]
+
+    # auth (1) + users page (1) + roles for the page (1)
+    with query_budget(3):
+        client.get("/v1/admin/users", params={"limit": 2, "cursor": cursor}, headers=headers)
+    with query_budget(2):
+        client.get("/v1/admin/users", params={"limit": 2, "cursor": cursor, "fields": "compact"}, headers=headers)
+
+    bad = client.get("/v1/admin/users", params={"cursor": cursor, "sort": "email"}, headers=headers)
+    assert bad.status_code == 400